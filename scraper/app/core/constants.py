@@ -115,6 +115,109 @@ INDIAN_DATE_FORMATS: list[str] = [
     "%d/%m/%y",
 ]
 
+# Month-first layouts, only used for a source whose dates call for month-first
+MONTH_FIRST_DATE_FORMATS: list[str] = [
+    "%m-%d-%Y",
+    "%m/%d/%Y",
+    "%m.%d.%Y",
+    "%m-%d-%y",
+    "%m/%d/%y",
+]
+
+# Distinct date strings only month-first can parse ("04/13/2026") needed,
+# in a source's first dated chunk, to read the source month-first
+MONTH_FIRST_MIN_EVIDENCE: int = 2
+
+# Distinct values of a date column sampled to infer its format
+DATE_INFERENCE_SAMPLE_SIZE: int = 64
+
+# Date parses memoized across columns and chunks (per string, and per string + format)
+DATE_PARSE_CACHE_SIZE: int = 16384
+
+# ── Normalization ───────────────────────────────────────────────────────────
+
+# Compiled normalization plans kept per process (one per source config)
+NORMALIZATION_PLAN_CACHE_SIZE: int = 256
+
+# ── Streaming Pipeline ──────────────────────────────────────────────────────
+
+# Records per chunk passed between fetch → normalize → write stages
+PIPELINE_CHUNK_SIZE: int = 1000
+
+# Chunks a stage may run ahead of its consumer before it blocks
+PIPELINE_QUEUE_SIZE: int = 4
+
+# ── Rate Limiting ───────────────────────────────────────────────────────────
+# Per-host AIMD token buckets (see app/scraping/rate_limit.py)
+
+# Added to a host's rate after each healthy response (requests/second)
+RATE_LIMIT_INCREASE_RPS: float = 0.05
+
+# Multiplier applied to a host's rate on 429 / 503
+RATE_LIMIT_DECREASE_FACTOR: float = 0.5
+
+# Floor for a host's rate: one request every 20 seconds
+RATE_LIMIT_MIN_RPS: float = 0.05
+
+# Longest Retry-After honoured; anything longer is capped
+RATE_LIMIT_MAX_RETRY_AFTER_SECONDS: float = 600.0
+
+# ── Retries / Circuit Breaker ───────────────────────────────────────────────
+# See app/scraping/retry.py; the retry count is config.http_retries
+
+# Backoff before retry n is uniform in [0, min(MAX, BASE * 2^n)] seconds
+RETRY_BASE_DELAY_SECONDS: float = 1.0
+RETRY_MAX_DELAY_SECONDS: float = 30.0
+
+# Consecutive failures (errors / 5xx) after which a host is treated as
+# down, and how long requests to it then fail fast before a probe
+CIRCUIT_FAILURE_THRESHOLD: int = 5
+CIRCUIT_COOLDOWN_SECONDS: float = 60.0
+
+# ── PDF Extraction ──────────────────────────────────────────────────────────
+
+# Pages per extraction task when a PDF is split across the worker pool
+PDF_PAGES_PER_RANGE: int = 8
+
+# ── Price Writes ────────────────────────────────────────────────────────────
+
+# Natural key of a price record: one document per source, day, crop and mandi
+PRICE_NATURAL_KEY: tuple[str, ...] = ("sourceId", "date", "cropName", "mandiName")
+
+# Operations per unordered bulk_write when upserting prices
+PRICE_UPSERT_CHUNK_SIZE: int = 1000
+
+# ── Parquet Output ──────────────────────────────────────────────────────────
+
+# Hive-style partition directories of the prices dataset (date=…/stateId=…)
+PARQUET_PARTITION_FIELDS: tuple[str, ...] = ("date", "stateId")
+
+# Column compression codec for written and compacted files
+PARQUET_COMPRESSION: str = "zstd"
+
+# Compaction merges a partition's files smaller than this into one
+PARQUET_TARGET_FILE_MB: int = 128
+
+# ── Event-Loop Lag ──────────────────────────────────────────────────────────
+
+# The lag monitor wakes this often; any oversleep beyond the threshold
+# counts as time the event loop was blocked
+LOOP_LAG_INTERVAL_SECONDS: float = 0.05
+LOOP_LAG_THRESHOLD_SECONDS: float = 0.01
+
+# ── Run Log Limits ──────────────────────────────────────────────────────────
+# Per-source caps on the error / visited-URL buffers kept in a run log.
+# Older entries are dropped (and counted) once a buffer is full.
+
+MAX_RUN_LOG_ERRORS: int = 50
+MAX_RUN_LOG_URLS: int = 200
+
+# ── Daemon Scheduling ───────────────────────────────────────────────────────
+
+# Overdue / never-run sources are spread over this window when the daemon
+# (re)loads them, so a restart doesn't fire every source at once
+DAEMON_CATCHUP_SPREAD_MINUTES: int = 15
+
 # ── Health Status Values ────────────────────────────────────────────────────
 
 HEALTH_OK: str = "OK"
@@ -3,21 +3,37 @@ Runtime context object.
 
 Holds references to config, logger, database, and per-run state
 (visited URLs, errors, record counts, timing).
+
+The root context created by main.py holds run-wide aggregates; each
+source is processed in a forked child with its own counters and
+bounded error / URL buffers, so run logs stay small and per-source.
 """
 
 from __future__ import annotations
 
 import logging
 import time
+from collections import deque
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Protocol
+
+from app.core.constants import MAX_RUN_LOG_ERRORS, MAX_RUN_LOG_URLS
 
 if TYPE_CHECKING:
     from motor.motor_asyncio import AsyncIOMotorDatabase
 
+    from app.core.workers import WorkerPool
+    from app.scraping.http_cache import HttpCache
+    from app.scraping.http_client import HttpClients
     from config import AppConfig
 
 
+class ErrorReporter(Protocol):
+    """Anything that can record a pipeline error (RunContext, ErrorSink)."""
+
+    def add_error(self, url: str, error: str, *, fatal: bool = False) -> None: ...
+
+
 @dataclass
 class RunContext:
     """Mutable per-run context passed through the pipeline."""
@@ -25,21 +41,107 @@ class RunContext:
     config: AppConfig
     logger: logging.Logger
     db: AsyncIOMotorDatabase | None = None
+    workers: WorkerPool | None = None
+    http_cache: HttpCache | None = None
+    http: HttpClients | None = None
+
+    # Output adapters holding open files or threads, closed at shutdown
+    outputs: list[Any] = field(default_factory=list)
 
     # Per-run state
     source_id: str = ""
     source_url: str = ""
     start_time: float = field(default_factory=time.time)
-    visited_urls: list[str] = field(default_factory=list)
-    errors: list[dict] = field(default_factory=list)
     records_extracted: int = 0
     records_saved: int = 0
+    records_skipped: int = 0  # before the incremental watermark
+
+    # HTTP cache activity; `unchanged` = short-circuited on an unchanged document
+    cache_hits: int = 0
+    cache_misses: int = 0
+    unchanged: bool = False
+    # (url, sha256) of documents fetched, marked processed once saved
+    cache_pending: list[tuple[str, str]] = field(default_factory=list)
+    # Fingerprint of the source's normalization plan; processed markers are
+    # kept per (source, plan), so a config change re-parses unchanged bodies
+    plan_fingerprint: str = ""
+
+    # A request was refused because its host's circuit breaker is open
+    circuit_open: bool = False
+
+    # PDF pages extracted and time spent; event-loop blocking during the scrape
+    pdf_pages: int = 0
+    pdf_seconds: float = 0.0
+    loop_blocked_seconds: float = 0.0
+    loop_lag_max_seconds: float = 0.0
+
+    # Bounded buffers (most recent entries) plus running totals
+    visited_urls: deque[str] = field(
+        default_factory=lambda: deque(maxlen=MAX_RUN_LOG_URLS)
+    )
+    errors: deque[dict] = field(
+        default_factory=lambda: deque(maxlen=MAX_RUN_LOG_ERRORS)
+    )
+    visited_count: int = 0
+    error_count: int = 0
+    fatal_count: int = 0
+
+    # Number of child contexts merged into this one
+    sources_run: int = 0
 
     @property
     def elapsed_seconds(self) -> float:
         """Seconds elapsed since the run started."""
         return time.time() - self.start_time
 
+    @property
+    def errors_dropped(self) -> int:
+        """Errors counted but no longer held in the buffer."""
+        return self.error_count - len(self.errors)
+
+    @property
+    def visited_dropped(self) -> int:
+        """Visited URLs counted but no longer held in the buffer."""
+        return self.visited_count - len(self.visited_urls)
+
+    def fork(self, source: dict[str, Any]) -> RunContext:
+        """
+        Create a per-source child context.
+
+        The child shares config, logger, db, workers, HTTP clients and
+        the HTTP cache but has its own state, so sources running interleaved never
+        overwrite each other's counters.
+        """
+        return RunContext(
+            config=self.config,
+            logger=self.logger,
+            db=self.db,
+            workers=self.workers,
+            http_cache=self.http_cache,
+            http=self.http,
+            source_id=str(source.get("_id", "")),
+            source_url=source.get("entryUrl", ""),
+        )
+
+    def merge(self, child: RunContext) -> None:
+        """
+        Fold a finished child context into this context's aggregates.
+
+        Only counters are merged; the child's buffers stay with its own
+        run log so the parent's size doesn't grow with the source count.
+        """
+        self.visited_count += child.visited_count
+        self.error_count += child.error_count
+        self.fatal_count += child.fatal_count
+        self.records_extracted += child.records_extracted
+        self.records_saved += child.records_saved
+        self.records_skipped += child.records_skipped
+        self.cache_hits += child.cache_hits
+        self.cache_misses += child.cache_misses
+        self.pdf_pages += child.pdf_pages
+        self.pdf_seconds += child.pdf_seconds
+        self.sources_run += 1
+
     def add_error(self, url: str, error: str, *, fatal: bool = False) -> None:
         """Record an error encountered during the run."""
         self.errors.append({
@@ -48,7 +150,9 @@ class RunContext:
             "fatal": fatal,
             "timestamp": time.time(),
         })
+        self.error_count += 1
         if fatal:
+            self.fatal_count += 1
             self.logger.error("FATAL [%s]: %s", url, error)
         else:
             self.logger.warning("[%s]: %s", url, error)
@@ -56,6 +160,7 @@ class RunContext:
     def mark_visited(self, url: str) -> None:
         """Record a URL as visited."""
         self.visited_urls.append(url)
+        self.visited_count += 1
 
     def to_run_log(self) -> dict:
         """Serialize context state into a run log document for storage."""
@@ -64,11 +169,24 @@ class RunContext:
             "sourceUrl": self.source_url,
             "startTime": self.start_time,
             "durationSeconds": self.elapsed_seconds,
-            "visitedUrls": self.visited_urls,
-            "visitedCount": len(self.visited_urls),
+            "visitedUrls": list(self.visited_urls),
+            "visitedCount": self.visited_count,
+            "visitedDropped": self.visited_dropped,
             "recordsExtracted": self.records_extracted,
             "recordsSaved": self.records_saved,
-            "errors": self.errors,
-            "errorCount": len(self.errors),
-            "success": len([e for e in self.errors if e.get("fatal")]) == 0,
+            "recordsSkipped": self.records_skipped,
+            "cacheHits": self.cache_hits,
+            "cacheMisses": self.cache_misses,
+            "unchanged": self.unchanged,
+            "circuitOpen": self.circuit_open,
+            "pdfPages": self.pdf_pages,
+            "pdfPagesPerSecond": (
+                round(self.pdf_pages / self.pdf_seconds, 2) if self.pdf_seconds else 0.0
+            ),
+            "loopBlockedSeconds": round(self.loop_blocked_seconds, 3),
+            "loopLagMaxMs": round(self.loop_lag_max_seconds * 1000, 1),
+            "errors": list(self.errors),
+            "errorCount": self.error_count,
+            "errorsDropped": self.errors_dropped,
+            "success": self.fatal_count == 0,
         }
@@ -0,0 +1,239 @@
+"""
+Columnar price record batches.
+
+A PriceBatch holds records column by column — one list or typed array
+per field — instead of one dict per record, so field names are stored
+once per batch rather than once per row, all-float columns (prices,
+arrivals) are packed into array('d'), and repeated strings (crop, mandi
+and state names) share one object per distinct value. Consecutive
+records with the same fields form a block; records whose fields differ
+start a new one, so a batch keeps exactly the records it was built from.
+
+Batches flow from the normalizer (and worker processes, where they also
+pickle compactly) through the scrape pipeline to the outputs. Dicts are
+only built at the edges: to_documents() for MongoDB and JSON, rows()
+for CSV. PriceRecord gives row access without building one.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Mapping
+from dataclasses import dataclass
+from itertools import compress, repeat
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+
+@dataclass(frozen=True, slots=True)
+class _Block:
+    """Consecutive records sharing one field set, stored column by column."""
+
+    fields: tuple[str, ...]
+    columns: tuple[Sequence[Any], ...]
+    length: int
+
+    def rows(self) -> Iterator[tuple[Any, ...]]:
+        """The block's records as value tuples (in `fields` order)."""
+        if not self.columns:
+            return repeat((), self.length)
+        return zip(*self.columns)
+
+    def take(self, keep: Sequence[bool]) -> _Block:
+        """The records whose `keep` flag is set."""
+        columns = tuple(_pack(list(compress(column, keep))) for column in self.columns)
+        return _Block(self.fields, columns, sum(keep))
+
+    def slice(self, start: int, stop: int) -> _Block:
+        stop = min(stop, self.length)
+        return _Block(
+            self.fields,
+            tuple(column[start:stop] for column in self.columns),
+            max(0, stop - start),
+        )
+
+
+class PriceRecord(Mapping[str, Any]):
+    """Read-only view of one record of a PriceBatch."""
+
+    __slots__ = ("_block", "_index")
+
+    def __init__(self, block: _Block, index: int) -> None:
+        self._block = block
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            position = self._block.fields.index(key)
+        except ValueError:
+            raise KeyError(key) from None
+        return self._block.columns[position][self._index]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._block.fields)
+
+    def __len__(self) -> int:
+        return len(self._block.fields)
+
+    def to_dict(self) -> dict[str, Any]:
+        """The record as a plain dict."""
+        block, index = self._block, self._index
+        return {name: column[index] for name, column in zip(block.fields, block.columns)}
+
+    def __repr__(self) -> str:
+        return f"PriceRecord({self.to_dict()!r})"
+
+
+class PriceBatch:
+    """An ordered batch of records, stored column by column."""
+
+    __slots__ = ("_blocks", "_length")
+
+    def __init__(self, blocks: Iterable[_Block] = ()) -> None:
+        self._blocks = tuple(block for block in blocks if block.length)
+        self._length = sum(block.length for block in self._blocks)
+
+    # ── Construction ─────────────────────────────────────────────────────
+
+    @classmethod
+    def from_columns(cls, columns: Mapping[str, list[Any]]) -> PriceBatch:
+        """A batch of one block: equal-length columns keyed by field name."""
+        length = len(next(iter(columns.values()), ()))
+        return cls([_Block(
+            tuple(columns),
+            tuple(_pack(column) for column in columns.values()),
+            length,
+        )])
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, Any]]) -> PriceBatch:
+        """A batch holding `records` (dicts or PriceRecords), in order."""
+        blocks: list[_Block] = []
+        fields: tuple[str, ...] | None = None
+        rows: list[tuple[Any, ...]] = []
+
+        for record in records:
+            record_fields = tuple(record)
+            if record_fields != fields:
+                if fields is not None:
+                    blocks.append(_block_from_rows(fields, rows))
+                fields, rows = record_fields, []
+            rows.append(tuple(record.values()))
+        if fields is not None:
+            blocks.append(_block_from_rows(fields, rows))
+
+        return cls(blocks)
+
+    @classmethod
+    def concat(cls, batches: Iterable[PriceBatch]) -> PriceBatch:
+        """One batch holding every record of `batches`, in order."""
+        return cls(block for batch in batches for block in batch._blocks)
+
+    # ── Access ───────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[PriceRecord]:
+        for block in self._blocks:
+            for index in range(block.length):
+                yield PriceRecord(block, index)
+
+    def __getitem__(self, index: int) -> PriceRecord:
+        if index < 0:
+            index += self._length
+        if index >= 0:
+            for block in self._blocks:
+                if index < block.length:
+                    return PriceRecord(block, index)
+                index -= block.length
+        raise IndexError("PriceBatch index out of range")
+
+    def __repr__(self) -> str:
+        return f"PriceBatch({self._length} records, {len(self._blocks)} blocks)"
+
+    def fields(self) -> list[str]:
+        """Every field any record has, in order of first appearance."""
+        return list(dict.fromkeys(name for block in self._blocks for name in block.fields))
+
+    def column(self, field_name: str, missing: Any = None) -> list[Any]:
+        """One field's values across all records (`missing` where a record lacks it)."""
+        values: list[Any] = []
+        for block in self._blocks:
+            if field_name in block.fields:
+                values.extend(block.columns[block.fields.index(field_name)])
+            else:
+                values.extend(repeat(missing, block.length))
+        return values
+
+    # ── Edges ────────────────────────────────────────────────────────────
+
+    def to_documents(self) -> list[dict[str, Any]]:
+        """Every record as a fresh dict (e.g. a MongoDB document)."""
+        return [
+            dict(zip(block.fields, row))
+            for block in self._blocks
+            for row in block.rows()
+        ]
+
+    def rows(self, fields: Sequence[str], missing: Any = "") -> Iterator[tuple[Any, ...]]:
+        """
+        Every record's values for `fields` (e.g. CSV rows); fields a record
+        lacks are `missing`, fields not listed are left out.
+        """
+        for block in self._blocks:
+            positions = {name: i for i, name in enumerate(block.fields)}
+            columns = [
+                block.columns[positions[name]] if name in positions else repeat(missing, block.length)
+                for name in fields
+            ]
+            if columns:
+                yield from zip(*columns)
+            else:
+                yield from repeat((), block.length)
+
+    # ── Transformations ──────────────────────────────────────────────────
+
+    def where(self, field_name: str, predicate: Callable[[Any], bool]) -> PriceBatch:
+        """
+        The records whose `field_name` value satisfies `predicate`
+        (called with None for records without the field).
+        """
+        blocks: list[_Block] = []
+        for block in self._blocks:
+            if field_name in block.fields:
+                column = block.columns[block.fields.index(field_name)]
+                keep = [bool(predicate(value)) for value in column]
+            else:
+                keep = [bool(predicate(None))] * block.length
+            blocks.append(block if all(keep) else block.take(keep))
+        return PriceBatch(blocks)
+
+    def chunks(self, size: int) -> Iterator[PriceBatch]:
+        """Split into batches of at most `size` records, in order."""
+        blocks: list[_Block] = []
+        room = size
+        for block in self._blocks:
+            start = 0
+            while start < block.length:
+                part = block if start == 0 and block.length <= room else block.slice(start, start + room)
+                blocks.append(part)
+                start += part.length
+                room -= part.length
+                if room == 0:
+                    yield PriceBatch(blocks)
+                    blocks, room = [], size
+        if blocks:
+            yield PriceBatch(blocks)
+
+
+def _block_from_rows(fields: tuple[str, ...], rows: list[tuple[Any, ...]]) -> _Block:
+    columns = tuple(_pack(list(column)) for column in zip(*rows)) if fields else ()
+    return _Block(fields, columns, len(rows))
+
+
+def _pack(values: list[Any]) -> Sequence[Any]:
+    """Store a column compactly: all-float columns as array('d'), repeated strings shared."""
+    if values and all(type(value) is float for value in values):
+        return array("d", values)
+    shared: dict[str, str] = {}
+    return [shared.setdefault(value, value) if type(value) is str else value for value in values]
@@ -6,14 +6,18 @@ Dispatches execution based on config.agent_mode:
   - discover: run discovery engine only
   - discover_and_scrape: discover then scrape
   - single_url: check DB → discover if needed → scrape
+  - daemon: stay resident, discover + scrape each source on its own cadence
+  - compact: merge small files of the Parquet output dataset
 """
 
 from __future__ import annotations
 
+import asyncio
+import signal
 import time
-from typing import Any
+from typing import Any, Awaitable, Callable
 
-from config import AgentMode, InputMode
+from config import AgentMode, InputMode, OutputMode
 from app.core.context import RunContext
 
 
@@ -32,6 +36,10 @@ async def run(ctx: RunContext) -> None:
         await _run_discover_and_scrape_mode(ctx)
     elif mode == AgentMode.SINGLE_URL:
         await _run_single_url_mode(ctx)
+    elif mode == AgentMode.DAEMON:
+        await _run_daemon_mode(ctx)
+    elif mode == AgentMode.COMPACT:
+        await _run_compact_mode(ctx)
     else:
         ctx.logger.error("Unknown agent mode: %s", mode)
 
@@ -45,34 +53,17 @@ async def _run_scrape_mode(ctx: RunContext) -> None:
 
     Assumes sources already have extractionType and schemaMapping configured.
     """
-    sources = await _load_sources(ctx)
-    if not sources:
-        ctx.logger.warning("No sources to scrape")
-        return
-
     output = _get_output_adapter(ctx)
 
-    for i, source in enumerate(sources, 1):
-        source_url = source.get("entryUrl", "unknown")
-        ctx.logger.info("─── Source %d/%d: %s ───", i, len(sources), source_url)
-
-        ctx.source_url = source_url
-        ctx.source_id = str(source.get("_id", ""))
+    async def process(src_ctx: RunContext, source: dict[str, Any]) -> None:
+        await _scrape_and_save(src_ctx, source, output)
 
-        from app.scraping.scrape_engine import run_scrape
-
-        records = await run_scrape(ctx, source)
-
-        if records:
-            saved = await output.save_prices(records)
-            ctx.records_saved += saved
-
-        # Save run log
-        run_log = ctx.to_run_log()
-        await output.save_run(run_log)
-
-        # Update health
-        await _update_health(ctx, source, success=bool(records), records_saved=len(records))
+    await _process_all_sources(
+        ctx,
+        process,
+        label="Source",
+        empty_message="No sources to scrape",
+    )
 
 
 async def _run_discover_mode(ctx: RunContext) -> None:
@@ -81,18 +72,11 @@ async def _run_discover_mode(ctx: RunContext) -> None:
 
     Does not scrape — only saves discovered configs.
     """
-    sources = await _load_sources(ctx)
-    if not sources:
-        ctx.logger.warning("No sources to discover")
-        return
-
     output = _get_output_adapter(ctx)
 
-    for i, source in enumerate(sources, 1):
+    async def process(src_ctx: RunContext, source: dict[str, Any]) -> None:
         source_url = source.get("entryUrl", "unknown")
-        ctx.logger.info("─── Discovery %d/%d: %s ───", i, len(sources), source_url)
-
-        extraction_config = await _discover_source(ctx, source_url)
+        extraction_config = await _discover_source(src_ctx, source_url)
         if extraction_config:
             # Save extraction config to source
             from app.ai.discovery_mode import extraction_config_to_source_update
@@ -101,53 +85,29 @@ async def _run_discover_mode(ctx: RunContext) -> None:
             await output.save_source_config(source)
 
             # Run mapping if we have an extraction config and sample data
-            await _run_mapping_for_source(ctx, source, extraction_config, output)
+            await _run_mapping_for_source(src_ctx, source, extraction_config, output)
 
-        run_log = ctx.to_run_log()
+        run_log = src_ctx.to_run_log()
         await output.save_run(run_log)
 
+    await _process_all_sources(
+        ctx,
+        process,
+        label="Discovery",
+        empty_message="No sources to discover",
+    )
+
 
 async def _run_discover_and_scrape_mode(ctx: RunContext) -> None:
     """
     Discover + Scrape mode: discover extraction strategy, then scrape.
     """
-    sources = await _load_sources(ctx)
-    if not sources:
-        ctx.logger.warning("No sources to process")
-        return
-
-    output = _get_output_adapter(ctx)
-
-    for i, source in enumerate(sources, 1):
-        source_url = source.get("entryUrl", "unknown")
-        ctx.logger.info("═══ Source %d/%d: %s ═══", i, len(sources), source_url)
-
-        # Step 1: Discover if no extraction config
-        if not source.get("extractionType"):
-            ctx.logger.info("No extraction config — running discovery")
-            extraction_config = await _discover_source(ctx, source_url)
-            if extraction_config:
-                from app.ai.discovery_mode import extraction_config_to_source_update
-                update = extraction_config_to_source_update(extraction_config)
-                source.update(update)
-                await output.save_source_config(source)
-
-                await _run_mapping_for_source(ctx, source, extraction_config, output)
-            else:
-                ctx.logger.warning("Discovery failed for %s — skipping scrape", source_url)
-                continue
-
-        # Step 2: Scrape
-        from app.scraping.scrape_engine import run_scrape
-        records = await run_scrape(ctx, source)
-
-        if records:
-            saved = await output.save_prices(records)
-            ctx.records_saved += saved
-
-        run_log = ctx.to_run_log()
-        await output.save_run(run_log)
-        await _update_health(ctx, source, success=bool(records), records_saved=len(records))
+    await _process_all_sources(
+        ctx,
+        _discover_and_scrape_processor(_get_output_adapter(ctx)),
+        label="Source",
+        empty_message="No sources to process",
+    )
 
 
 async def _run_single_url_mode(ctx: RunContext) -> None:
@@ -198,51 +158,448 @@ async def _run_single_url_mode(ctx: RunContext) -> None:
         await _run_mapping_for_source(ctx, source, extraction_config, output)
 
     # Scrape
-    from app.scraping.scrape_engine import run_scrape
-    records = await run_scrape(ctx, source)
+    await _scrape_and_save(ctx, source, output)
+
+
+async def _run_daemon_mode(ctx: RunContext) -> None:
+    """
+    Daemon mode: stay resident and run each source on its own cadence.
+
+    Sources are (re)loaded from the input every daemon_refresh_minutes
+    and kept in a min-heap of next-due times; each due source is
+    discovered if needed and scraped, then rescheduled one cadence later
+    on success or after a backoff on failure. Runs until SIGINT/SIGTERM,
+    then waits for in-flight sources to finish.
+    """
+    from app.core.concurrency import HostLimiter
+    from app.core.scheduler import CadenceScheduler
+
+    config = ctx.config
+    if config.lease_sources:
+        ctx.logger.warning("--lease is ignored in daemon mode (use --shard to split sources)")
+
+    scheduler = CadenceScheduler(
+        interval_seconds=config.scrape_interval_minutes * 60,
+        retry_seconds=config.daemon_retry_minutes * 60,
+    )
+    limiter = HostLimiter(config.concurrency, config.per_host_concurrency)
+    process = _discover_and_scrape_processor(_get_output_adapter(ctx))
+    refresh_seconds = config.daemon_refresh_minutes * 60
+
+    # `wake` interrupts the idle wait: set on stop and whenever a run
+    # finishes, since its new due time may be earlier than the wait
+    stop = asyncio.Event()
+    wake = asyncio.Event()
+
+    def request_stop() -> None:
+        stop.set()
+        wake.set()
+
+    _install_stop_handlers(request_stop)
+
+    running: set[asyncio.Task[None]] = set()
+
+    async def run_due(source: dict[str, Any]) -> None:
+        src_ctx = await _run_source(
+            ctx,
+            limiter,
+            source,
+            process,
+            header=f"Scheduled: {source.get('entryUrl', 'unknown')}",
+        )
+        success = src_ctx.fatal_count == 0 and (
+            src_ctx.records_extracted > 0 or src_ctx.unchanged
+        )
+        due_at = scheduler.complete(source, success=success, now=time.time())
+        ctx.logger.info(
+            "Next run of %s in %.0f min (%s)",
+            source.get("entryUrl", "unknown"),
+            (due_at - time.time()) / 60,
+            "ok" if success else "retry",
+        )
+        wake.set()
+
+    ctx.logger.info(
+        "Daemon started (cadence=%d min, retry=%d min, refresh=%d min)",
+        config.scrape_interval_minutes,
+        config.daemon_retry_minutes,
+        config.daemon_refresh_minutes,
+    )
+
+    next_refresh = 0.0
+    first_load = True
+    while not stop.is_set():
+        wake.clear()
+        now = time.time()
+        if now >= next_refresh:
+            try:
+                sources = await _load_sources(ctx, report_balance=first_load)
+            except Exception as exc:
+                ctx.logger.warning("Source refresh failed, keeping current schedule: %s", exc)
+            else:
+                added, removed = scheduler.sync(sources, now=now)
+                if first_load or added or removed:
+                    ctx.logger.info(
+                        "Scheduling %d sources (+%d / -%d) | running: %d | runs so far: %d",
+                        len(scheduler),
+                        added,
+                        removed,
+                        len(running),
+                        ctx.sources_run,
+                    )
+                first_load = False
+            next_refresh = now + refresh_seconds
+
+        for source in scheduler.pop_due(now):
+            task = asyncio.create_task(run_due(source))
+            running.add(task)
+            task.add_done_callback(running.discard)
+
+        wait = next_refresh - now
+        until_due = scheduler.seconds_until_next(now)
+        if until_due is not None:
+            wait = min(wait, until_due)
+        try:
+            await asyncio.wait_for(wake.wait(), timeout=max(wait, 0.1))
+        except asyncio.TimeoutError:
+            pass
+
+    if running:
+        ctx.logger.info("Stopping daemon — waiting for %d running sources", len(running))
+        await asyncio.gather(*running, return_exceptions=True)
+    ctx.logger.info("Daemon stopped")
+
+
+async def _run_compact_mode(ctx: RunContext) -> None:
+    """
+    Compact mode: merge the small files appends leave in each partition
+    of the Parquet dataset. Safe to run from cron alongside scrapes.
+    """
+    from pathlib import Path
+
+    from app.outputs.parquet_output import compact_dataset
+
+    root = Path(ctx.config.parquet_output_dir)
+    if not root.is_dir():
+        ctx.logger.warning("No Parquet dataset at %s — nothing to compact", root)
+        return
+
+    try:
+        await asyncio.to_thread(compact_dataset, root)
+    except ImportError:
+        ctx.logger.error("pyarrow not installed — compaction needs it (pip install pyarrow)")
+
+
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+
+def _discover_and_scrape_processor(
+    output: Any,
+) -> Callable[[RunContext, dict[str, Any]], Awaitable[None]]:
+    """Build the per-source step for discover_and_scrape and daemon modes."""
+
+    async def process(src_ctx: RunContext, source: dict[str, Any]) -> None:
+        source_url = source.get("entryUrl", "unknown")
+
+        # Step 1: Discover if no extraction config
+        if not source.get("extractionType"):
+            src_ctx.logger.info("No extraction config — running discovery")
+            extraction_config = await _discover_source(src_ctx, source_url)
+            if extraction_config:
+                from app.ai.discovery_mode import extraction_config_to_source_update
+                update = extraction_config_to_source_update(extraction_config)
+                source.update(update)
+                await output.save_source_config(source)
+
+                await _run_mapping_for_source(src_ctx, source, extraction_config, output)
+            else:
+                src_ctx.logger.warning("Discovery failed for %s — skipping scrape", source_url)
+                return
+
+        # Step 2: Scrape
+        await _scrape_and_save(src_ctx, source, output)
+
+    return process
+
+
+def _install_stop_handlers(on_stop: Callable[[], None]) -> None:
+    """Call `on_stop` on SIGINT/SIGTERM (where the loop supports signal handlers)."""
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, on_stop)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+
+async def _process_all_sources(
+    ctx: RunContext,
+    process: Callable[[RunContext, dict[str, Any]], Awaitable[None]],
+    *,
+    label: str,
+    empty_message: str,
+) -> None:
+    """Load (or lease) the configured sources and run `process` on each."""
+    if ctx.config.lease_sources:
+        await _run_leased_sources(ctx, process, label=label, empty_message=empty_message)
+        return
+
+    sources = await _load_sources(ctx)
+    if not sources:
+        ctx.logger.warning(empty_message)
+        return
+
+    await _run_sources(ctx, sources, process, label=label)
+
+
+async def _run_leased_sources(
+    ctx: RunContext,
+    process: Callable[[RunContext, dict[str, Any]], Awaitable[None]],
+    *,
+    label: str,
+    empty_message: str,
+) -> None:
+    """
+    Lease sources batch by batch until none are left to claim.
+
+    Other agents running the same command claim disjoint batches, so
+    the work is split across machines without a coordinator.
+    """
+    if ctx.db is None:
+        ctx.logger.error("Source leasing requires a MongoDB connection")
+        return
+
+    from app.inputs.lease_input import LeaseInput, default_worker_id
+
+    leases = LeaseInput(
+        ctx.db,
+        owner=ctx.config.worker_id or default_worker_id(),
+        batch_size=ctx.config.lease_batch_size,
+        lease_seconds=ctx.config.lease_seconds,
+        min_interval_minutes=ctx.config.lease_min_interval_minutes,
+    )
+    ctx.logger.info("Leasing sources as %s", leases.owner)
+
+    async def leased_process(src_ctx: RunContext, source: dict[str, Any]) -> None:
+        try:
+            await process(src_ctx, source)
+        finally:
+            await leases.release(source)
+
+    claimed = 0
+    async with leases.heartbeat():
+        while batch := await leases.load_sources():
+            claimed += len(batch)
+            ctx.logger.info("Leased %d sources (%d so far)", len(batch), claimed)
+            await _run_sources(ctx, batch, leased_process, label=label)
 
-    if records:
-        saved = await output.save_prices(records)
-        ctx.records_saved += saved
+    if not claimed:
+        ctx.logger.warning(empty_message)
+
+
+async def _run_sources(
+    ctx: RunContext,
+    sources: list[dict[str, Any]],
+    process: Callable[[RunContext, dict[str, Any]], Awaitable[None]],
+    *,
+    label: str,
+) -> None:
+    """
+    Run `process` for every source, up to config.concurrency at once.
+
+    Each source gets its own child context (merged back when it finishes)
+    and holds a per-host slot, so sources on one portal are capped at
+    config.per_host_concurrency regardless of the global limit.
+    """
+    from app.core.concurrency import HostLimiter
+
+    limiter = HostLimiter(ctx.config.concurrency, ctx.config.per_host_concurrency)
+    total = len(sources)
+
+    if ctx.config.concurrency > 1:
+        ctx.logger.info(
+            "Processing %d sources (concurrency=%d, per host=%d)",
+            total,
+            ctx.config.concurrency,
+            ctx.config.per_host_concurrency,
+        )
+
+    async def _guarded(index: int, source: dict[str, Any]) -> None:
+        source_url = source.get("entryUrl", "unknown")
+        await _run_source(
+            ctx,
+            limiter,
+            source,
+            process,
+            header=f"{label} {index}/{total}: {source_url}",
+        )
+
+    await asyncio.gather(*(_guarded(i, s) for i, s in enumerate(sources, 1)))
+
+
+async def _run_source(
+    ctx: RunContext,
+    limiter: Any,
+    source: dict[str, Any],
+    process: Callable[[RunContext, dict[str, Any]], Awaitable[None]],
+    *,
+    header: str,
+) -> RunContext:
+    """
+    Run `process` for one source in a forked context under a host slot.
+
+    Unhandled errors are recorded as fatal on the child, which is merged
+    into `ctx` and returned so callers can inspect the outcome.
+    """
+    from app.core.concurrency import source_host_url
+
+    source_url = source.get("entryUrl", "unknown")
+    async with limiter.slot(source_host_url(source)):
+        ctx.logger.info("─── %s ───", header)
+        src_ctx = ctx.fork(source)
+        try:
+            await process(src_ctx, source)
+        except Exception as exc:
+            src_ctx.add_error(source_url, f"Unhandled error: {exc}", fatal=True)
+            ctx.logger.exception("Unhandled error while processing %s", source_url)
+        finally:
+            ctx.merge(src_ctx)
+    return src_ctx
+
+
+async def _scrape_and_save(
+    ctx: RunContext,
+    source: dict[str, Any],
+    output: Any,
+) -> None:
+    """Stream a source's records into `output`, then save the run log and health."""
+    from app.scraping.scrape_engine import scrape_into
+
+    produced = await scrape_into(ctx, source, output)
+
+    # Runs with nothing new (unchanged document, or nothing past the
+    # incremental watermark) are healthy, not empty
+    up_to_date = (
+        not produced
+        and (ctx.unchanged or ctx.records_skipped > 0)
+        and ctx.fatal_count == 0
+    )
+    if up_to_date:
+        ctx.logger.info("Nothing new since the last run — source is up to date")
 
     run_log = ctx.to_run_log()
     await output.save_run(run_log)
-    await _update_health(ctx, source, success=bool(records), records_saved=len(records))
+    await _save_rate_limit(ctx, source)
 
+    # A host outage isn't the source's fault; don't push it toward BROKEN
+    if ctx.circuit_open and not produced:
+        ctx.logger.warning("Host unavailable (circuit open) — health left unchanged")
+        return
+
+    await _update_health(
+        ctx,
+        source,
+        success=bool(produced) or up_to_date,
+        records_saved=produced,
+        up_to_date=up_to_date,
+    )
 
-# ── Helpers ──────────────────────────────────────────────────────────────────
 
+async def _load_sources(
+    ctx: RunContext,
+    *,
+    report_balance: bool = True,
+) -> list[dict[str, Any]]:
+    """Load sources (this job's shard only, if sharded) based on the input mode."""
+    shard = ctx.config.shard
 
-async def _load_sources(ctx: RunContext) -> list[dict[str, Any]]:
-    """Load sources based on the configured input mode."""
     if ctx.config.input_mode == InputMode.CSV:
         from app.inputs.csv_input import CsvInput
         adapter = CsvInput(ctx.config.csv_input_path)
-        return await adapter.load_sources()
+    else:
+        # Default: MongoDB
+        if ctx.db is None:
+            ctx.logger.error("INPUT_MODE=mongo but no database connection")
+            return []
 
-    # Default: MongoDB
-    if ctx.db is None:
-        ctx.logger.error("INPUT_MODE=mongo but no database connection")
-        return []
+        from app.inputs.db_input import DbInput
+        adapter = DbInput(ctx.db)
+
+    sources = await adapter.load_sources(shard=shard)
+
+    if shard is not None and report_balance:
+        await _report_shard_balance(ctx, adapter, shard)
+
+    return sources
+
+
+async def _report_shard_balance(
+    ctx: RunContext,
+    adapter: Any,
+    shard: tuple[int, int],
+) -> None:
+    """Log the estimated load of every shard, using run history when available."""
+    from app.core.sharding import estimate_shard_loads, format_shard_report
+
+    try:
+        members = await adapter.shard_members()
+        durations = await adapter.historical_durations()
+    except Exception as exc:
+        ctx.logger.warning("Could not compute shard balance: %s", exc)
+        return
 
-    from app.inputs.db_input import DbInput
-    adapter = DbInput(ctx.db)
-    return await adapter.load_sources()
+    index, count = shard
+    loads = estimate_shard_loads(members, durations, count)
+    ctx.logger.info("Shard %d/%d load balance:", index, count)
+    for line in format_shard_report(loads, index):
+        ctx.logger.info(line)
 
 
 def _get_output_adapter(ctx: RunContext) -> Any:
-    """Get the appropriate output adapter."""
-    if ctx.config.input_mode == InputMode.CSV:
-        from app.outputs.csv_output import CsvOutput
-        return CsvOutput(ctx.config.csv_output_dir)
+    """Get the output adapter for config.output_mode."""
+    mode = ctx.config.output_mode
+
+    if mode == OutputMode.PARQUET:
+        # Prices go to Parquet; source configs and run logs where they'd go otherwise
+        from app.outputs.parquet_output import ParquetOutput
+        return ParquetOutput(ctx.config.parquet_output_dir, _get_auto_output_adapter(ctx))
+
+    if mode == OutputMode.CSV:
+        return _get_csv_output_adapter(ctx)
+
+    if mode == OutputMode.MONGO and ctx.db is None:
+        ctx.logger.warning("--output mongo without a MongoDB connection; writing CSV instead")
+
+    return _get_auto_output_adapter(ctx)
+
+
+def _get_auto_output_adapter(ctx: RunContext) -> Any:
+    """CSV with CSV input, else MongoDB when connected, else CSV."""
+    if ctx.config.input_mode == InputMode.CSV and ctx.config.output_mode != OutputMode.MONGO:
+        return _get_csv_output_adapter(ctx)
 
     if ctx.db is not None:
         from app.outputs.db_output import DbOutput
         return DbOutput(ctx.db)
 
     # Fallback to CSV output
+    return _get_csv_output_adapter(ctx)
+
+
+def _get_csv_output_adapter(ctx: RunContext) -> Any:
+    """Local file output in the configured format."""
     from app.outputs.csv_output import CsvOutput
-    return CsvOutput(ctx.config.csv_output_dir)
+
+    config = ctx.config
+    output = CsvOutput(
+        config.csv_output_dir,
+        file_format=config.file_format,
+        compression=config.file_compression,
+        rotate_bytes=config.file_rotate_mb * 1024 * 1024,
+    )
+    # Closed (its JSON Lines writer stopped) when the agent shuts down
+    ctx.outputs.append(output)
+    return output
 
 
 async def _discover_source(ctx: RunContext, entry_url: str) -> Any:
@@ -303,12 +660,31 @@ async def _run_mapping_for_source(
         ctx.logger.info("Schema mapping saved for %s", source.get("entryUrl"))
 
 
+async def _save_rate_limit(ctx: RunContext, source: dict[str, Any]) -> None:
+    """Persist the rate learned for the source's host so the next run starts there."""
+    source_id = str(source.get("_id", ""))
+    if not source_id or ctx.db is None:
+        return
+
+    from app.db.sources_repo import SourcesRepo
+    from app.scraping.rate_limit import learned_rate
+    from app.scraping.scrape_engine import fetch_url
+    from app.utils.url_utils import extract_base_url
+
+    url = fetch_url(source)
+    rate = learned_rate(ctx, url)
+    if rate is None:
+        return
+    await SourcesRepo(ctx.db).update_rate_limit(source_id, extract_base_url(url), rate)
+
+
 async def _update_health(
     ctx: RunContext,
     source: dict[str, Any],
     *,
     success: bool,
     records_saved: int = 0,
+    up_to_date: bool = False,
 ) -> None:
     """Update health status for a source."""
     source_id = str(source.get("_id", ""))
@@ -316,4 +692,10 @@ async def _update_health(
         return
 
     from app.monitoring.health import update_health
-    await update_health(ctx, source_id, success=success, records_saved=records_saved)
+    await update_health(
+        ctx,
+        source_id,
+        success=success,
+        records_saved=records_saved,
+        up_to_date=up_to_date,
+    )
@@ -0,0 +1,176 @@
+"""
+Cadence scheduler for daemon mode.
+
+Keeps a min-heap of next-due times, one entry per source. A source's
+first due time comes from its health metadata on `sources`: healthy
+sources are due one cadence after `lastSuccessAt`, STALE ones one retry
+delay after their last health update. Sources that are already overdue
+(or have never run) are spread over a short catch-up window instead of
+all firing at startup.
+"""
+
+from __future__ import annotations
+
+import heapq
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+from app.core.constants import DAEMON_CATCHUP_SPREAD_MINUTES, HEALTH_STALE
+
+
+@dataclass(order=True)
+class _HeapEntry:
+    """Heap item; stale entries are skipped via the version check."""
+
+    due_at: float
+    version: int
+    source_id: str = field(compare=False)
+
+
+@dataclass
+class _SourceState:
+    """Scheduling state for one source."""
+
+    source: dict[str, Any]
+    version: int = 0
+    failures: int = 0
+    running: bool = False
+
+
+class CadenceScheduler:
+    """
+    Decide when each source is next due.
+
+    Cadence is the source's `scrapeIntervalMinutes` or the default
+    interval. Failed runs are retried with exponential backoff starting
+    at `retry_seconds`, capped at the source's cadence.
+    """
+
+    def __init__(self, *, interval_seconds: float, retry_seconds: float) -> None:
+        self._interval = interval_seconds
+        self._retry = retry_seconds
+        self._heap: list[_HeapEntry] = []
+        self._states: dict[str, _SourceState] = {}
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    # ── Source set ───────────────────────────────────────────────────────
+
+    def sync(self, sources: list[dict[str, Any]], *, now: float) -> tuple[int, int]:
+        """
+        Replace the scheduled source set.
+
+        New sources get an initial due time; known sources keep their
+        schedule but pick up config changes; missing ones are dropped.
+        Returns (added, removed).
+        """
+        incoming = {_source_key(s): s for s in sources}
+        removed = [sid for sid in self._states if sid not in incoming]
+        for source_id in removed:
+            del self._states[source_id]
+
+        added = 0
+        for source_id, source in incoming.items():
+            state = self._states.get(source_id)
+            if state is not None:
+                state.source = source
+                continue
+            self._states[source_id] = _SourceState(source=source)
+            self._push(source_id, self._initial_due(source_id, source, now))
+            added += 1
+
+        return added, len(removed)
+
+    # ── Scheduling ───────────────────────────────────────────────────────
+
+    def pop_due(self, now: float) -> list[dict[str, Any]]:
+        """Remove and return every source due at `now` that isn't running."""
+        due: list[dict[str, Any]] = []
+        while self._heap and self._heap[0].due_at <= now:
+            entry = heapq.heappop(self._heap)
+            state = self._states.get(entry.source_id)
+            if state is None or state.version != entry.version or state.running:
+                continue
+            state.running = True
+            due.append(state.source)
+        return due
+
+    def seconds_until_next(self, now: float) -> float | None:
+        """Seconds until the earliest live entry is due (None if nothing is scheduled)."""
+        while self._heap:
+            entry = self._heap[0]
+            state = self._states.get(entry.source_id)
+            if state is None or state.version != entry.version:
+                heapq.heappop(self._heap)
+                continue
+            return max(0.0, entry.due_at - now)
+        return None
+
+    def complete(self, source: dict[str, Any], *, success: bool, now: float) -> float:
+        """
+        Reschedule a source after a run. Returns its next due time.
+        """
+        source_id = _source_key(source)
+        state = self._states.get(source_id)
+        if state is None:
+            return now
+
+        state.running = False
+        interval = self._interval_for(state.source)
+        if success:
+            state.failures = 0
+            due_at = now + interval
+        else:
+            state.failures += 1
+            due_at = now + min(interval, self._retry * 2 ** (state.failures - 1))
+
+        self._push(source_id, due_at)
+        return due_at
+
+    # ── Internals ────────────────────────────────────────────────────────
+
+    def _push(self, source_id: str, due_at: float) -> None:
+        state = self._states[source_id]
+        state.version += 1
+        heapq.heappush(self._heap, _HeapEntry(due_at, state.version, source_id))
+
+    def _interval_for(self, source: dict[str, Any]) -> float:
+        minutes = source.get("scrapeIntervalMinutes")
+        if isinstance(minutes, (int, float)) and minutes > 0:
+            return minutes * 60
+        return self._interval
+
+    def _initial_due(self, source_id: str, source: dict[str, Any], now: float) -> float:
+        """First due time from health metadata, or a spread catch-up slot."""
+        interval = self._interval_for(source)
+        if source.get("healthStatus") == HEALTH_STALE:
+            last = _timestamp(source.get("healthUpdatedAt"))
+            wait = min(interval, self._retry)
+        else:
+            last = _timestamp(source.get("lastSuccessAt"))
+            wait = interval
+
+        if last is not None and last + wait > now:
+            return last + wait
+
+        # Never run or overdue: a stable slot in the catch-up window
+        spread = min(interval, DAEMON_CATCHUP_SPREAD_MINUTES * 60)
+        fraction = zlib.crc32(source_id.encode("utf-8")) / 0xFFFFFFFF
+        return now + fraction * spread
+
+
+def _source_key(source: dict[str, Any]) -> str:
+    """Scheduler key: the source _id, falling back to its entry URL."""
+    return str(source.get("_id") or source.get("entryUrl", ""))
+
+
+def _timestamp(value: Any) -> float | None:
+    """A stored datetime as a UNIX timestamp (naive datetimes are UTC)."""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
@@ -0,0 +1,95 @@
+"""
+Static source sharding.
+
+Splits sources across independent cron jobs (`--shard i/n`) by a stable
+hash of the normalized entry URL, with no coordination between jobs.
+The same hash is stored on source documents as `shardHash` so MongoDB
+can do the filtering with `$mod`.
+"""
+
+from __future__ import annotations
+
+import statistics
+import zlib
+from dataclasses import dataclass
+from typing import Iterable
+
+from app.utils.url_utils import normalize_url
+
+
+def shard_hash(entry_url: str) -> int:
+    """
+    Stable 32-bit hash of a source's entry URL.
+
+    Uses CRC32 (not hash(), which is salted per process) over the
+    normalized URL, so trivially different spellings land together.
+    """
+    return zlib.crc32(normalize_url(entry_url).encode("utf-8"))
+
+
+def in_shard(entry_url: str, shard: tuple[int, int]) -> bool:
+    """Check whether a source belongs to shard (index, count)."""
+    index, count = shard
+    return shard_hash(entry_url) % count == index
+
+
+@dataclass(frozen=True, slots=True)
+class ShardLoad:
+    """Estimated work assigned to one shard."""
+
+    index: int
+    sources: int
+    estimated_seconds: float
+    with_history: int
+
+
+def estimate_shard_loads(
+    members: Iterable[tuple[str, int]],
+    durations: dict[str, float],
+    count: int,
+) -> list[ShardLoad]:
+    """
+    Estimate per-shard load from (source_id, shard_hash) pairs.
+
+    Sources with a historical average duration use it; the rest are
+    assumed to take the median known duration (or 1s with no history,
+    which turns the estimate into a plain source count).
+    """
+    members = list(members)
+    known = [durations[sid] for sid, _ in members if sid in durations]
+    fallback = statistics.median(known) if known else 1.0
+
+    sources = [0] * count
+    seconds = [0.0] * count
+    with_history = [0] * count
+
+    for source_id, hash_value in members:
+        index = hash_value % count
+        sources[index] += 1
+        if source_id in durations:
+            seconds[index] += durations[source_id]
+            with_history[index] += 1
+        else:
+            seconds[index] += fallback
+
+    return [
+        ShardLoad(i, sources[i], seconds[i], with_history[i])
+        for i in range(count)
+    ]
+
+
+def format_shard_report(loads: list[ShardLoad], own_index: int) -> list[str]:
+    """Render shard loads as log lines, marking this job's shard."""
+    total = sum(load.estimated_seconds for load in loads)
+    mean = total / len(loads) if loads else 0.0
+    peak = max((load.estimated_seconds for load in loads), default=0.0)
+
+    lines = [
+        f"{'→' if load.index == own_index else ' '} shard {load.index}/{len(loads)}: "
+        f"{load.sources} sources, ~{load.estimated_seconds:.0f}s "
+        f"({load.with_history} with history)"
+        for load in loads
+    ]
+    if mean > 0:
+        lines.append(f"  imbalance (max/mean): {peak / mean:.2f}")
+    return lines
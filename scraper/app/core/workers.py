@@ -0,0 +1,202 @@
+"""
+Worker process pool for CPU-heavy parsing.
+
+With --workers N the event loop only does network I/O: HTML pages and
+files are fetched by the coordinator and handed to a process pool as
+raw payloads, which parse and normalize them and send back columnar
+PriceBatches for writing.
+
+Raw records crossing the process boundary are packed as (keys, rows)
+segments instead of dicts, so each key string is pickled once per
+segment rather than once per record; normalized PriceBatches already
+store each field name once per block.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, TypeVar
+
+from app.core.price_batch import PriceBatch
+
+if TYPE_CHECKING:
+    from app.core.context import RunContext
+
+# A run of consecutive records sharing the same keys: (keys, rows)
+Segment = tuple[tuple[str, ...], list[tuple[Any, ...]]]
+
+T = TypeVar("T")
+
+
+# ── Packing ──────────────────────────────────────────────────────────────────
+
+
+def pack_records(records: list[dict[str, Any]]) -> list[Segment]:
+    """Pack records into key/row segments, preserving order."""
+    segments: list[Segment] = []
+    keys: tuple[str, ...] | None = None
+    rows: list[tuple[Any, ...]] = []
+
+    for record in records:
+        record_keys = tuple(record)
+        if record_keys != keys:
+            rows = []
+            keys = record_keys
+            segments.append((keys, rows))
+        rows.append(tuple(record.values()))
+
+    return segments
+
+
+def unpack_records(segments: list[Segment]) -> list[dict[str, Any]]:
+    """Inverse of pack_records()."""
+    return [dict(zip(keys, row)) for keys, rows in segments for row in rows]
+
+
+# ── Jobs ─────────────────────────────────────────────────────────────────────
+
+
+class ErrorSink:
+    """Collects errors inside a worker so the coordinator can replay them."""
+
+    def __init__(self) -> None:
+        self.errors: list[tuple[str, str, bool]] = []
+
+    def add_error(self, url: str, error: str, *, fatal: bool = False) -> None:
+        """Record an error (same signature as RunContext.add_error)."""
+        self.errors.append((url, error, fatal))
+
+
+@dataclass(frozen=True, slots=True)
+class ParseJob:
+    """
+    Everything a worker needs to turn one payload into normalized records.
+
+    kind is "html", a file type ("pdf", "excel", "csv") or "records"
+    (already-extracted API records, packed as segments). File payloads
+    are the path of the downloaded file, which outlives the job.
+    month_first is the source's day / month order as the coordinator's
+    plan has decided it (None while undecided), so every worker reads
+    the source's dates the same way.
+    """
+
+    kind: str
+    url: str
+    payload: Any
+    schema_mapping: dict[str, str] = field(default_factory=dict)
+    conversions: dict[str, dict[str, Any]] = field(default_factory=dict)
+    source_id: str = ""
+    source_name: str = ""
+    selector: str = ""
+    table_index: int = 0
+    month_first: bool | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ParseResult:
+    """Normalized output of a ParseJob, and the day / month order it used."""
+
+    raw_count: int
+    batch: PriceBatch
+    errors: list[tuple[str, str, bool]]
+    month_first: bool | None = None
+
+    def replay_errors(self, ctx: RunContext) -> None:
+        """Record the worker's errors on the coordinator's context."""
+        for url, error, fatal in self.errors:
+            ctx.add_error(url, error, fatal=fatal)
+
+
+def run_parse_job(job: ParseJob) -> ParseResult:
+    """
+    Parse and normalize one payload. Runs inside a worker process.
+    """
+    from app.scraping.normalizer import compile_plan
+
+    sink = ErrorSink()
+
+    if job.kind == "records":
+        raw_records = unpack_records(job.payload)
+    elif job.kind == "html":
+        from app.scraping.html_scraper import extract_table_from_html
+
+        raw_records = extract_table_from_html(
+            job.payload,
+            page_url=job.url,
+            selector=job.selector,
+            table_index=job.table_index,
+            ctx=sink,
+        )
+    else:
+        from app.scraping.file_scraper import extract_file
+
+        raw_records = extract_file(job.payload, job.kind, job.url, sink)
+
+    month_first = job.month_first
+    if raw_records and job.schema_mapping:
+        plan = compile_plan(
+            job.schema_mapping,
+            job.conversions,
+            source_id=job.source_id,
+            source_name=job.source_name,
+        )
+        # The coordinator's decision overrides this process's cached one
+        if month_first is not None:
+            plan.dates.month_first = month_first
+        normalized = plan.normalize(raw_records)
+        month_first = plan.dates.month_first
+    else:
+        normalized = PriceBatch.from_records(raw_records)
+
+    return ParseResult(
+        raw_count=len(raw_records),
+        batch=normalized,
+        errors=sink.errors,
+        month_first=month_first,
+    )
+
+
+# ── Pool ─────────────────────────────────────────────────────────────────────
+
+
+class WorkerPool:
+    """Process pool that runs ParseJobs off the event loop."""
+
+    def __init__(self, workers: int) -> None:
+        # spawn, not fork: the coordinator has a running event loop and
+        # Motor's background threads, neither of which survive a fork.
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self.size = workers
+
+    async def run(self, job: ParseJob) -> ParseResult:
+        """Run a job in a worker process and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, run_parse_job, job)
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> asyncio.Future[T]:
+        """
+        Queue a call to a top-level function in a worker process.
+
+        Cancelling the returned future drops the call if it hasn't started.
+        A result or error nobody awaits is discarded silently.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, fn, *args)
+        future.add_done_callback(_discard_result)
+        return future
+
+    def shutdown(self) -> None:
+        """Stop the worker processes (waits for in-flight jobs)."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _discard_result(future: asyncio.Future[Any]) -> None:
+    # Marks the exception as retrieved so an abandoned future doesn't log it
+    if not future.cancelled():
+        future.exception()
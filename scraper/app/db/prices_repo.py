@@ -1,17 +1,50 @@
 """
 Prices collection repository.
 
-Handles bulk inserts of normalized price records plus
+Handles idempotent bulk upserts of normalized price records plus
 upserts for the derived crops, states, and mandis collections
 that the Express API serves to the frontend.
+
+A price record is identified by its natural key (sourceId, date,
+cropName, mandiName), enforced by a unique index, so re-scraping a
+source updates its records in place instead of duplicating them.
 """
 
 from __future__ import annotations
 
+import logging
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+
+from app.core.constants import PRICE_NATURAL_KEY, PRICE_UPSERT_CHUNK_SIZE
+
+logger = logging.getLogger("mandi-agent")
+
+_DUPLICATE_KEY = 11000
+
+# Only records with the whole natural key (as strings) are unique-indexed
+_NATURAL_KEY_FILTER = {name: {"$type": "string"} for name in PRICE_NATURAL_KEY}
+
+
+@dataclass(frozen=True, slots=True)
+class UpsertCounts:
+    """Outcome of a bulk upsert, per record."""
+
+    inserted: int = 0  # new documents
+    updated: int = 0  # existing documents whose fields changed
+    unchanged: int = 0  # existing documents already holding these values
+    duplicates: int = 0  # records superseded by a later one with the same key in the batch
+    failed: int = 0  # records the server rejected
+
+    @property
+    def saved(self) -> int:
+        """Records now stored as given (inserted, updated or already there)."""
+        return self.inserted + self.updated + self.unchanged
 
 
 class PricesRepo:
@@ -25,35 +58,77 @@ class PricesRepo:
 
     # ── Prices ───────────────────────────────────────────────────────────
 
-    async def bulk_insert(self, records: list[dict[str, Any]]) -> int:
+    async def bulk_upsert(self, records: list[dict[str, Any]]) -> UpsertCounts:
         """
-        Insert multiple price records.
+        Upsert price records by natural key, in unordered bulk_writes of
+        PRICE_UPSERT_CHUNK_SIZE operations.
 
-        Skips duplicates by checking (cropName, mandiName, date) uniqueness.
-        Returns the number of newly inserted documents.
+        A record's fields are set on the document matching its key;
+        updatedAt only moves when one of them changes. Records without a
+        full key (e.g. unmapped raw rows) are inserted as they are. Upserts
+        that lose a race with another writer inserting the same key
+        are retried once, as updates.
         """
         if not records:
-            return 0
+            return UpsertCounts()
 
         now = datetime.now(timezone.utc)
+        keyed: dict[tuple[str, ...], UpdateOne] = {}
+        operations: list[UpdateOne | InsertOne] = []
         for rec in records:
-            rec.setdefault("createdAt", now)
-            rec.setdefault("updatedAt", now)
+            key = tuple(rec.get(name) for name in PRICE_NATURAL_KEY)
+            if all(isinstance(value, str) for value in key):
+                keyed[key] = _upsert_operation(rec, now)
+            else:
+                operations.append(InsertOne({"createdAt": now, "updatedAt": now, **rec}))
+        duplicates = len(records) - len(operations) - len(keyed)
+        operations.extend(keyed.values())
+
+        totals = {"inserted": 0, "updated": 0, "unchanged": 0}
+        failed = 0
+        for start in range(0, len(operations), PRICE_UPSERT_CHUNK_SIZE):
+            chunk = operations[start:start + PRICE_UPSERT_CHUNK_SIZE]
+            counts, errors = await self._bulk_write(chunk)
+
+            # An upsert racing another writer for a new key fails with a
+            # duplicate key error; the document exists now, so retry once
+            raced = {
+                error["index"]
+                for error in errors
+                if error.get("code") == _DUPLICATE_KEY and isinstance(chunk[error["index"]], UpdateOne)
+            }
+            if raced:
+                errors = [error for error in errors if error["index"] not in raced]
+                retry_counts, retry_errors = await self._bulk_write([chunk[i] for i in sorted(raced)])
+                for name, count in retry_counts.items():
+                    counts[name] += count
+                errors += retry_errors
+
+            for name, count in counts.items():
+                totals[name] += count
+            if errors:
+                failed += len(errors)
+                logger.warning(
+                    "%d price writes failed (first: %s)",
+                    len(errors), errors[0].get("errmsg", "unknown error"),
+                )
+
+        return UpsertCounts(duplicates=duplicates, failed=failed, **totals)
 
-        # Use ordered=False so one duplicate doesn't abort the batch
+    async def _bulk_write(
+        self, operations: list[UpdateOne | InsertOne]
+    ) -> tuple[dict[str, int], list[dict[str, Any]]]:
+        """One unordered bulk_write: (inserted/updated/unchanged counts, write errors)."""
         try:
-            result = await self._prices.insert_many(records, ordered=False)
-            return len(result.inserted_ids)
-        except Exception:
-            # BulkWriteError on duplicates -- count what did get inserted
-            # by checking inserted_count from the exception details
-            import pymongo.errors
-
-            try:
-                result = await self._prices.insert_many(records, ordered=False)
-                return len(result.inserted_ids)
-            except pymongo.errors.BulkWriteError as bwe:
-                return bwe.details.get("nInserted", 0)
+            result = (await self._prices.bulk_write(operations, ordered=False)).bulk_api_result
+        except BulkWriteError as exc:
+            result = exc.details
+        counts = {
+            "inserted": result.get("nInserted", 0) + result.get("nUpserted", 0),
+            "updated": result.get("nModified", 0),
+            "unchanged": result.get("nMatched", 0) - result.get("nModified", 0),
+        }
+        return counts, result.get("writeErrors", [])
 
     async def find_by_filters(
         self,
@@ -187,7 +262,18 @@ class PricesRepo:
         return counts
 
     async def ensure_indexes(self) -> None:
-        """Create indexes for efficient querying."""
+        """Create indexes for efficient querying and the prices natural key."""
+        try:
+            await self._prices.create_index(
+                [(name, 1) for name in PRICE_NATURAL_KEY],
+                unique=True,
+                partialFilterExpression=_NATURAL_KEY_FILTER,
+                name="prices_natural_key",
+            )
+        except OperationFailure as exc:
+            # e.g. duplicates left by earlier insert-only runs; upserts
+            # still match by key, but concurrent writers may duplicate
+            logger.warning("Could not create the prices natural-key unique index: %s", exc)
         await self._prices.create_index([("date", -1)])
         await self._prices.create_index([("cropName", 1), ("mandiName", 1), ("date", -1)])
         await self._prices.create_index([("stateName", 1)])
@@ -197,3 +283,51 @@ class PricesRepo:
         await self._mandis.create_index(
             [("name", 1), ("stateName", 1)], unique=True
         )
+
+
+# ── Upsert Operations ────────────────────────────────────────────────────────
+
+
+def _upsert_operation(record: dict[str, Any], now: datetime) -> UpdateOne:
+    """
+    An upsert of `record` onto the document with its natural key.
+
+    An update pipeline, so updatedAt can be kept when every field
+    already holds the record's value — the server then counts the
+    document as matched but not modified.
+    """
+    key = {name: record[name] for name in PRICE_NATURAL_KEY}
+    fields = {
+        name: value
+        for name, value in record.items()
+        if name not in key and name not in ("_id", "createdAt", "updatedAt")
+    }
+    same = {"$and": [{"$eq": [_field_value(name), {"$literal": value}]} for name, value in fields.items()]}
+
+    pipeline: list[dict[str, Any]] = [{"$set": {
+        "createdAt": {"$ifNull": ["$createdAt", now]},
+        "updatedAt": {"$cond": [same, "$updatedAt", now]},
+    }}]
+    plain = {name: {"$literal": value} for name, value in fields.items() if _is_plain(name)}
+    if plain:
+        pipeline.append({"$set": plain})
+    # Names $set would read as paths or operators ("Rs./Qtl") are set verbatim
+    for name, value in fields.items():
+        if not _is_plain(name):
+            pipeline.append({"$replaceWith": {"$setField": {
+                "field": {"$literal": name},
+                "input": "$$ROOT",
+                "value": {"$literal": value},
+            }}})
+    return UpdateOne(key, pipeline, upsert=True)
+
+
+def _field_value(name: str) -> Any:
+    """Aggregation expression for a top-level field of the current document."""
+    if _is_plain(name):
+        return f"${name}"
+    return {"$getField": {"field": {"$literal": name}, "input": "$$ROOT"}}
+
+
+def _is_plain(name: str) -> bool:
+    return "." not in name and not name.startswith("$")
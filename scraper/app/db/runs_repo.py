@@ -7,7 +7,7 @@ errors, and success/failure state.
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
@@ -78,3 +78,21 @@ class RunsRepo:
         )
         runs = await cursor.to_list(length=last_n)
         return sum(1 for r in runs if not r.get("success", False))
+
+    async def average_durations(self, *, last_days: int = 30) -> dict[str, float]:
+        """
+        Average run duration per source over the last N days.
+
+        Returns {source_id: seconds}; sources without runs are absent.
+        """
+        since = datetime.now(timezone.utc) - timedelta(days=last_days)
+        pipeline = [
+            {"$match": {"createdAt": {"$gte": since}, "sourceId": {"$nin": ["", None]}}},
+            {"$group": {"_id": "$sourceId", "avg": {"$avg": "$durationSeconds"}}},
+        ]
+        cursor = self._col.aggregate(pipeline)
+        return {
+            doc["_id"]: doc["avg"]
+            async for doc in cursor
+            if doc.get("avg") is not None
+        }
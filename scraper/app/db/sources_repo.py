@@ -7,14 +7,21 @@ portal configurations, extraction strategies, and health metadata.
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
-from typing import Any
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
 
+from app.core.sharding import shard_hash
 from app.utils.url_utils import normalize_url
 
 
+# Fields owned by the lease protocol / rate limiter; never written back from a source dict
+_LEASE_FIELDS = ("leaseOwner", "leaseExpiresAt", "leaseHeartbeatAt", "leaseReleasedAt")
+_RUNTIME_FIELDS = (*_LEASE_FIELDS, "rateLimit")
+
+
 class SourcesRepo:
     """Async repository for the `sources` collection."""
 
@@ -43,11 +50,52 @@ class SourcesRepo:
             ]
         })
 
-    async def find_active(self) -> list[dict[str, Any]]:
-        """Return sources that are not marked as BROKEN."""
-        cursor = self._col.find({"healthStatus": {"$ne": "BROKEN"}})
+    async def find_active(
+        self,
+        *,
+        shard: tuple[int, int] | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Return sources that are not marked as BROKEN.
+
+        With shard=(index, count), only sources whose shardHash falls in
+        that shard are returned (run backfill_shard_hashes() first).
+        """
+        query: dict[str, Any] = {"healthStatus": {"$ne": "BROKEN"}}
+        if shard is not None:
+            index, count = shard
+            query["shardHash"] = {"$mod": [count, index]}
+
+        cursor = self._col.find(query)
         return await cursor.to_list(length=None)
 
+    async def find_active_shard_members(self) -> list[tuple[str, int]]:
+        """Return (source_id, shardHash) for every active source."""
+        cursor = self._col.find(
+            {"healthStatus": {"$ne": "BROKEN"}, "shardHash": {"$exists": True}},
+            projection={"shardHash": 1},
+        )
+        return [(str(doc["_id"]), doc["shardHash"]) async for doc in cursor]
+
+    async def backfill_shard_hashes(self) -> int:
+        """
+        Store shardHash on sources that don't have one yet.
+
+        Returns the number of sources updated.
+        """
+        cursor = self._col.find(
+            {"shardHash": {"$exists": False}},
+            projection={"entryUrl": 1},
+        )
+        updated = 0
+        async for doc in cursor:
+            await self._col.update_one(
+                {"_id": doc["_id"]},
+                {"$set": {"shardHash": shard_hash(doc.get("entryUrl", ""))}},
+            )
+            updated += 1
+        return updated
+
     async def upsert(self, source: dict[str, Any]) -> str:
         """
         Insert or update a source configuration.
@@ -57,11 +105,16 @@ class SourcesRepo:
         entry_url = source.get("entryUrl", "")
         now = datetime.now(timezone.utc)
 
+        # A leased source dict carries a snapshot of its lease (and learned
+        # rate); writing it back would clobber updates made since the load.
+        fields = {k: v for k, v in source.items() if k not in _RUNTIME_FIELDS}
+
         result = await self._col.update_one(
             {"entryUrl": entry_url},
             {
                 "$set": {
-                    **source,
+                    **fields,
+                    "shardHash": shard_hash(entry_url),
                     "updatedAt": now,
                 },
                 "$setOnInsert": {
@@ -102,6 +155,23 @@ class SourcesRepo:
             {"$set": update},
         )
 
+    async def update_rate_limit(self, source_id: str, host: str, rps: float) -> None:
+        """Store the request rate learned for the host a source is fetched from."""
+        from bson import ObjectId
+
+        await self._col.update_one(
+            {"_id": ObjectId(source_id)},
+            {
+                "$set": {
+                    "rateLimit": {
+                        "host": host,
+                        "rps": round(rps, 3),
+                        "updatedAt": datetime.now(timezone.utc),
+                    }
+                }
+            },
+        )
+
     async def update_extraction_config(
         self,
         source_id: str,
@@ -126,3 +196,98 @@ class SourcesRepo:
                 }
             },
         )
+
+    # ── Leases ───────────────────────────────────────────────────────────
+    # Lets several agent processes share one `sources` collection: each
+    # worker atomically leases sources before scraping them, renews the
+    # lease while working, and releases it when done. Leases left behind
+    # by a crashed worker expire and become claimable again.
+
+    async def claim(
+        self,
+        owner: str,
+        *,
+        lease_seconds: int,
+        min_interval_minutes: int = 0,
+        exclude_ids: Iterable[Any] = (),
+    ) -> dict[str, Any] | None:
+        """
+        Atomically lease one claimable source for `owner`.
+
+        A source is claimable if it is not BROKEN, its lease is free or
+        expired, it was not released less than `min_interval_minutes`
+        ago, and it is not in `exclude_ids` (the sources the run already
+        claimed, so a run never re-claims sources it just finished).
+        Least recently released sources are claimed first.
+        """
+        now = datetime.now(timezone.utc)
+        query: dict[str, Any] = {
+            "healthStatus": {"$ne": "BROKEN"},
+            "$or": [
+                {"leaseExpiresAt": None},
+                {"leaseExpiresAt": {"$lte": now}},
+            ],
+        }
+        excluded = list(exclude_ids)
+        if excluded:
+            query["_id"] = {"$nin": excluded}
+        if min_interval_minutes > 0:
+            cutoff = now - timedelta(minutes=min_interval_minutes)
+            query["$and"] = [{
+                "$or": [
+                    {"leaseReleasedAt": None},
+                    {"leaseReleasedAt": {"$lte": cutoff}},
+                ]
+            }]
+
+        return await self._col.find_one_and_update(
+            query,
+            {
+                "$set": {
+                    "leaseOwner": owner,
+                    "leaseExpiresAt": now + timedelta(seconds=lease_seconds),
+                    "leaseHeartbeatAt": now,
+                }
+            },
+            sort=[("leaseReleasedAt", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def renew_leases(
+        self,
+        owner: str,
+        source_ids: list[Any],
+        *,
+        lease_seconds: int,
+    ) -> int:
+        """Extend `owner`'s leases on the given sources. Returns the count renewed."""
+        if not source_ids:
+            return 0
+        now = datetime.now(timezone.utc)
+        result = await self._col.update_many(
+            {"_id": {"$in": source_ids}, "leaseOwner": owner},
+            {
+                "$set": {
+                    "leaseExpiresAt": now + timedelta(seconds=lease_seconds),
+                    "leaseHeartbeatAt": now,
+                }
+            },
+        )
+        return result.modified_count
+
+    async def release(self, owner: str, source_id: Any) -> None:
+        """Release `owner`'s lease on a source (no-op if it was reclaimed)."""
+        await self._col.update_one(
+            {"_id": source_id, "leaseOwner": owner},
+            {
+                "$set": {
+                    "leaseOwner": None,
+                    "leaseExpiresAt": None,
+                    "leaseReleasedAt": datetime.now(timezone.utc),
+                }
+            },
+        )
+
+    async def ensure_lease_indexes(self) -> None:
+        """Create the index used by claim()."""
+        await self._col.create_index([("leaseExpiresAt", 1), ("leaseReleasedAt", 1)])
@@ -9,13 +9,16 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Any
+from typing import TYPE_CHECKING, Any
 from urllib.parse import urljoin
 
 from playwright.async_api import Page, async_playwright
 
 from app.utils.url_utils import is_internal_link, normalize_url
 
+if TYPE_CHECKING:
+    from app.scraping.rate_limit import HostRateLimiter
+
 logger = logging.getLogger("mandi-agent")
 
 
@@ -71,10 +74,14 @@ async def navigate_and_extract(
     *,
     timeout_ms: int = 30000,
     wait_for: str = "domcontentloaded",
+    limiter: HostRateLimiter | None = None,
 ) -> dict[str, Any]:
     """
     Navigate to a URL and extract page data.
 
+    With a limiter, the navigation waits for the host's rate limit and
+    its response status feeds back into it.
+
     Returns a dict with:
       - url: the final URL after redirects
       - title: page title
@@ -93,8 +100,12 @@ async def navigate_and_extract(
     }
 
     try:
+        if limiter is not None:
+            await limiter.acquire()
         response = await page.goto(url, timeout=timeout_ms, wait_until=wait_for)
         if response:
+            if limiter is not None:
+                limiter.observe(response.status, response.headers.get("retry-after"))
             result["status"] = response.status
             result["url"] = page.url  # Final URL after redirects
 
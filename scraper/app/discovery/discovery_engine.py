@@ -10,7 +10,6 @@ Produces a DiscoveryResult that the AI discovery mode will analyze.
 
 from __future__ import annotations
 
-import asyncio
 import logging
 from dataclasses import dataclass, field
 from typing import Any
@@ -25,6 +24,7 @@ from app.discovery.network_sniffer import NetworkSniffer
 from app.discovery.table_detector import detect_tables
 from app.queue.multi_level_queue import MultiLevelQueue
 from app.queue.scoring import score_url
+from app.scraping.rate_limit import limiter_for
 from app.utils.url_utils import extract_base_url
 
 logger = logging.getLogger("mandi-agent")
@@ -174,6 +174,7 @@ async def run_discovery(
                     url,
                     base_url,
                     timeout_ms=ctx.config.discovery_timeout_seconds * 1000,
+                    limiter=limiter_for(ctx, url),
                 )
 
                 if page_data.get("error"):
@@ -209,9 +210,6 @@ async def run_discovery(
                         parent_url=url,
                     )
 
-                # Small delay to be polite
-                await asyncio.sleep(ctx.config.request_delay_ms / 1000)
-
         except Exception as exc:
             ctx.add_error(entry_url, f"Discovery engine error: {exc}", fatal=True)
             logger.exception("Discovery engine error")
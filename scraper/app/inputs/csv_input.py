@@ -10,6 +10,8 @@ import csv
 from pathlib import Path
 from typing import Any
 
+from app.core.sharding import in_shard, shard_hash
+
 
 class CsvInput:
     """Load sources from a CSV file."""
@@ -17,13 +19,19 @@ class CsvInput:
     def __init__(self, csv_path: str | Path) -> None:
         self._path = Path(csv_path)
 
-    async def load_sources(self) -> list[dict[str, Any]]:
+    async def load_sources(
+        self,
+        *,
+        shard: tuple[int, int] | None = None,
+    ) -> list[dict[str, Any]]:
         """
         Read source configurations from a CSV file.
 
         Expected CSV columns:
           entryUrl, baseUrl, extractionType, name (optional)
 
+        With shard=(index, count), only that shard's sources are returned.
+
         Returns a list of source config dicts.
         """
         if not self._path.exists():
@@ -39,6 +47,8 @@ class CsvInput:
                 entry_url = row.get("entryUrl", "").strip()
                 if not entry_url:
                     continue
+                if shard is not None and not in_shard(entry_url, shard):
+                    continue
 
                 source: dict[str, Any] = {
                     "entryUrl": entry_url,
@@ -58,3 +68,14 @@ class CsvInput:
                 sources.append(source)
 
         return sources
+
+    async def shard_members(self) -> list[tuple[str, int]]:
+        """Return (entryUrl, shard hash) for every source in the file."""
+        return [
+            (source["entryUrl"], shard_hash(source["entryUrl"]))
+            for source in await self.load_sources()
+        ]
+
+    async def historical_durations(self) -> dict[str, float]:
+        """CSV sources have no run history."""
+        return {}
@@ -10,6 +10,7 @@ from typing import Any
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from app.db.runs_repo import RunsRepo
 from app.db.sources_repo import SourcesRepo
 
 
@@ -18,17 +19,35 @@ class DbInput:
 
     def __init__(self, db: AsyncIOMotorDatabase) -> None:
         self._repo = SourcesRepo(db)
+        self._runs_repo = RunsRepo(db)
 
-    async def load_sources(self) -> list[dict[str, Any]]:
+    async def load_sources(
+        self,
+        *,
+        shard: tuple[int, int] | None = None,
+    ) -> list[dict[str, Any]]:
         """
         Return all active (non-BROKEN) source configs.
 
+        With shard=(index, count), the shard filter runs in MongoDB so
+        only this shard's documents are fetched.
+
         Each dict contains at minimum:
           - _id, entryUrl, baseUrl
           - extractionType (if discovered)
           - schemaMapping (if mapped)
         """
-        return await self._repo.find_active()
+        if shard is not None:
+            await self._repo.backfill_shard_hashes()
+        return await self._repo.find_active(shard=shard)
+
+    async def shard_members(self) -> list[tuple[str, int]]:
+        """Return (source_id, shard hash) for every active source."""
+        return await self._repo.find_active_shard_members()
+
+    async def historical_durations(self) -> dict[str, float]:
+        """Return average scrape duration per source id from scrape_runs."""
+        return await self._runs_repo.average_durations()
 
     async def load_all_sources(self) -> list[dict[str, Any]]:
         """Return ALL source configs including BROKEN ones."""
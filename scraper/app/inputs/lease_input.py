@@ -0,0 +1,125 @@
+"""
+Leased database input adapter.
+
+Loads sources from MongoDB by leasing them, so several agent processes
+can share one `sources` collection without duplicating work. Each call
+to load_sources() claims the next batch; leases are renewed by a
+heartbeat while the batch is processed and released per source.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.db.sources_repo import SourcesRepo
+
+logger = logging.getLogger("mandi-agent")
+
+
+def default_worker_id() -> str:
+    """Lease owner id for this process: hostname:pid."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaseInput:
+    """Claim sources from MongoDB in leased batches."""
+
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        *,
+        owner: str,
+        batch_size: int,
+        lease_seconds: int,
+        min_interval_minutes: int = 0,
+    ) -> None:
+        self._repo = SourcesRepo(db)
+        self._owner = owner
+        self._batch_size = max(1, batch_size)
+        self._lease_seconds = lease_seconds
+        self._min_interval_minutes = min_interval_minutes
+        self._held: set[Any] = set()
+        # Every source claimed by this run, held or released: never re-claimed
+        self._claimed: set[Any] = set()
+        self._indexes_ready = False
+
+    @property
+    def owner(self) -> str:
+        """Lease owner id used by this adapter."""
+        return self._owner
+
+    async def load_sources(self) -> list[dict[str, Any]]:
+        """
+        Lease and return the next batch of sources.
+
+        Returns an empty list once nothing is left to claim.
+        """
+        if not self._indexes_ready:
+            await self._repo.ensure_lease_indexes()
+            self._indexes_ready = True
+
+        batch: list[dict[str, Any]] = []
+        while len(batch) < self._batch_size:
+            source = await self._repo.claim(
+                self._owner,
+                lease_seconds=self._lease_seconds,
+                min_interval_minutes=self._min_interval_minutes,
+                exclude_ids=self._claimed,
+            )
+            if source is None:
+                break
+            self._held.add(source["_id"])
+            self._claimed.add(source["_id"])
+            batch.append(source)
+
+        return batch
+
+    async def release(self, source: dict[str, Any]) -> None:
+        """Release the lease on a finished source."""
+        source_id = source.get("_id")
+        if source_id not in self._held:
+            return
+        self._held.discard(source_id)
+        await self._repo.release(self._owner, source_id)
+
+    @asynccontextmanager
+    async def heartbeat(self) -> AsyncIterator[None]:
+        """Renew held leases in the background while the block runs."""
+        task = asyncio.create_task(self._heartbeat_loop())
+        try:
+            yield
+        finally:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _heartbeat_loop(self) -> None:
+        """Renew leases at a third of the lease duration."""
+        interval = max(1.0, self._lease_seconds / 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                renewed = await self._repo.renew_leases(
+                    self._owner,
+                    list(self._held),
+                    lease_seconds=self._lease_seconds,
+                )
+            except Exception as exc:
+                logger.warning("Lease heartbeat failed: %s", exc)
+                continue
+
+            if renewed < len(self._held):
+                logger.warning(
+                    "Lease heartbeat renewed %d of %d sources — some leases expired",
+                    renewed,
+                    len(self._held),
+                )
@@ -26,10 +26,14 @@ async def update_health(
     *,
     success: bool,
     records_saved: int = 0,
+    up_to_date: bool = False,
 ) -> str:
     """
     Determine and update the health status of a source after a run.
 
+    up_to_date marks an incremental run that found the portal reachable
+    but nothing newer than what's already stored; it counts as a success.
+
     Returns the new health status string.
     """
     if ctx.db is None:
@@ -44,7 +48,7 @@ async def update_health(
 
     now = datetime.now(timezone.utc)
 
-    if success and records_saved > 0:
+    if success and (records_saved > 0 or up_to_date):
         status = HEALTH_OK
         await sources_repo.update_health(
             source_id,
@@ -0,0 +1,55 @@
+"""
+Event-loop lag monitor.
+
+Measures how long the event loop was blocked while a scrape ran: a
+background task sleeps a short interval and records how late it wakes
+up. A late wake-up means something held the loop (CPU-bound parsing,
+blocking I/O), stalling every other in-flight request and log flush.
+
+Lag is a property of the whole loop, so with concurrent sources each
+one's figures include blocking caused by the others.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from app.core.constants import LOOP_LAG_INTERVAL_SECONDS, LOOP_LAG_THRESHOLD_SECONDS
+
+
+class LoopLagMonitor:
+    """Async context manager sampling loop lag while active."""
+
+    def __init__(
+        self,
+        *,
+        interval: float = LOOP_LAG_INTERVAL_SECONDS,
+        threshold: float = LOOP_LAG_THRESHOLD_SECONDS,
+    ) -> None:
+        self._interval = interval
+        self._threshold = threshold
+        self._task: asyncio.Task[None] | None = None
+        self.blocked_seconds = 0.0
+        self.max_lag_seconds = 0.0
+
+    async def __aenter__(self) -> LoopLagMonitor:
+        self._task = asyncio.create_task(self._sample())
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _sample(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self._interval)
+            lag = time.perf_counter() - started - self._interval
+            if lag > self._threshold:
+                self.blocked_seconds += lag
+                self.max_lag_seconds = max(self.max_lag_seconds, lag)
@@ -1,19 +1,30 @@
 """
 CSV/JSON output adapter.
 
-Saves scraped data to local files for offline demo/testing.
+Saves scraped data to local files, in one of two formats:
+  - csv: a CSV + JSON snapshot per save of prices, one JSON file per
+    source config and run log — handy for demos and inspection
+  - jsonl: append-only JSON Lines streams (prices, sources, runs),
+    optionally gzip/zstd-compressed and rotated by day and size, for
+    high-volume local runs (see jsonl_writer)
+
+Files are written from a thread, never on the event loop.
 """
 
 from __future__ import annotations
 
+import asyncio
 import csv
 import json
 import logging
+import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
 from app.core.constants import UNIFIED_PRICE_FIELDS
+from app.core.price_batch import PriceBatch
+from app.outputs.jsonl_writer import JsonlWriter
 
 logger = logging.getLogger("mandi-agent")
 
@@ -21,53 +32,96 @@ logger = logging.getLogger("mandi-agent")
 class CsvOutput:
     """Save scrape results to CSV and JSON files."""
 
-    def __init__(self, output_dir: str | Path) -> None:
+    def __init__(
+        self,
+        output_dir: str | Path,
+        *,
+        file_format: str = "csv",
+        compression: str = "none",
+        rotate_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
         self._dir = Path(output_dir)
         self._dir.mkdir(parents=True, exist_ok=True)
+        self._jsonl = (
+            JsonlWriter(self._dir, compression=compression, rotate_bytes=rotate_bytes)
+            if file_format == "jsonl"
+            else None
+        )
 
-    async def save_prices(self, records: list[dict[str, Any]]) -> int:
+    async def save_prices(self, records: PriceBatch) -> int:
         """
-        Save price records as both CSV and JSON.
+        Save price records as both CSV and JSON (or append them as JSON Lines).
 
         Returns the number of records written.
         """
         if not records:
             return 0
 
-        timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-
-        # Write CSV
-        csv_path = self._dir / f"prices_{timestamp}.csv"
-        self._write_csv(csv_path, records)
-        logger.info("Wrote %d records to %s", len(records), csv_path)
-
-        # Write JSON
-        json_path = self._dir / f"prices_{timestamp}.json"
-        self._write_json(json_path, records)
-        logger.info("Wrote %d records to %s", len(records), json_path)
+        if self._jsonl is not None:
+            written = await self._jsonl.write("prices", records)
+            logger.info("Appended %d records to the prices stream in %s", written, self._dir)
+            return written
 
+        await asyncio.to_thread(self._write_snapshot, records)
         return len(records)
 
     async def save_source_config(self, config: dict[str, Any]) -> None:
-        """Save a source config as JSON."""
+        """Save a source config as JSON (or append it to the sources stream)."""
+        if self._jsonl is not None:
+            await self._jsonl.write("sources", [config])
+            return
+
         name = config.get("name") or config.get("entryUrl", "source")
         # Sanitize filename
         safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
         path = self._dir / f"source_{safe_name}.json"
-        self._write_json(path, config)
+        await asyncio.to_thread(self._write_json, path, config)
         logger.info("Wrote source config to %s", path)
 
     async def save_run(self, run_doc: dict[str, Any]) -> None:
-        """Append a run log as JSON."""
-        timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-        path = self._dir / f"run_{timestamp}.json"
-        self._write_json(path, run_doc)
+        """Save a run log as JSON (or append it to the runs stream)."""
+        if self._jsonl is not None:
+            await self._jsonl.write("runs", [run_doc])
+            return
+
+        path = self._dir / f"run_{self._stamp()}.json"
+        await asyncio.to_thread(self._write_json, path, run_doc)
         logger.info("Wrote run log to %s", path)
 
+    def close(self) -> None:
+        """Stop the JSON Lines writer (if any) once its pending writes are done."""
+        if self._jsonl is not None:
+            self._jsonl.close()
+
     # ── Private Helpers ──────────────────────────────────────────────────
 
+    def _write_snapshot(self, records: PriceBatch) -> None:
+        """Write `records` to a new CSV file and a new JSON file."""
+        timestamp = self._stamp()
+
+        # Write CSV
+        csv_path = self._dir / f"prices_{timestamp}.csv"
+        self._write_csv(csv_path, records)
+        logger.info("Wrote %d records to %s", len(records), csv_path)
+
+        # Write JSON
+        json_path = self._dir / f"prices_{timestamp}.json"
+        self._write_json(json_path, records.to_documents())
+        logger.info("Wrote %d records to %s", len(records), json_path)
+
+    @staticmethod
+    def _stamp() -> str:
+        """
+        Timestamp plus a short random suffix for output filenames.
+
+        Sources scraped concurrently can finish within the same second,
+        so the timestamp alone would make their files overwrite each other.
+        """
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+        return f"{timestamp}_{uuid.uuid4().hex[:8]}"
+
     @staticmethod
-    def _write_csv(path: Path, records: list[dict[str, Any]]) -> None:
+    def _write_csv(path: Path, records: PriceBatch) -> None:
         """Write records to a CSV file."""
         if not records:
             return
@@ -77,12 +131,11 @@ class CsvOutput:
         extra = [k for k in records[0] if k not in fieldnames and not k.startswith("_")]
         fieldnames.extend(extra)
 
+        # Rows come straight from the batch's columns (other fields ignored)
         with path.open("w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(
-                f, fieldnames=fieldnames, extrasaction="ignore"
-            )
-            writer.writeheader()
-            writer.writerows(records)
+            writer = csv.writer(f)
+            writer.writerow(fieldnames)
+            writer.writerows(records.rows(fieldnames))
 
     @staticmethod
     def _write_json(path: Path, data: Any) -> None:
@@ -11,6 +11,7 @@ from typing import Any
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from app.core.price_batch import PriceBatch
 from app.db.prices_repo import PricesRepo
 from app.db.runs_repo import RunsRepo
 from app.db.sources_repo import SourcesRepo
@@ -25,23 +26,40 @@ class DbOutput:
         self._prices_repo = PricesRepo(db)
         self._runs_repo = RunsRepo(db)
         self._sources_repo = SourcesRepo(db)
+        self._indexes_ready = False
 
-    async def save_prices(self, records: list[dict[str, Any]]) -> int:
+    async def save_prices(self, batch: PriceBatch) -> int:
         """
         Save normalized price records to the prices collection.
 
-        Also upserts derived entities (crops, states, mandis).
-        Returns the number of inserted records.
+        Records are upserted by natural key, so saving the same
+        records again changes nothing. Also upserts derived entities
+        (crops, states, mandis). Returns the number of records now stored
+        (inserted, updated or already up to date).
         """
-        if not records:
+        if not batch:
             return 0
 
-        # Ensure indexes exist (idempotent)
-        await self._prices_repo.ensure_indexes()
+        # Documents are built here, for the whole batch at once: one
+        # pipeline chunk (API page, row batch), or a worker's whole payload
+        records = batch.to_documents()
 
-        # Insert prices
-        inserted = await self._prices_repo.bulk_insert(records)
-        logger.info("Inserted %d price records (of %d provided)", inserted, len(records))
+        # Ensure indexes exist (once per adapter)
+        if not self._indexes_ready:
+            await self._prices_repo.ensure_indexes()
+            self._indexes_ready = True
+
+        # Upsert prices
+        counts = await self._prices_repo.bulk_upsert(records)
+        logger.info(
+            "Upserted %d price records: %d inserted, %d updated, %d unchanged",
+            len(records), counts.inserted, counts.updated, counts.unchanged,
+        )
+        if counts.duplicates or counts.failed:
+            logger.warning(
+                "%d price records repeated a key in the batch, %d failed",
+                counts.duplicates, counts.failed,
+            )
 
         # Upsert derived entities
         entity_counts = await self._prices_repo.upsert_entities_from_prices(records)
@@ -53,7 +71,7 @@ class DbOutput:
                 entity_counts["mandis"],
             )
 
-        return inserted
+        return counts.saved
 
     async def save_source_config(self, config: dict[str, Any]) -> str:
         """Save or update a source configuration. Returns source _id."""
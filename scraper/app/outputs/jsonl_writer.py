@@ -0,0 +1,216 @@
+"""
+Append-only JSON Lines writer.
+
+Streams documents (prices, source configs, run logs) into per-stream
+JSON Lines files in one directory:
+
+    prices-20240115-000.jsonl.gz, prices-20240115-001.jsonl.gz, runs-20240115-000.jsonl.gz
+
+Files rotate at the UTC day boundary and once they reach a size limit;
+a restarted agent keeps appending to the day's latest file until then.
+
+All encoding, compression and disk I/O happens on one writer thread, so
+the event loop never blocks on it and appends to a file never interleave.
+Each write is compressed as a complete gzip member / zstd frame and
+flushed, so every file stays readable (`zcat`, `zstd -dc`, gzip.open)
+at all times, with no close step. Documents are encoded with orjson
+when it is installed, else the standard library encoder.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import importlib.util
+import json
+import logging
+import queue
+import re
+import threading
+from collections.abc import Mapping
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Callable, Iterable
+
+logger = logging.getLogger("mandi-agent")
+
+_EXTENSIONS = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+# gzip level 6 (zlib's default) and zstd level 3: fast, and both shrink
+# repetitive price records by ~10x
+_GZIP_LEVEL = 6
+_ZSTD_LEVEL = 3
+
+_STOP = object()
+
+
+class JsonlWriter:
+    """Append-only JSON Lines streams in one directory, written by one thread."""
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        compression: str = "none",
+        rotate_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        if compression not in _EXTENSIONS:
+            raise ValueError(f"Unknown compression '{compression}' (expected one of {', '.join(_EXTENSIONS)})")
+        if compression == "zstd" and not _zstandard_available():
+            logger.warning("zstd compression requested but 'zstandard' is not installed — using gzip")
+            compression = "gzip"
+
+        self._dir = Path(directory)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._compression = compression
+        self._compress = _compressor(compression)
+        self._encode = _encoder()
+        self._rotate_bytes = rotate_bytes
+
+        self._queue: queue.SimpleQueue[Any] = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        # stream → (day, sequence number, open file)
+        self._files: dict[str, tuple[str, int, IO[bytes]]] = {}
+
+    async def write(self, stream: str, documents: Iterable[Any]) -> int:
+        """
+        Append `documents` (dicts or other Mappings) to `stream`.
+
+        Returns the number written, once they are flushed to disk.
+        """
+        future: Future[int] = Future()
+        self._ensure_thread()
+        self._queue.put((stream, documents, future))
+        return await asyncio.wrap_future(future)
+
+    def close(self) -> None:
+        """Stop the writer thread after pending writes, and close the files."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    # ── Writer Thread ────────────────────────────────────────────────────
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="jsonl-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while (item := self._queue.get()) is not _STOP:
+            stream, documents, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._append(stream, documents))
+            except BaseException as exc:
+                future.set_exception(exc)
+
+        for _, _, f in self._files.values():
+            f.close()
+        self._files.clear()
+
+    def _append(self, stream: str, documents: Iterable[Any]) -> int:
+        count = 0
+        lines: list[bytes] = []
+        for document in documents:
+            lines.append(self._encode(document))
+            count += 1
+        if not count:
+            return 0
+
+        f = self._file(stream)
+        f.write(self._compress(b"".join(lines)))
+        f.flush()
+        return count
+
+    def _file(self, stream: str) -> IO[bytes]:
+        """The stream's current file, rotated by day and size."""
+        day = datetime.now(timezone.utc).strftime("%Y%m%d")
+        current = self._files.get(stream)
+        if current is not None:
+            current_day, sequence, f = current
+            if current_day == day and f.tell() < self._rotate_bytes:
+                return f
+            f.close()
+            sequence = sequence + 1 if current_day == day else 0
+        else:
+            sequence = self._latest_sequence(stream, day)
+
+        f = self._path(stream, day, sequence).open("ab")
+        if f.tell() >= self._rotate_bytes:
+            f.close()
+            sequence += 1
+            f = self._path(stream, day, sequence).open("ab")
+        self._files[stream] = (day, sequence, f)
+        return f
+
+    def _path(self, stream: str, day: str, sequence: int) -> Path:
+        return self._dir / f"{stream}-{day}-{sequence:03d}.jsonl{_EXTENSIONS[self._compression]}"
+
+    def _latest_sequence(self, stream: str, day: str) -> int:
+        """The highest sequence number among the stream's files for `day` (0 if none)."""
+        pattern = re.compile(rf"{re.escape(stream)}-{day}-(\d+)\.jsonl")
+        sequences = [
+            int(match[1])
+            for path in self._dir.glob(f"{stream}-{day}-*.jsonl*")
+            if (match := pattern.match(path.name))
+        ]
+        return max(sequences, default=0)
+
+
+# ── Encoding / Compression ───────────────────────────────────────────────────
+
+
+def _default(obj: Any) -> Any:
+    """Types JSON has no notation for: Mappings as objects, datetimes as ISO strings, else str()."""
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+def _encoder() -> Callable[[Any], bytes]:
+    """A document → one UTF-8 JSON line encoder, orjson's when installed."""
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=_default)
+
+    def encode_json(document: Any) -> bytes:
+        return (encoder.encode(document) + "\n").encode("utf-8")
+
+    try:
+        import orjson
+    except ImportError:
+        return encode_json
+
+    options = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+
+    def encode_orjson(document: Any) -> bytes:
+        try:
+            return orjson.dumps(document, default=_default, option=options)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits
+            return encode_json(document)
+
+    return encode_orjson
+
+
+def _compressor(compression: str) -> Callable[[bytes], bytes]:
+    """Compress one write as a self-contained gzip member / zstd frame."""
+    if compression == "gzip":
+        return lambda data: gzip.compress(data, compresslevel=_GZIP_LEVEL, mtime=0)
+    if compression == "zstd":
+        import zstandard
+
+        compressor = zstandard.ZstdCompressor(level=_ZSTD_LEVEL)
+        return compressor.compress
+    return lambda data: data
+
+
+def _zstandard_available() -> bool:
+    return importlib.util.find_spec("zstandard") is not None
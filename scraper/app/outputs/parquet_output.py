@@ -0,0 +1,347 @@
+"""
+Parquet output adapter.
+
+Appends price records to a Hive-partitioned Parquet dataset:
+
+    <root>/date=2024-01-15/stateId=MH/part-20240115T063000Z-1a2b3c4d.parquet
+
+Each save writes one compressed file per (date, stateId) partition it
+touches, with typed columns (float64 prices and arrivals, strings for
+names, ids and source-specific extra fields, so every file of the
+dataset shares one schema). The partition columns live in the directory names, not
+in the files. A file is written under a hidden temporary name, fsynced
+and renamed into place, so readers never see a partial file; readers
+such as pyarrow.dataset skip hidden (".") names.
+
+Appends leave many small files per partition; compact_dataset() (the
+`compact` agent mode) merges them. Source configs and run logs are not
+price history and go to the wrapped `meta` adapter (MongoDB or CSV).
+
+Requires pyarrow, imported only when this adapter is used.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import os
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+from urllib.parse import quote
+
+from app.core.constants import (
+    PARQUET_COMPRESSION,
+    PARQUET_PARTITION_FIELDS,
+    PARQUET_TARGET_FILE_MB,
+)
+from app.core.price_batch import PriceBatch
+
+logger = logging.getLogger("mandi-agent")
+
+# Partition value for records without a date / stateId (as Hive and Spark)
+DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+# Unified fields stored as float64; the other unified fields are strings
+_FLOAT_FIELDS = frozenset({"minPrice", "maxPrice", "modalPrice", "arrival"})
+
+_JOURNAL_PREFIX = ".compacting-"
+
+
+class ParquetOutput:
+    """Append price records to a partitioned Parquet dataset."""
+
+    def __init__(self, directory: str | Path, meta: Any) -> None:
+        self._root = Path(directory)
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._meta = meta
+
+    async def save_prices(self, batch: PriceBatch) -> int:
+        """
+        Append price records, one new file per partition touched.
+
+        Returns the number of records written.
+        """
+        if not batch:
+            return 0
+
+        files = await asyncio.to_thread(write_partitioned, self._root, batch)
+        logger.info("Wrote %d records to %d Parquet file(s) under %s", len(batch), files, self._root)
+        return len(batch)
+
+    async def save_source_config(self, config: dict[str, Any]) -> Any:
+        """Save a source config through the meta adapter."""
+        return await self._meta.save_source_config(config)
+
+    async def save_run(self, run_doc: dict[str, Any]) -> Any:
+        """Save a run log through the meta adapter."""
+        return await self._meta.save_run(run_doc)
+
+
+# ── Writing ──────────────────────────────────────────────────────────────────
+
+
+def write_partitioned(root: Path, batch: PriceBatch) -> int:
+    """Write `batch` under `root`, one file per partition. Returns the file count."""
+    import pyarrow as pa
+
+    table = _to_table(batch)
+
+    keys = zip(*(
+        (_partition_value(value) for value in batch.column(name))
+        for name in PARQUET_PARTITION_FIELDS
+    ))
+    partitions: dict[tuple[str, ...], list[int]] = {}
+    for index, key in enumerate(keys):
+        partitions.setdefault(key, []).append(index)
+
+    data = table.drop_columns([name for name in PARQUET_PARTITION_FIELDS if name in table.column_names])
+    for key, indices in partitions.items():
+        part = data if len(indices) == len(data) else data.take(pa.array(indices, type=pa.int64()))
+        directory = root.joinpath(*(f"{name}={value}" for name, value in zip(PARQUET_PARTITION_FIELDS, key)))
+        directory.mkdir(parents=True, exist_ok=True)
+        _commit(part, directory / _part_name())
+    return len(partitions)
+
+
+def _to_table(batch: PriceBatch) -> Any:
+    """
+    The batch as a typed Arrow table (private "_" fields left out).
+
+    Types are fixed per field, never inferred from a batch's values: a
+    field inferred as int64 in one file and string in the next couldn't
+    be compacted or read as one dataset.
+    """
+    import pyarrow as pa
+
+    columns: dict[str, Any] = {}
+    for name in batch.fields():
+        if name.startswith("_"):
+            continue
+        values = batch.column(name)
+        if name in _FLOAT_FIELDS:
+            columns[name] = pa.array([_float_or_none(value) for value in values], type=pa.float64())
+        else:
+            # Other unified fields and source-specific extra fields as strings
+            columns[name] = pa.array([_str_or_none(value) for value in values], type=pa.string())
+    return pa.table(columns)
+
+
+def _float_or_none(value: Any) -> float | None:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return None if math.isnan(value) else float(value)
+    try:
+        return float(str(value).replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _str_or_none(value: Any) -> str | None:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+def _partition_value(value: Any) -> str:
+    """A partition directory value: URL-quoted, or the default partition when missing."""
+    text = _str_or_none(value)
+    if not text:
+        return DEFAULT_PARTITION
+    return quote(text, safe="")
+
+
+def _part_name() -> str:
+    """
+    A new data file name: UTC timestamp plus a random suffix, so files
+    sort by write time and concurrent writers never collide.
+    """
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    return f"part-{stamp}-{uuid.uuid4().hex[:8]}.parquet"
+
+
+def _commit(table: Any, path: Path) -> None:
+    """Write `table` to `path` atomically: hidden temp file, fsync, rename."""
+    tmp = _temp_path(path)
+    _write_file(table, tmp)
+    os.replace(tmp, path)
+    _fsync_directory(path.parent)
+
+
+def _write_file(table: Any, path: Path) -> None:
+    import pyarrow.parquet as pq
+
+    try:
+        with path.open("wb") as f:
+            pq.write_table(table, f, compression=PARQUET_COMPRESSION)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+
+
+def _temp_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}.tmp")
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Persist a rename (no-op where directories can't be opened, e.g. Windows)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+# ── Compaction ───────────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True, slots=True)
+class CompactionStats:
+    """What one compact_dataset() pass did."""
+
+    partitions: int
+    files_merged: int
+    files_written: int
+    bytes_before: int
+    bytes_after: int
+
+
+def compact_dataset(
+    root: str | Path,
+    *,
+    target_bytes: int = PARQUET_TARGET_FILE_MB * 1024 * 1024,
+) -> CompactionStats:
+    """
+    Merge each partition's files smaller than `target_bytes` into files
+    of about that size, keeping row order (files are merged in name,
+    i.e. write, order).
+
+    Before a merged file is renamed into place, a hidden journal naming
+    it and its inputs is written to the partition. A pass interrupted
+    after the rename is finished by the next one (the inputs are
+    deleted); one interrupted before it is rolled back. A partition whose
+    files can't be merged is logged and left as it is.
+    """
+    import pyarrow as pa
+
+    root = Path(root)
+    partitions = files_merged = files_written = bytes_before = bytes_after = 0
+
+    directories = {path.parent for path in root.rglob("*.parquet")}
+    directories |= {path.parent for path in root.rglob(f"{_JOURNAL_PREFIX}*.json")}
+    for directory in sorted(directories):
+        _recover(directory)
+
+        small = [
+            (path, size)
+            for path in sorted(directory.glob("part-*.parquet"))
+            if (size := path.stat().st_size) < target_bytes
+        ]
+        merged_any = False
+        for group in _bins(small, target_bytes):
+            if len(group) < 2:
+                continue
+            try:
+                output = _merge(directory, [path for path, _ in group])
+            except (pa.ArrowException, OSError) as exc:
+                # e.g. files written with an older, incompatible schema;
+                # leave this partition as it is and go on with the others
+                logger.warning("Skipping compaction of %s: %s", directory, exc)
+                break
+            merged_any = True
+            files_merged += len(group)
+            files_written += 1
+            bytes_before += sum(size for _, size in group)
+            bytes_after += output.stat().st_size
+        partitions += merged_any
+
+    stats = CompactionStats(partitions, files_merged, files_written, bytes_before, bytes_after)
+    logger.info(
+        "Compacted %d partition(s) under %s: %d files → %d (%d → %d bytes)",
+        stats.partitions, root, stats.files_merged, stats.files_written,
+        stats.bytes_before, stats.bytes_after,
+    )
+    return stats
+
+
+def _bins(files: list[tuple[Path, int]], target_bytes: int) -> list[list[tuple[Path, int]]]:
+    """Consecutive runs of files whose sizes add up to about `target_bytes`."""
+    bins: list[list[tuple[Path, int]]] = []
+    current: list[tuple[Path, int]] = []
+    total = 0
+    for path, size in files:
+        if current and total + size > target_bytes:
+            bins.append(current)
+            current, total = [], 0
+        current.append((path, size))
+        total += size
+    if current:
+        bins.append(current)
+    return bins
+
+
+def _merge(directory: Path, inputs: list[Path]) -> Path:
+    """Replace `inputs` by one file holding their rows, in order."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tables = [pq.ParquetFile(path).read() for path in inputs]
+    table = pa.concat_tables(tables, promote_options="default")
+
+    output = directory / _part_name()
+    tmp = _temp_path(output)
+    _write_file(table, tmp)
+
+    journal = directory / f"{_JOURNAL_PREFIX}{output.stem}.json"
+    _write_journal(journal, {"output": output.name, "inputs": [path.name for path in inputs]})
+
+    os.replace(tmp, output)
+    _fsync_directory(directory)
+    for path in inputs:
+        path.unlink(missing_ok=True)
+    journal.unlink()
+    return output
+
+
+def _write_journal(path: Path, entry: dict[str, Any]) -> None:
+    tmp = _temp_path(path)
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(entry, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_directory(path.parent)
+
+
+def _recover(directory: Path) -> None:
+    """Finish or roll back a compaction interrupted in `directory`."""
+    for journal in sorted(directory.glob(f"{_JOURNAL_PREFIX}*.json")):
+        try:
+            entry = json.loads(journal.read_text(encoding="utf-8"))
+            output = directory / entry["output"]
+            inputs = [directory / name for name in entry["inputs"]]
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("Ignoring unreadable compaction journal %s: %s", journal, exc)
+            continue
+
+        if output.exists():
+            # The merged file was committed: its inputs are duplicates now
+            for path in inputs:
+                path.unlink(missing_ok=True)
+            logger.info("Finished interrupted compaction in %s", directory)
+        else:
+            _temp_path(output).unlink(missing_ok=True)
+            logger.info("Rolled back interrupted compaction in %s", directory)
+        journal.unlink()
@@ -4,6 +4,15 @@ API scraper.
 Replays discovered API endpoints using httpx to fetch daily
 mandi price data. Handles pagination, retries, and rate limiting.
 Supports both JSON and form-encoded POST bodies.
+
+Requests are paced by the host's adaptive rate limiter. A throttled or
+failed page is retried on its own (after any Retry-After, with backoff)
+instead of being skipped or ending the scrape.
+
+iter_api_pages() yields one page of records at a time for the
+streaming pipeline; scrape_api() collects them into a single list.
+Unpaginated responses, which can run to tens of MB, are parsed as they
+download and yielded in PIPELINE_CHUNK_SIZE batches (see json_stream).
 """
 
 from __future__ import annotations
@@ -11,27 +20,44 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
-from typing import Any
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable
 
 import httpx
 
+from app.core.constants import PIPELINE_CHUNK_SIZE
 from app.core.context import RunContext
+from app.scraping.http_client import API_HEADERS, client_for
+from app.scraping.json_stream import iter_json_records
+from app.scraping.rate_limit import limiter_for, parse_retry_after
+from app.scraping.retry import RETRY_STATUSES, send_with_retries
 
 logger = logging.getLogger("mandi-agent")
 
-# Default request headers
-_DEFAULT_HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/131.0.0.0 Safari/537.36"
-    ),
-    "Accept": "application/json, text/plain, */*",
-    "Accept-Language": "en-US,en;q=0.9",
-}
+# Some portals throttle API clients with 403 rather than 429
+_RETRY_STATUSES = RETRY_STATUSES | {403}
 
 
 async def scrape_api(
+    ctx: RunContext,
+    endpoint: str,
+    **kwargs: Any,
+) -> list[dict[str, Any]]:
+    """
+    Fetch all records from an API endpoint.
+
+    Takes the same arguments as iter_api_pages().
+
+    Returns:
+        Flat list of record dicts.
+    """
+    all_records: list[dict[str, Any]] = []
+    async for records in iter_api_pages(ctx, endpoint, **kwargs):
+        all_records.extend(records)
+    return all_records
+
+
+async def iter_api_pages(
     ctx: RunContext,
     endpoint: str,
     *,
@@ -45,9 +71,9 @@ async def scrape_api(
     page_param: str = "page",
     page_size_param: str = "limit",
     page_size: int = 100,
-) -> list[dict[str, Any]]:
+) -> AsyncIterator[list[dict[str, Any]]]:
     """
-    Fetch data from an API endpoint.
+    Fetch an API endpoint page by page, yielding each page's records.
 
     Args:
         ctx: Run context.
@@ -63,100 +89,265 @@ async def scrape_api(
         page_size_param: Name of the page size parameter.
         page_size: Number of records per page.
 
-    Returns:
-        Flat list of record dicts.
+    Yields:
+        Lists of record dicts, one per page (or per batch when not paginating).
     """
-    all_records: list[dict[str, Any]] = []
-    request_headers = {**_DEFAULT_HEADERS, **(headers or {})}
+    total_records = 0
+    request_headers = {**API_HEADERS, **(headers or {})}
 
-    total_pages = max_pages if paginate else 1
+    client = client_for(ctx, endpoint)
+    limiter = limiter_for(ctx, endpoint)
 
-    async with httpx.AsyncClient(
-        timeout=httpx.Timeout(30.0),
-        follow_redirects=True,
-    ) as client:
-        for page_num in range(1, total_pages + 1):
-            try:
-                if method.upper() == "POST":
-                    body = dict(post_data or {})
-
-                    if paginate:
-                        body[page_param] = page_num
-                        body[page_size_param] = page_size
-
-                    if post_content_type == "form":
-                        response = await client.post(
-                            endpoint,
-                            data=body,
-                            headers=request_headers,
-                        )
-                    else:
-                        response = await client.post(
-                            endpoint,
-                            json=body,
-                            headers=request_headers,
-                        )
-                else:
-                    req_params = dict(params or {})
-                    if paginate:
-                        req_params[page_param] = page_num
-                        req_params[page_size_param] = page_size
-
-                    response = await client.get(
-                        endpoint,
-                        params=req_params,
-                        headers=request_headers,
-                    )
-
-                response.raise_for_status()
-                data = response.json()
+    def build_request(page_num: int) -> httpx.Request:
+        """Build the request for one page."""
+        if method.upper() == "POST":
+            body = dict(post_data or {})
 
-            except httpx.HTTPStatusError as exc:
-                ctx.add_error(
+            if paginate:
+                body[page_param] = page_num
+                body[page_size_param] = page_size
+
+            if post_content_type == "form":
+                return client.build_request(
+                    "POST",
                     endpoint,
-                    f"HTTP {exc.response.status_code} on page {page_num}",
+                    data=body,
+                    headers=request_headers,
                 )
-                if exc.response.status_code in (403, 429):
-                    ctx.logger.warning("Rate limited, waiting 5s...")
-                    await asyncio.sleep(5)
-                    continue
-                break
+            return client.build_request(
+                "POST",
+                endpoint,
+                json=body,
+                headers=request_headers,
+            )
 
-            except httpx.RequestError as exc:
-                ctx.add_error(endpoint, f"Request error on page {page_num}: {exc}")
+        req_params = dict(params or {})
+        if paginate:
+            req_params[page_param] = page_num
+            req_params[page_size_param] = page_size
+
+        return client.build_request(
+            "GET",
+            endpoint,
+            params=req_params,
+            headers=request_headers,
+        )
+
+    async def send(page_num: int, *, stream: bool = False) -> httpx.Response:
+        """Send the request for one page."""
+        response = await client.send(build_request(page_num), stream=stream)
+        if response.status_code == 403 and limiter is not None:
+            # The client's hooks only slow down on 429 / 503
+            limiter.on_throttle(parse_retry_after(response.headers.get("retry-after")))
+        return response
+
+    async def fetch_page(page_num: int) -> Any:
+        """Request one page (with retries) and return its decoded JSON (raises on failure)."""
+        response = await send_with_retries(
+            ctx,
+            endpoint,
+            lambda: send(page_num),
+            idempotent=method.upper() != "POST",
+            retry_statuses=_RETRY_STATUSES,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def stream_records() -> AsyncIterator[list[dict[str, Any]]]:
+        """Request the single response and yield its records as they download."""
+        response = await send_with_retries(
+            ctx,
+            endpoint,
+            lambda: send(1, stream=True),
+            idempotent=method.upper() != "POST",
+            retry_statuses=_RETRY_STATUSES,
+        )
+        try:
+            response.raise_for_status()
+            async for records in iter_json_records(response, batch_size=PIPELINE_CHUNK_SIZE):
+                yield records
+        finally:
+            await response.aclose()
+
+    if not paginate:
+        batches = stream_records()
+        try:
+            async with aclosing(batches):
+                async for records in batches:
+                    total_records += len(records)
+                    yield records
+        except httpx.HTTPStatusError as exc:
+            ctx.add_error(endpoint, f"HTTP {exc.response.status_code}")
+        except httpx.RequestError as exc:
+            ctx.add_error(endpoint, f"Request error: {exc}")
+        except json.JSONDecodeError:
+            ctx.add_error(endpoint, "Invalid JSON")
+        ctx.logger.info("API scrape complete: %d total records from %s", total_records, endpoint)
+        return
+
+    for page_num in range(1, max_pages + 1):
+        try:
+            data = await fetch_page(page_num)
+
+        except httpx.HTTPStatusError as exc:
+            ctx.add_error(
+                endpoint,
+                f"HTTP {exc.response.status_code} on page {page_num}",
+            )
+            break
+
+        except httpx.RequestError as exc:
+            ctx.add_error(endpoint, f"Request error on page {page_num}: {exc}")
+            break
+
+        except json.JSONDecodeError:
+            ctx.add_error(endpoint, f"Invalid JSON on page {page_num}")
+            break
+
+        # Extract records from response
+        records = _extract_records(data)
+
+        if not records:
+            ctx.logger.debug("No records on page %d — stopping pagination", page_num)
+            break
+
+        total_records += len(records)
+        ctx.logger.debug(
+            "API page %d: %d records (total: %d)",
+            page_num,
+            len(records),
+            total_records,
+        )
+        yield records
+
+        # Server-reported totals: fetch the remaining pages concurrently
+        if page_num == 1:
+            page_count = _page_count(data, len(records), page_size, max_pages)
+            if page_count is not None:
+                ctx.logger.debug("API reports %d pages — fanning out", page_count)
+                pages = _fan_out(
+                    ctx,
+                    endpoint,
+                    fetch_page,
+                    range(2, page_count + 1),
+                    limit=ctx.config.http_connections_per_host,
+                )
+                async with aclosing(pages):
+                    async for records in pages:
+                        total_records += len(records)
+                        yield records
                 break
 
-            except json.JSONDecodeError:
-                ctx.add_error(endpoint, f"Invalid JSON on page {page_num}")
-                break
+        # If we got fewer records than page_size, we've reached the end
+        if len(records) < page_size:
+            break
 
-            # Extract records from response
-            records = _extract_records(data)
+    ctx.logger.info("API scrape complete: %d total records from %s", total_records, endpoint)
 
-            if not records:
-                ctx.logger.debug("No records on page %d — stopping pagination", page_num)
-                break
 
-            all_records.extend(records)
-            ctx.logger.debug(
-                "API page %d: %d records (total: %d)",
-                page_num,
-                len(records),
-                len(all_records),
-            )
+async def _fan_out(
+    ctx: RunContext,
+    endpoint: str,
+    fetch_page: Callable[[int], Awaitable[Any]],
+    page_numbers: range,
+    *,
+    limit: int,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """
+    Fetch pages concurrently (at most `limit` in flight), yielding in page order.
 
-            if not paginate:
-                break
+    A failed page is recorded and skipped; it doesn't stop the others.
+    Pending requests are cancelled if the consumer stops early.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
 
-            # If we got fewer records than page_size, we've reached the end
-            if len(records) < page_size:
-                break
+    async def fetch(page_num: int) -> Any:
+        async with semaphore:
+            return await fetch_page(page_num)
 
-            # Polite delay between requests
-            await asyncio.sleep(ctx.config.request_delay_ms / 1000)
+    tasks = [asyncio.create_task(fetch(n)) for n in page_numbers]
+    try:
+        for page_num, task in zip(page_numbers, tasks):
+            try:
+                data = await task
+            except httpx.HTTPStatusError as exc:
+                ctx.add_error(endpoint, f"HTTP {exc.response.status_code} on page {page_num}")
+                continue
+            except httpx.RequestError as exc:
+                ctx.add_error(endpoint, f"Request error on page {page_num}: {exc}")
+                continue
+            except json.JSONDecodeError:
+                ctx.add_error(endpoint, f"Invalid JSON on page {page_num}")
+                continue
 
-    ctx.logger.info("API scrape complete: %d total records from %s", len(all_records), endpoint)
-    return all_records
+            records = _extract_records(data)
+            if records:
+                yield records
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# Keys under which APIs report pagination totals (top level or nested)
+_PAGE_COUNT_KEYS = (
+    "totalPages", "total_pages", "pageCount", "page_count", "last_page", "lastPage", "pages",
+)
+_TOTAL_KEYS = (
+    "recordsTotal", "recordsFiltered", "totalRecords", "total_records",
+    "totalCount", "total_count", "total", "count",
+)
+_PAGINATION_CONTAINERS = ("meta", "pagination", "paging", "pageInfo", "page_info")
+
+
+def _page_count(
+    data: Any,
+    first_page_len: int,
+    page_size: int,
+    max_pages: int,
+) -> int | None:
+    """
+    Number of pages to fetch, from totals in the first response.
+
+    Returns None when there is no usable total (fall back to sequential
+    paging), including when a full first page reports only itself — a
+    `count` that may just be the page's own length.
+    """
+    if not isinstance(data, dict):
+        return None
+
+    containers = [data] + [
+        data[key] for key in _PAGINATION_CONTAINERS if isinstance(data.get(key), dict)
+    ]
+
+    pages: int | None = None
+    for container in containers:
+        pages = _first_int(container, _PAGE_COUNT_KEYS)
+        if pages is None:
+            total = _first_int(container, _TOTAL_KEYS)
+            if total is not None:
+                # Servers may cap the page size below what was asked for
+                per_page = min(page_size, first_page_len) or page_size
+                pages = -(-total // per_page)
+        if pages is not None:
+            break
+
+    if pages is None or (pages <= 1 and first_page_len >= page_size):
+        return None
+    return min(max(pages, 1), max_pages)
+
+
+def _first_int(container: dict[str, Any], keys: tuple[str, ...]) -> int | None:
+    """First value under `keys` that is a non-negative integer (or numeric string)."""
+    for key in keys:
+        value = container.get(key)
+        if isinstance(value, bool):
+            continue
+        if isinstance(value, int) and value >= 0:
+            return value
+        if isinstance(value, str) and value.isdigit():
+            return int(value)
+    return None
 
 
 def _extract_records(data: Any) -> list[dict[str, Any]]:
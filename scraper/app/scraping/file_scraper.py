@@ -2,28 +2,48 @@
 File scraper.
 
 Extracts data from downloaded PDF and Excel files.
+
+iter_file_chunks() yields rows in chunks (one per PDF page, or fixed-size
+row batches for Excel/CSV) for the streaming pipeline; extract_file()
+collects them into a single list.
+
+Downloads stream to a temporary file (downloaded_file()) and the
+parsers read from its path, so a file never sits in memory whole and
+can be handed to a worker process by name. Files over
+config.max_file_mb are aborted as soon as that is known.
 """
 
 from __future__ import annotations
 
+import asyncio
 import io
 import logging
-from typing import Any
+import math
+import os
+import tempfile
+import time
+from contextlib import aclosing, asynccontextmanager
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, AsyncIterator, Iterator
 
 import httpx
 import pandas as pd
 
-from app.core.context import RunContext
+from app.core.constants import PDF_PAGES_PER_RANGE, PIPELINE_CHUNK_SIZE
+from app.core.context import ErrorReporter, RunContext
+from app.scraping.pipeline import chunked
+from app.utils.table_utils import NA_VALUES, column_names
+
+if TYPE_CHECKING:
+    from app.core.workers import Segment
 
 logger = logging.getLogger("mandi-agent")
 
-_DEFAULT_HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/131.0.0.0 Safari/537.36"
-    ),
-}
+# Files can be multi-MB; allow longer than the client default
+_DOWNLOAD_TIMEOUT = 60.0
+
+# File content as downloaded: a path on disk, or raw bytes
+FileSource = str | Path | bytes
 
 
 async def scrape_file(
@@ -35,6 +55,8 @@ async def scrape_file(
     """
     Download and extract data from a PDF or Excel file.
 
+    Extraction runs in a thread, off the event loop.
+
     Args:
         ctx: Run context.
         file_url: URL of the file to download.
@@ -43,126 +65,676 @@ async def scrape_file(
     Returns:
         List of row dicts.
     """
-    # Auto-detect file type from URL
     if not file_type:
-        url_lower = file_url.lower()
-        if url_lower.endswith(".pdf"):
-            file_type = "pdf"
-        elif url_lower.endswith((".xlsx", ".xls")):
-            file_type = "excel"
-        elif url_lower.endswith(".csv"):
-            file_type = "csv"
-        else:
+        file_type = detect_file_type(file_url)
+        if not file_type:
             ctx.add_error(file_url, "Cannot determine file type")
             return []
 
-    # Download the file
+    async with downloaded_file(ctx, file_url) as path:
+        if path is None:
+            return []
+        return await asyncio.to_thread(extract_file, path, file_type, file_url, ctx)
+
+
+def detect_file_type(file_url: str) -> str:
+    """Guess the file type ('pdf', 'excel', 'csv') from a URL, or '' if unknown."""
+    url_lower = file_url.lower()
+    if url_lower.endswith(".pdf"):
+        return "pdf"
+    if url_lower.endswith((".xlsx", ".xls")):
+        return "excel"
+    if url_lower.endswith(".csv"):
+        return "csv"
+    return ""
+
+
+@asynccontextmanager
+async def downloaded_file(ctx: RunContext, file_url: str) -> AsyncIterator[Path | None]:
+    """
+    Download a file (through the HTTP cache) to a temporary path.
+
+    Yields the path, which is deleted on exit, or None (after recording
+    the error) if the download failed or was too large. Raises
+    SourceUnchanged if the file matches the last processed copy.
+    """
+    from app.scraping.http_cache import DownloadTooLarge, cached_download
+    from app.scraping.http_client import client_for
+
+    temp_dir = ctx.http_cache.temp_dir if ctx.http_cache is not None else None
+    fd, name = tempfile.mkstemp(prefix="download-", dir=temp_dir)
+    os.close(fd)
+    path = Path(name)
+
     try:
-        async with httpx.AsyncClient(
-            timeout=httpx.Timeout(60.0),
-            follow_redirects=True,
-        ) as client:
-            response = await client.get(file_url, headers=_DEFAULT_HEADERS)
-            response.raise_for_status()
-            content = response.content
-
-    except httpx.HTTPError as exc:
-        ctx.add_error(file_url, f"Download error: {exc}")
-        return []
-
-    # Extract data based on file type
+        error = ""
+        try:
+            await cached_download(
+                ctx,
+                client_for(ctx, file_url),
+                file_url,
+                path,
+                max_bytes=ctx.config.max_file_mb * 1024 * 1024,
+                timeout=max(_DOWNLOAD_TIMEOUT, ctx.config.http_timeout_seconds),
+            )
+        except httpx.HTTPError as exc:
+            error = f"Download error: {exc}"
+        except DownloadTooLarge as exc:
+            error = str(exc)
+
+        if error:
+            ctx.add_error(file_url, error)
+        yield None if error else path
+    finally:
+        path.unlink(missing_ok=True)
+
+
+def extract_file(
+    content: FileSource,
+    file_type: str,
+    file_url: str,
+    ctx: ErrorReporter,
+) -> list[dict[str, Any]]:
+    """Extract rows from downloaded file content based on its type."""
+    return [
+        record
+        for chunk in iter_file_chunks(content, file_type, file_url, ctx)
+        for record in chunk
+    ]
+
+
+def iter_file_chunks(
+    content: FileSource,
+    file_type: str,
+    file_url: str,
+    ctx: ErrorReporter,
+    *,
+    chunk_size: int = PIPELINE_CHUNK_SIZE,
+) -> Iterator[list[dict[str, Any]]]:
+    """Yield rows from a downloaded file (path or bytes) in chunks, based on its type."""
     if file_type == "pdf":
-        return _extract_pdf(content, file_url, ctx)
+        return _iter_pdf(content, file_url, ctx)
     elif file_type == "excel":
-        return _extract_excel(content, file_url, ctx)
+        return _iter_excel(content, file_url, ctx, chunk_size)
     elif file_type == "csv":
-        return _extract_csv(content, file_url, ctx)
+        return _iter_csv(content, file_url, ctx, chunk_size)
     else:
         ctx.add_error(file_url, f"Unsupported file type: {file_type}")
-        return []
+        return iter(())
 
 
-def _extract_pdf(content: bytes, file_url: str, ctx: RunContext) -> list[dict[str, Any]]:
-    """Extract tables from a PDF file using pdfplumber."""
+def _iter_pdf(content: FileSource, file_url: str, ctx: ErrorReporter) -> Iterator[list[dict[str, Any]]]:
+    """Extract tables from a PDF file using pdfplumber, one chunk per page."""
     try:
-        import pdfplumber
+        import pdfplumber  # noqa: F401
     except ImportError:
         ctx.add_error(file_url, "pdfplumber not installed")
-        return []
+        return
 
-    all_records: list[dict[str, Any]] = []
+    total = 0
+    merger = PdfTableMerger()
 
     try:
-        with pdfplumber.open(io.BytesIO(content)) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                tables = page.extract_tables()
-                for table in tables:
-                    if not table or len(table) < 2:
-                        continue
+        for tables in _iter_pdf_tables(content):
+            page_records = merger.feed(tables)
+            if page_records:
+                total += len(page_records)
+                yield page_records
+
+        logger.info("Extracted %d rows from PDF %s", total, file_url)
+
+    except Exception as exc:
+        ctx.add_error(file_url, f"PDF extraction error: {exc}")
+
+
+# ── Page-Parallel PDF ────────────────────────────────────────────────────────
+# With a worker pool, large bulletins are split into page ranges extracted
+# in parallel. Workers return raw cell tables; the coordinator merges them
+# in page order, so headers carry across page breaks exactly as in a
+# sequential pass.
+
+# Raw table cells as pdfplumber returns them
+Table = list[list[str | None]]
+
+
+def _iter_pdf_tables(content: FileSource) -> Iterator[list[Table]]:
+    """Raw tables page by page, one list per page."""
+    import pdfplumber
+
+    with pdfplumber.open(_open(content)) as pdf:
+        for page in pdf.pages:
+            yield page.extract_tables()
+            page.close()
+
+
+def pdf_page_count(content: FileSource) -> int:
+    """Number of pages in a PDF."""
+    import pdfplumber
+
+    with pdfplumber.open(_open(content)) as pdf:
+        return len(pdf.pages)
+
+
+def extract_pdf_tables(content: FileSource, start: int, stop: int) -> list[list[Table]]:
+    """
+    Raw tables on pages [start, stop), one list per page.
 
-                    # First row as headers
-                    headers = [
-                        str(h).strip() if h else f"col_{i}"
-                        for i, h in enumerate(table[0])
-                    ]
+    Top-level so a worker process can run it on the file's path.
+    """
+    import pdfplumber
+
+    pages: list[list[Table]] = []
+    with pdfplumber.open(_open(content)) as pdf:
+        for page in pdf.pages[start:stop]:
+            pages.append(page.extract_tables())
+            page.close()
+    return pages
 
-                    for row in table[1:]:
-                        if not row or all(cell is None for cell in row):
-                            continue
-                        record = {}
-                        for i, cell in enumerate(row):
-                            if i < len(headers):
-                                record[headers[i]] = str(cell).strip() if cell else ""
-                        if any(record.values()):
-                            all_records.append(record)
 
-        logger.info("Extracted %d rows from PDF %s", len(all_records), file_url)
+async def iter_pdf_chunks(
+    ctx: RunContext,
+    path: Path,
+    file_url: str,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """
+    Extract a PDF's tables off the event loop, one chunk per page.
 
+    Adds the pages extracted and the time taken to ctx.pdf_pages /
+    ctx.pdf_seconds.
+    """
+    started = time.perf_counter()
+    merger = PdfTableMerger()
+    total = 0
+    pages = _pdf_page_tables(ctx, path, file_url)
+    try:
+        async with aclosing(pages):
+            async for tables in pages:
+                ctx.pdf_pages += 1
+                page_records = merger.feed(tables)
+                if page_records:
+                    total += len(page_records)
+                    yield page_records
+    finally:
+        ctx.pdf_seconds += time.perf_counter() - started
+
+    logger.info("Extracted %d rows from PDF %s", total, file_url)
+
+
+async def _pdf_page_tables(
+    ctx: RunContext,
+    path: Path,
+    file_url: str,
+) -> AsyncIterator[list[Table]]:
+    """
+    Yield each page's raw tables in page order.
+
+    With a worker pool, every page range is submitted up front and
+    awaited in order; without one, pages are read one at a time in a
+    thread. A failed range is recorded and skipped.
+    """
+    try:
+        if ctx.workers is None:
+            page_tables = _iter_pdf_tables(path)
+            while (tables := await asyncio.to_thread(next, page_tables, None)) is not None:
+                yield tables
+            return
+
+        count = await asyncio.to_thread(pdf_page_count, path)
+    except ImportError:
+        ctx.add_error(file_url, "pdfplumber not installed")
+        return
     except Exception as exc:
         ctx.add_error(file_url, f"PDF extraction error: {exc}")
+        return
+
+    ranges = [
+        (first, min(first + PDF_PAGES_PER_RANGE, count))
+        for first in range(0, count, PDF_PAGES_PER_RANGE)
+    ]
+    pending = [ctx.workers.submit(extract_pdf_tables, str(path), *r) for r in ranges]
+    try:
+        for (first, stop), future in zip(ranges, pending):
+            try:
+                range_tables = await future
+            except Exception as exc:
+                ctx.add_error(file_url, f"PDF extraction error (pages {first + 1}-{stop}): {exc}")
+                continue
+            for tables in range_tables:
+                yield tables
+    finally:
+        for future in pending:
+            future.cancel()
+
 
-    return all_records
+class PdfTableMerger:
+    """
+    Turns a PDF's raw tables, fed one page at a time in order, into row dicts.
 
+    Each table's first row is its header, except for a table continued
+    from the previous page: when the first table on a page has the same
+    width as the last headers and starts with either that header again
+    or a row that isn't header-like (it holds a number other than a
+    year), it keeps the previous headers. A new table whose header
+    happens to hold a year ("Arrivals 2024", "2025") starts afresh.
+    Rows repeating the current header are dropped.
+    """
 
-def _extract_excel(content: bytes, file_url: str, ctx: RunContext) -> list[dict[str, Any]]:
-    """Extract data from an Excel file using pandas + openpyxl."""
-    try:
-        df = pd.read_excel(
-            io.BytesIO(content),
-            engine="openpyxl",
-        )
-        df = df.dropna(how="all")
-        for col in df.select_dtypes(include=["object"]).columns:
-            df[col] = df[col].astype(str).str.strip()
-
-        records = df.to_dict(orient="records")
-        logger.info("Extracted %d rows from Excel %s", len(records), file_url)
+    def __init__(self) -> None:
+        self._headers: list[str] = []
+        self._header_row: list[str] = []
+
+    def feed(self, tables: list[Table]) -> list[dict[str, Any]]:
+        """Return the records of one page's tables."""
+        records: list[dict[str, Any]] = []
+        for index, table in enumerate(tables):
+            if not table:
+                continue
+
+            if index == 0 and self._continues(table[0]):
+                rows = table
+            elif len(table) < 2:
+                continue
+            else:
+                self._header_row = _cells(table[0])
+                self._headers = [
+                    str(h).strip() if h else f"col_{i}" for i, h in enumerate(table[0])
+                ]
+                rows = table[1:]
+
+            for row in rows:
+                if not row or all(cell is None for cell in row):
+                    continue
+                cells = _cells(row)
+                if cells == self._header_row:
+                    continue
+                record = dict(zip(self._headers, cells))
+                if any(record.values()):
+                    records.append(record)
         return records
 
+    def _continues(self, first_row: list[str | None]) -> bool:
+        if not self._headers or len(first_row) != len(self._headers):
+            return False
+        cells = _cells(first_row)
+        return cells == self._header_row or not _looks_like_header(cells)
+
+
+def _cells(row: list[str | None]) -> list[str]:
+    return [str(cell).strip() if cell else "" for cell in row]
+
+
+def _looks_like_header(cells: list[str]) -> bool:
+    """A row of labels: no number in it other than a year ("2024")."""
+    return not any(_is_number(cell) and not _is_year(cell) for cell in cells)
+
+
+def _is_year(text: str) -> bool:
+    return len(text) == 4 and text.isdigit() and 1900 <= int(text) <= 2099
+
+
+def _is_number(text: str) -> bool:
+    try:
+        float(text.replace(",", ""))
+    except ValueError:
+        return False
+    return bool(text)
+
+
+# ── Excel ────────────────────────────────────────────────────────────────────
+# .xlsx is read with openpyxl in read-only mode and .xls with xlrd, one
+# row at a time, so memory stays flat however long the sheet. Every
+# visible sheet whose header matches the first data sheet's is read:
+# state-wide reports often split districts or months across sheets.
+# As with pandas, the first non-empty row is the header, text is
+# stripped, whole numbers are ints, empty cells are NaN and all-empty
+# rows are skipped.
+
+_XLSX_MAGIC = b"PK\x03\x04"
+_XLS_MAGIC = b"\xd0\xcf\x11\xe0"
+
+# Excel cell contents that are missing values, besides empty cells
+_EXCEL_NA = NA_VALUES | {"#VALUE!", "#REF!", "#DIV/0!", "#NUM!", "#NAME?", "#NULL!"}
+
+
+class ExcelBook:
+    """An open .xlsx or .xls workbook, read sheet by sheet, row by row."""
+
+    def __init__(self, content: FileSource) -> None:
+        self.format = excel_format(content)
+        if self.format == "xls":
+            import xlrd
+
+            if isinstance(content, bytes):
+                self._book = xlrd.open_workbook(file_contents=content, on_demand=True)
+            else:
+                self._book = xlrd.open_workbook(str(content), on_demand=True)
+        elif self.format == "xlsx":
+            import openpyxl
+
+            # A file object: openpyxl refuses paths without an .xlsx suffix,
+            # and downloads are saved under temporary names
+            self._file = open(content, "rb") if not isinstance(content, bytes) else _open(content)
+            try:
+                self._book = openpyxl.load_workbook(self._file, read_only=True, data_only=True)
+            except BaseException:
+                self._file.close()
+                raise
+        else:
+            raise ValueError("not an Excel workbook")
+
+    def __enter__(self) -> ExcelBook:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the workbook's file and memory."""
+        if self.format == "xls":
+            self._book.release_resources()
+        else:
+            self._book.close()
+            self._file.close()
+
+    def sheet_names(self) -> list[str]:
+        """Names of the visible sheets, in workbook order."""
+        if self.format == "xls":
+            return [
+                name
+                for index, name in enumerate(self._book.sheet_names())
+                if self._book.sheet_by_index(index).visibility == 0
+            ]
+        return [ws.title for ws in self._book.worksheets if ws.sheet_state == "visible"]
+
+    def rows(self, sheet: str) -> Iterator[list[Any]]:
+        """A sheet's rows as lists of cell values (None for empty cells)."""
+        if self.format == "xls":
+            yield from self._xls_rows(sheet)
+            return
+        ws = self._book[sheet]
+        # Some generators write a wrong <dimension>; read every row instead
+        ws.reset_dimensions()
+        for row in ws.iter_rows(values_only=True):
+            yield list(row)
+
+    def _xls_rows(self, sheet: str) -> Iterator[list[Any]]:
+        import xlrd
+
+        book = self._book
+        ws = book.sheet_by_name(sheet)
+        try:
+            for cells in ws.get_rows():
+                row: list[Any] = []
+                for cell in cells:
+                    if cell.ctype == xlrd.XL_CELL_DATE:
+                        row.append(xlrd.xldate.xldate_as_datetime(cell.value, book.datemode))
+                    elif cell.ctype == xlrd.XL_CELL_BOOLEAN:
+                        row.append(bool(cell.value))
+                    elif cell.ctype in (xlrd.XL_CELL_NUMBER, xlrd.XL_CELL_TEXT):
+                        row.append(cell.value)
+                    else:
+                        row.append(None)
+                yield row
+        finally:
+            book.unload_sheet(sheet)
+
+
+def excel_format(content: FileSource) -> str:
+    """
+    "xlsx", "xls" or "html" from a file's first bytes ("" if none of them).
+
+    Many portals serve an HTML table under an .xls name.
+    """
+    if isinstance(content, bytes):
+        head = content[:512]
+    else:
+        with open(content, "rb") as fh:
+            head = fh.read(512)
+    if head.startswith(_XLSX_MAGIC):
+        return "xlsx"
+    if head.startswith(_XLS_MAGIC):
+        return "xls"
+    if head.lstrip(b"\xef\xbb\xbf \t\r\n").startswith(b"<"):
+        return "html"
+    return ""
+
+
+def excel_sheet_names(content: FileSource) -> list[str]:
+    """
+    The sheets to read: visible sheets whose header matches the first
+    sheet that has one (as a set, so column order may differ).
+    """
+    with ExcelBook(content) as book:
+        return _relevant_sheets(book)
+
+
+def extract_excel_sheet(content: FileSource, sheet: str) -> list[Segment]:
+    """
+    All records of one sheet, packed as segments.
+
+    Top-level so a worker process can run it on the file's path.
+    """
+    from app.core.workers import pack_records
+
+    with ExcelBook(content) as book:
+        return pack_records(list(_sheet_records(book, sheet)))
+
+
+async def iter_excel_chunks(
+    ctx: RunContext,
+    path: Path,
+    file_url: str,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """
+    Extract an Excel file's rows off the event loop, in row chunks.
+
+    With a worker pool, sheets are read concurrently (at most one per
+    worker in flight) and yielded in workbook order; without one, the
+    rows stream from a thread.
+    """
+    if ctx.workers is None or excel_format(path) not in ("xlsx", "xls"):
+        chunks = _iter_excel(path, file_url, ctx, PIPELINE_CHUNK_SIZE)
+        while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+            yield chunk
+        return
+
+    try:
+        sheets = await asyncio.to_thread(excel_sheet_names, path)
+    except ImportError as exc:
+        ctx.add_error(file_url, f"{exc.name or 'Excel reader'} not installed")
+        return
     except Exception as exc:
         ctx.add_error(file_url, f"Excel extraction error: {exc}")
-        return []
+        return
+
+    from app.core.workers import unpack_records
+
+    total = 0
+    pending: dict[str, asyncio.Future[list[Segment]]] = {}
+    window = max(1, ctx.workers.size)
+    try:
+        for index, sheet in enumerate(sheets):
+            for ahead in sheets[index:index + window]:
+                if ahead not in pending:
+                    pending[ahead] = ctx.workers.submit(extract_excel_sheet, str(path), ahead)
+            try:
+                segments = await pending.pop(sheet)
+            except Exception as exc:
+                ctx.add_error(file_url, f"Excel extraction error (sheet {sheet}): {exc}")
+                continue
+            for chunk in chunked(unpack_records(segments), PIPELINE_CHUNK_SIZE):
+                total += len(chunk)
+                yield chunk
+    finally:
+        for future in pending.values():
+            future.cancel()
+
+    logger.info("Extracted %d rows from %d sheet(s) of Excel %s", total, len(sheets), file_url)
+
+
+def _iter_excel(
+    content: FileSource,
+    file_url: str,
+    ctx: ErrorReporter,
+    chunk_size: int,
+) -> Iterator[list[dict[str, Any]]]:
+    """Stream rows from every relevant sheet of an Excel file, in row chunks."""
+    total = 0
+    sheets: list[str] = []
+
+    try:
+        if excel_format(content) == "html":
+            yield from _iter_html_excel(content, file_url, ctx, chunk_size)
+            return
+
+        with ExcelBook(content) as book:
+            sheets = _relevant_sheets(book)
+            for sheet in sheets:
+                for chunk in chunked(_sheet_records(book, sheet), chunk_size):
+                    total += len(chunk)
+                    yield chunk
+
+    except ImportError as exc:
+        ctx.add_error(file_url, f"{exc.name or 'Excel reader'} not installed")
+        return
+    except Exception as exc:
+        ctx.add_error(file_url, f"Excel extraction error: {exc}")
+        return
+
+    logger.info("Extracted %d rows from %d sheet(s) of Excel %s", total, len(sheets), file_url)
+
+
+def _iter_html_excel(
+    content: FileSource,
+    file_url: str,
+    ctx: ErrorReporter,
+    chunk_size: int,
+) -> Iterator[list[dict[str, Any]]]:
+    """Rows of an HTML table served as an Excel file."""
+    from app.scraping.html_scraper import extract_table_from_html
+
+    if isinstance(content, bytes):
+        data = content
+    else:
+        data = Path(content).read_bytes()
+    html = data.decode("utf-8", errors="replace")
+    yield from chunked(extract_table_from_html(html, page_url=file_url, ctx=ctx), chunk_size)
+
+
+def _relevant_sheets(book: ExcelBook) -> list[str]:
+    sheets: list[str] = []
+    first: set[Any] | None = None
+    for sheet in book.sheet_names():
+        header = _header(book.rows(sheet))
+        if header is None:
+            continue
+        columns = set(column_names(header))
+        if first is None:
+            first = columns
+        elif columns != first:
+            logger.debug("Skipping sheet %r: its columns differ from the first sheet's", sheet)
+            continue
+        sheets.append(sheet)
+    return sheets
+
+
+def _header(rows: Iterator[list[Any]]) -> list[Any] | None:
+    """The first non-empty row, without trailing empty cells (None if none)."""
+    for row in rows:
+        header = [_header_value(value) for value in row]
+        while header and header[-1] is None:
+            header.pop()
+        if header:
+            return header
+    return None
+
+
+def _sheet_records(book: ExcelBook, sheet: str) -> Iterator[dict[str, Any]]:
+    """A sheet's data rows as dicts keyed by its header."""
+    rows = book.rows(sheet)
+    header = _header(rows)
+    if header is None:
+        return
+    names = column_names(header)
+
+    for row in rows:
+        values = [_cell_value(value) for value in row]
+        if all(value is _MISSING for value in values):
+            continue
+        # Cells beyond the header are kept under "Unnamed: i", as pandas does
+        extra = values[len(names):]
+        if any(value is not _MISSING for value in extra):
+            names.extend(f"Unnamed: {i}" for i in range(len(names), len(values)))
+        values.extend([_MISSING] * (len(names) - len(values)))
+        yield {
+            name: math.nan if value is _MISSING else value
+            for name, value in zip(names, values)
+        }
+
+
+_MISSING = object()
+
 
+def _cell_value(value: Any) -> Any:
+    """A cell as pandas would type it; _MISSING for empty and NA cells."""
+    if value is None:
+        return _MISSING
+    if isinstance(value, str):
+        value = value.strip()
+        return _MISSING if value in _EXCEL_NA else value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _header_value(value: Any) -> Any:
+    if isinstance(value, str):
+        return value if value.strip() else None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _iter_csv(
+    content: FileSource,
+    file_url: str,
+    ctx: ErrorReporter,
+    chunk_size: int,
+) -> Iterator[list[dict[str, Any]]]:
+    """Extract data from a CSV file using pandas, in row chunks."""
+    total = 0
 
-def _extract_csv(content: bytes, file_url: str, ctx: RunContext) -> list[dict[str, Any]]:
-    """Extract data from a CSV file using pandas."""
     try:
-        # Try common encodings
+        # Try common encodings; a decode error after the first chunk has
+        # been yielded can't be retried and is reported instead
         for encoding in ("utf-8", "latin-1", "cp1252"):
             try:
-                df = pd.read_csv(io.BytesIO(content), encoding=encoding)
+                reader = pd.read_csv(
+                    _open(content),
+                    encoding=encoding,
+                    chunksize=chunk_size,
+                )
+                for df in reader:
+                    df = df.dropna(how="all")
+                    if df.empty:
+                        continue
+                    total += len(df)
+                    yield df.to_dict(orient="records")
                 break
             except UnicodeDecodeError:
+                if total:
+                    raise
                 continue
         else:
             ctx.add_error(file_url, "Cannot decode CSV with known encodings")
-            return []
+            return
 
-        df = df.dropna(how="all")
-        records = df.to_dict(orient="records")
-        logger.info("Extracted %d rows from CSV %s", len(records), file_url)
-        return records
+        logger.info("Extracted %d rows from CSV %s", total, file_url)
 
     except Exception as exc:
         ctx.add_error(file_url, f"CSV extraction error: {exc}")
-        return []
+
+
+def _open(content: FileSource) -> str | Path | IO[bytes]:
+    """What the parsers read: the path itself, or a fresh buffer over bytes."""
+    return io.BytesIO(content) if isinstance(content, bytes) else content
@@ -1,11 +1,15 @@
 """
 HTML table scraper.
 
-Extracts data tables from web pages using BeautifulSoup and pandas.
+Extracts data tables from web pages, reading them directly from the
+lxml tree (html_table) with BeautifulSoup and pandas as the fallback.
+Extraction runs in a thread (or a worker process) so the event loop
+keeps serving other sources while a large page is parsed.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 import io
@@ -14,18 +18,10 @@ import httpx
 import pandas as pd
 from bs4 import BeautifulSoup
 
-from app.core.context import RunContext
+from app.core.context import ErrorReporter, RunContext
 
 logger = logging.getLogger("mandi-agent")
 
-_DEFAULT_HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/131.0.0.0 Safari/537.36"
-    ),
-}
-
 
 async def scrape_html_table(
     ctx: RunContext,
@@ -46,20 +42,13 @@ async def scrape_html_table(
     Returns:
         List of row dicts with column headers as keys.
     """
-    try:
-        async with httpx.AsyncClient(
-            timeout=httpx.Timeout(30.0),
-            follow_redirects=True,
-        ) as client:
-            response = await client.get(page_url, headers=_DEFAULT_HEADERS)
-            response.raise_for_status()
-            html = response.text
-
-    except httpx.HTTPError as exc:
-        ctx.add_error(page_url, f"HTTP error: {exc}")
+    html = await fetch_html(ctx, page_url)
+    if html is None:
         return []
 
-    return extract_table_from_html(
+    # Parsing a large results page takes long enough to stall other sources
+    return await asyncio.to_thread(
+        extract_table_from_html,
         html,
         page_url=page_url,
         selector=selector,
@@ -68,19 +57,81 @@ async def scrape_html_table(
     )
 
 
+async def fetch_html(ctx: RunContext, page_url: str) -> str | None:
+    """
+    Fetch a web page (through the HTTP cache) and return its decoded HTML.
+
+    Returns None (after recording the error) if the request fails.
+    Raises SourceUnchanged if the page matches the last processed copy.
+    """
+    from app.scraping.http_cache import cached_get
+    from app.scraping.http_client import client_for
+
+    try:
+        client = client_for(ctx, page_url)
+        response = await cached_get(ctx, client, page_url)
+        return response.text
+
+    except httpx.HTTPError as exc:
+        ctx.add_error(page_url, f"HTTP error: {exc}")
+        return None
+
+
 def extract_table_from_html(
     html: str,
     *,
     page_url: str = "",
     selector: str = "",
     table_index: int = 0,
-    ctx: RunContext | None = None,
+    ctx: ErrorReporter | None = None,
 ) -> list[dict[str, Any]]:
     """
     Parse HTML and extract a table as a list of dicts.
 
-    Uses pandas.read_html for robust table parsing with
-    BeautifulSoup as the underlying parser.
+    Reads the table straight from the lxml tree (see html_table), falling
+    back to pandas.read_html for selectors and table layouts the direct
+    reader doesn't handle.
+    """
+    from app.scraping.html_table import parse_document, read_table, select_tables
+
+    try:
+        document = parse_document(html)
+        tables = select_tables(document, selector)
+        if tables is None:
+            return _read_html_table(html, page_url, selector, table_index, ctx)
+
+        if not tables:
+            _report(ctx, page_url, _not_found_message(page_url, selector))
+            return []
+
+        records = read_table(tables[min(table_index, len(tables) - 1)])
+        if records is None:
+            return _read_html_table(html, page_url, selector, table_index, ctx)
+
+        logger.info(
+            "Extracted %d rows from table on %s",
+            len(records),
+            page_url,
+        )
+        return records
+
+    except Exception as exc:
+        _report(ctx, page_url, f"Table extraction error: {exc}", level=logging.ERROR)
+        return []
+
+
+def _read_html_table(
+    html: str,
+    page_url: str,
+    selector: str,
+    table_index: int,
+    ctx: ErrorReporter | None,
+) -> list[dict[str, Any]]:
+    """
+    Extract a table with BeautifulSoup and pandas.read_html.
+
+    Handles any selector and table layout, at the cost of parsing the
+    page with BeautifulSoup and the table again with pandas.
     """
     try:
         soup = BeautifulSoup(html, "lxml")
@@ -88,22 +139,12 @@ def extract_table_from_html(
         # Find the target table
         if selector:
             target = soup.select(selector)
-            if not target:
-                msg = f"Selector '{selector}' not found on {page_url}"
-                if ctx:
-                    ctx.add_error(page_url, msg)
-                logger.warning(msg)
-                return []
-            table_html = str(target[min(table_index, len(target) - 1)])
         else:
-            tables = soup.find_all("table")
-            if not tables:
-                msg = f"No tables found on {page_url}"
-                if ctx:
-                    ctx.add_error(page_url, msg)
-                logger.warning(msg)
-                return []
-            table_html = str(tables[min(table_index, len(tables) - 1)])
+            target = soup.find_all("table")
+        if not target:
+            _report(ctx, page_url, _not_found_message(page_url, selector))
+            return []
+        table_html = str(target[min(table_index, len(target) - 1)])
 
         # Use pandas for robust table parsing
         dfs = pd.read_html(
@@ -130,8 +171,23 @@ def extract_table_from_html(
         return records
 
     except Exception as exc:
-        msg = f"Table extraction error: {exc}"
-        if ctx:
-            ctx.add_error(page_url, msg)
-        logger.error(msg)
+        _report(ctx, page_url, f"Table extraction error: {exc}", level=logging.ERROR)
         return []
+
+
+def _not_found_message(page_url: str, selector: str) -> str:
+    if selector:
+        return f"Selector '{selector}' not found on {page_url}"
+    return f"No tables found on {page_url}"
+
+
+def _report(
+    ctx: ErrorReporter | None,
+    page_url: str,
+    msg: str,
+    *,
+    level: int = logging.WARNING,
+) -> None:
+    if ctx:
+        ctx.add_error(page_url, msg)
+    logger.log(level, msg)
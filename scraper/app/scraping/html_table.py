@@ -0,0 +1,283 @@
+"""
+Single-pass HTML table reader.
+
+read_table() turns an lxml <table> element straight into row dicts:
+rows are walked once, colspan / rowspan are expanded as they are read,
+and each column's type is inferred from its cells. The page is parsed
+once — no BeautifulSoup tree, no re-serialized table for pandas to
+parse again, no DataFrame.
+
+The output matches what html_scraper's pandas path (read_html + strip +
+to_dict) produces for the same table: the same header detection,
+"Unnamed: i" and ".1" column names, integer column names when there is
+no header, thousands separators removed from numbers, int / float /
+bool columns and NaN for missing cells. Tables that path handles in
+ways not reproduced here — multi-row headers (MultiIndex columns),
+nested or hidden tables, single-column tables — return None, and the
+caller falls back to pandas.
+
+select_tables() supports the selectors discovery generates (`table`,
+`table#id`, `table.class`, `table:nth-of-type(n)`, and descendant chains
+of those); anything else returns None for the same fallback.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from typing import Any
+
+from lxml import html as lxml_html
+
+from app.utils.table_utils import NA_VALUES, column_names
+
+_TRUE_VALUES = frozenset({"True", "TRUE", "true"})
+_FALSE_VALUES = frozenset({"False", "FALSE", "false"})
+
+# Same as pandas.io.html: newlines and runs of whitespace become one space
+_WHITESPACE = re.compile(r"[\r\n]+|\s{2,}")
+# Cells whose commas are thousands separators (as pandas' python parser)
+_THOUSANDS_NUMBER = re.compile(r"^[\-\+]?([0-9]+,|[0-9])*(\.[0-9]*)?([0-9]?(E|e)\-?[0-9]+)?$")
+_INT = re.compile(r"[-+]?[0-9]+")
+_FLOAT = re.compile(r"[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?")
+_INFINITY = frozenset({"inf", "+inf", "-inf", "infinity", "+infinity", "-infinity"})
+
+_INT64_MIN, _INT64_MAX = -(2 ** 63), 2 ** 63 - 1
+
+# One simple selector: tag, #id, .class..., optional :nth-of-type(n)
+_SIMPLE_SELECTOR = re.compile(
+    r"(?P<tag>[a-zA-Z][\w-]*|\*)?(?P<attrs>(?:[#.][\w-]+)*)"
+    r"(?::nth-of-type\((?P<nth>[0-9]+)\))?"
+)
+
+
+def parse_document(html: str) -> lxml_html.HtmlElement:
+    """Parse a page; <br> becomes a line break in cell text, as in read_html."""
+    document = lxml_html.document_fromstring(html)
+    for br in document.iter("br"):
+        br.tail = "\n" + (br.tail or "")
+    return document
+
+
+def select_tables(
+    document: lxml_html.HtmlElement,
+    selector: str = "",
+) -> list[lxml_html.HtmlElement] | None:
+    """
+    Elements matching `selector` (all <table>s without one), in document order.
+
+    Returns None when the selector is beyond the supported subset.
+    """
+    if not selector:
+        return document.xpath("//table")
+    xpath = _selector_to_xpath(selector)
+    if xpath is None:
+        return None
+    return document.xpath(xpath)
+
+
+def read_table(table: lxml_html.HtmlElement) -> list[dict[Any, Any]] | None:
+    """
+    Read a <table> element into row dicts.
+
+    Returns None when the table needs the pandas path (see module docstring).
+    """
+    if table.tag != "table" or _needs_pandas(table):
+        return None
+
+    head_rows: list[Any] = []
+    for thead in table.iter("thead"):
+        head_rows.extend(thead.iterfind("tr"))
+    body_rows = table.xpath(".//tbody//tr") + table.findall("tr")
+    foot_rows = table.xpath(".//tfoot//tr")
+
+    if not head_rows:
+        # No <thead>: leading rows made only of <th> cells are the header
+        while body_rows and all(cell.tag == "th" for cell in _cells(body_rows[0])):
+            head_rows.append(body_rows.pop(0))
+    if len(head_rows) > 1:
+        return None
+
+    head, remainder = _expand_spans(head_rows, [], overflow=True)
+    body, remainder = _expand_spans(body_rows, remainder, overflow=bool(foot_rows))
+    foot, _ = _expand_spans(foot_rows, remainder, overflow=False)
+
+    rows = head + body + foot
+    width = max((len(row) for row in rows), default=0)
+    if width < 2:
+        return None
+    for row in rows:
+        row.extend([""] * (width - len(row)))
+
+    if head:
+        names = column_names(rows[0])
+        rows = rows[1:]
+    else:
+        names = list(range(width))
+    if not rows:
+        return []
+
+    columns = [_convert_column(column) for column in zip(*rows)]
+    if any(column is None for column in columns):
+        return None
+
+    records: list[dict[Any, Any]] = []
+    for i in range(len(rows)):
+        # Rows with every cell missing are dropped
+        if all(missing[i] for _, missing in columns):
+            continue
+        records.append({name: values[i] for name, (values, _) in zip(names, columns)})
+    return records
+
+
+# ── Rows and Cells ───────────────────────────────────────────────────────────
+
+
+def _needs_pandas(table: lxml_html.HtmlElement) -> bool:
+    """Whether read_html treats the table in ways read_table doesn't reproduce."""
+    if table.find(".//table") is not None or table.find(".//style") is not None:
+        return True
+    # A <thead> holding cells without a <tr>
+    if table.xpath(".//thead/td|.//thead/th"):
+        return True
+    # read_html skips hidden tables and drops hidden elements
+    for element in table.iter():
+        style = element.get("style")
+        if style and "display:none" in style.replace(" ", ""):
+            return True
+    return False
+
+
+def _cells(row: lxml_html.HtmlElement) -> list[lxml_html.HtmlElement]:
+    return [child for child in row if child.tag in ("td", "th")]
+
+
+def _expand_spans(
+    rows: list[lxml_html.HtmlElement],
+    remainder: list[tuple[int, str, int]],
+    *,
+    overflow: bool,
+) -> tuple[list[list[str]], list[tuple[int, str, int]]]:
+    """
+    Cell texts of `rows`, with colspan / rowspan cells copied into each
+    position they cover.
+
+    `remainder` carries rowspans still open from the previous section
+    (column, text, rows left). Without `overflow`, rows implied by spans
+    past the last <tr> are emitted instead of returned.
+    """
+    texts_by_row: list[list[str]] = []
+    for tr in rows:
+        texts: list[str] = []
+        next_remainder: list[tuple[int, str, int]] = []
+        index = 0
+        for td in _cells(tr):
+            # Cells spanning down from earlier rows that come before this one
+            while remainder and remainder[0][0] <= index:
+                prev_index, prev_text, prev_rowspan = remainder.pop(0)
+                texts.append(prev_text)
+                if prev_rowspan > 1:
+                    next_remainder.append((prev_index, prev_text, prev_rowspan - 1))
+                index += 1
+
+            text = _WHITESPACE.sub(" ", td.text_content().strip())
+            rowspan = int(td.get("rowspan") or 1)
+            colspan = int(td.get("colspan") or 1)
+            for _ in range(colspan):
+                texts.append(text)
+                if rowspan > 1:
+                    next_remainder.append((index, text, rowspan - 1))
+                index += 1
+
+        for prev_index, prev_text, prev_rowspan in remainder:
+            texts.append(prev_text)
+            if prev_rowspan > 1:
+                next_remainder.append((prev_index, prev_text, prev_rowspan - 1))
+
+        texts_by_row.append(texts)
+        remainder = next_remainder
+
+    if not overflow:
+        while remainder:
+            texts_by_row.append([text for _, text, _ in remainder])
+            remainder = [(i, text, span - 1) for i, text, span in remainder if span > 1]
+
+    return texts_by_row, remainder
+
+
+# ── Column Types ─────────────────────────────────────────────────────────────
+
+
+def _convert_column(texts: tuple[str, ...]) -> tuple[list[Any], list[bool]] | None:
+    """
+    Type one column's cells as read_html would.
+
+    Returns the values and which of them are missing, or None for a
+    column pandas would type differently (integers beyond int64).
+    """
+    missing = [text in NA_VALUES for text in texts]
+    texts = tuple(
+        text.replace(",", "") if "," in text and _THOUSANDS_NUMBER.match(text) else text
+        for text in texts
+    )
+    present = [text for text, na in zip(texts, missing) if not na]
+
+    if not present:
+        return [math.nan] * len(texts), missing
+
+    if all(_INT.fullmatch(text) for text in present):
+        numbers = [int(text) for text in present]
+        if min(numbers) < _INT64_MIN or max(numbers) > _INT64_MAX:
+            return None
+        if not any(missing):
+            return numbers, missing
+        return [math.nan if na else float(text) for text, na in zip(texts, missing)], missing
+
+    if all(_FLOAT.fullmatch(text) or text.lower() in _INFINITY for text in present):
+        return [math.nan if na else float(text) for text, na in zip(texts, missing)], missing
+
+    if all(text in _TRUE_VALUES or text in _FALSE_VALUES for text in present):
+        if not any(missing):
+            return [text in _TRUE_VALUES for text in texts], missing
+        # Booleans with gaps stay objects, which the caller stringifies
+        texts = tuple(str(text in _TRUE_VALUES) for text in texts)
+
+    na = _text_na()
+    return [na if is_na else text for text, is_na in zip(texts, missing)], missing
+
+
+def _text_na() -> Any:
+    """Missing value in a text column: NaN with pandas' string dtype, else "nan"."""
+    import pandas as pd
+
+    try:
+        return math.nan if pd.get_option("future.infer_string") else "nan"
+    except KeyError:
+        return "nan"
+
+
+# ── Selectors ────────────────────────────────────────────────────────────────
+
+
+def _selector_to_xpath(selector: str) -> str | None:
+    """XPath for a descendant chain of simple selectors, or None if unsupported."""
+    steps: list[str] = []
+    for part in selector.split():
+        match = _SIMPLE_SELECTOR.fullmatch(part)
+        if match is None or not (match["tag"] or match["attrs"]):
+            return None
+        tag = (match["tag"] or "*").lower()
+        predicates: list[str] = []
+        for kind, name in re.findall(r"([#.])([\w-]+)", match["attrs"]):
+            if kind == "#":
+                predicates.append(f"@id='{name}'")
+            else:
+                predicates.append(
+                    f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+                )
+        if match["nth"]:
+            if tag == "*":
+                return None
+            predicates.append(f"count(preceding-sibling::{tag}) = {int(match['nth']) - 1}")
+        steps.append(tag + "".join(f"[{p}]" for p in predicates))
+    return "//" + "//".join(steps) if steps else None
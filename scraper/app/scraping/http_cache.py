@@ -0,0 +1,525 @@
+"""
+Persistent HTTP cache.
+
+An on-disk cache for the documents scrapers download (HTML pages, PDF /
+Excel / CSV files). Per URL it keeps the body, ETag, Last-Modified and a
+SHA-256 of the content:
+
+  - Requests are made conditional (If-None-Match / If-Modified-Since);
+    a response still fresh per Cache-Control max-age / Expires is served
+    without a request. no-store responses are never cached.
+  - When the server answers 304, or sends a body identical to the last
+    one the same source fully processed with the same normalization plan,
+    the fetch raises SourceUnchanged and the scrape short-circuits before
+    parsing. Other sources reading the URL, and the source itself after
+    a schemaMapping / conversions change, still parse it.
+  - Bodies are stored by hash under `bodies/`, indexed in SQLite, and
+    evicted least-recently-used once the cache exceeds its size bound.
+
+Pages go through cached_get(), which returns the body in memory. Files
+go through cached_download(), which streams the body to a path on disk
+(hard-linked into the cache rather than copied) so it is never held in
+memory whole.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import hashlib
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from dataclasses import astuple, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Awaitable, Callable
+
+import httpx
+
+from app.scraping.retry import send_with_retries
+
+if TYPE_CHECKING:
+    from app.core.context import RunContext
+
+logger = logging.getLogger("mandi-agent")
+
+
+class SourceUnchanged(Exception):
+    """The document at `url` is identical to the copy this source last processed."""
+
+    def __init__(self, url: str) -> None:
+        super().__init__(f"Unchanged since last run: {url}")
+        self.url = url
+
+
+class DownloadTooLarge(Exception):
+    """The document at `url` is larger than the allowed maximum."""
+
+    def __init__(self, url: str, max_bytes: int) -> None:
+        super().__init__(f"File exceeds {max_bytes // (1024 * 1024)} MB limit: {url}")
+        self.url = url
+
+
+@dataclass(frozen=True, slots=True)
+class CacheEntry:
+    """Index row for one cached URL."""
+
+    url: str
+    sha256: str
+    size: int
+    etag: str
+    last_modified: str
+    content_type: str
+    fresh_until: float
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    url TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT NOT NULL DEFAULT '',
+    last_modified TEXT NOT NULL DEFAULT '',
+    content_type TEXT NOT NULL DEFAULT '',
+    fresh_until REAL NOT NULL DEFAULT 0,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+CREATE TABLE IF NOT EXISTS processed (
+    url TEXT NOT NULL,
+    source_id TEXT NOT NULL,
+    plan_fingerprint TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    PRIMARY KEY (url, source_id, plan_fingerprint)
+);
+"""
+
+_COLUMNS = "url, sha256, size, etag, last_modified, content_type, fresh_until"
+
+
+class HttpCache:
+    """
+    SQLite-indexed body store with LRU eviction.
+
+    Methods are synchronous and thread-safe; callers on the event loop
+    use the async wrappers (or asyncio.to_thread) so disk I/O on large
+    files doesn't block it.
+    """
+
+    def __init__(self, directory: str | Path, *, max_bytes: int) -> None:
+        self._dir = Path(directory)
+        self._bodies = self._dir / "bodies"
+        self._bodies.mkdir(parents=True, exist_ok=True)
+        # Downloads in progress; on the same filesystem so they can be linked in
+        self.temp_dir = self._dir / "tmp"
+        self.temp_dir.mkdir(exist_ok=True)
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self._dir / "index.sqlite", check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+
+    # ── Index ────────────────────────────────────────────────────────────
+
+    def lookup(self, url: str) -> CacheEntry | None:
+        """Return the entry for `url` (and mark it recently used), or None."""
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {_COLUMNS} FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE entries SET accessed_at = ? WHERE url = ?", (time.time(), url)
+            )
+            self._db.commit()
+        entry = CacheEntry(*row)
+        return entry if self._body_path(entry.sha256).exists() else None
+
+    def read_body(self, entry: CacheEntry) -> bytes:
+        """Read a cached body."""
+        return self._body_path(entry.sha256).read_bytes()
+
+    def copy_body(self, entry: CacheEntry, dest: Path) -> None:
+        """Place a cached body at `dest` (a hard link where possible)."""
+        _link_or_copy(self._body_path(entry.sha256), dest)
+
+    def store(self, url: str, response: httpx.Response, body: bytes) -> CacheEntry | None:
+        """
+        Store a 200 response. Returns the new entry, or None for no-store.
+
+        Processed markers are kept, so a body identical to one a source
+        processed still counts as processed for that source.
+        """
+        def write(path: Path) -> None:
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(body)
+            tmp.replace(path)
+
+        return self._store(url, response, hashlib.sha256(body).hexdigest(), len(body), write)
+
+    def store_file(
+        self,
+        url: str,
+        response: httpx.Response,
+        source: Path,
+        sha: str,
+    ) -> CacheEntry | None:
+        """Like store(), for a body already written to `source` (which is kept)."""
+        def write(path: Path) -> None:
+            tmp = path.with_suffix(".tmp")
+            _link_or_copy(source, tmp)
+            tmp.replace(path)
+
+        return self._store(url, response, sha, source.stat().st_size, write)
+
+    def _store(
+        self,
+        url: str,
+        response: httpx.Response,
+        sha: str,
+        size: int,
+        write: Callable[[Path], None],
+    ) -> CacheEntry | None:
+        cache_control = _cache_control(response.headers)
+        if "no-store" in cache_control:
+            return None
+
+        path = self._body_path(sha)
+
+        with self._lock:
+            if not path.exists():
+                write(path)
+
+            row = self._db.execute(
+                "SELECT sha256 FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+            entry = CacheEntry(
+                url=url,
+                sha256=sha,
+                size=size,
+                etag=response.headers.get("etag", ""),
+                last_modified=response.headers.get("last-modified", ""),
+                content_type=response.headers.get("content-type", ""),
+                fresh_until=_fresh_until(response.headers, cache_control),
+            )
+            self._db.execute(
+                f"INSERT OR REPLACE INTO entries ({_COLUMNS}, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (*astuple(entry), time.time()),
+            )
+            if row and row[0] != sha:
+                self._drop_body_if_unused(row[0])
+            self._db.commit()
+            self._evict()
+        return entry
+
+    def refresh(self, entry: CacheEntry, response: httpx.Response) -> CacheEntry:
+        """Update an entry's validators / freshness after a 304."""
+        cache_control = _cache_control(response.headers)
+        updated = CacheEntry(
+            url=entry.url,
+            sha256=entry.sha256,
+            size=entry.size,
+            etag=response.headers.get("etag", entry.etag),
+            last_modified=response.headers.get("last-modified", entry.last_modified),
+            content_type=entry.content_type,
+            fresh_until=_fresh_until(response.headers, cache_control),
+        )
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET etag = ?, last_modified = ?, fresh_until = ? WHERE url = ?",
+                (updated.etag, updated.last_modified, updated.fresh_until, entry.url),
+            )
+            self._db.commit()
+        return updated
+
+    def is_processed(self, entry: CacheEntry, source_id: str, plan_fingerprint: str) -> bool:
+        """Whether this exact body went through a full scrape of the source with this plan."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT sha256 FROM processed WHERE url = ? AND source_id = ? AND plan_fingerprint = ?",
+                (entry.url, source_id, plan_fingerprint),
+            ).fetchone()
+        return row is not None and row[0] == entry.sha256
+
+    def mark_processed(self, url: str, sha: str, source_id: str, plan_fingerprint: str) -> None:
+        """Record that body `sha` of `url` was fully scraped and saved by the source with this plan."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO processed (url, source_id, plan_fingerprint, sha256) "
+                "VALUES (?, ?, ?, ?)",
+                (url, source_id, plan_fingerprint, sha),
+            )
+            self._db.commit()
+
+    def close(self) -> None:
+        """Close the index."""
+        with self._lock:
+            self._db.close()
+
+    # ── Eviction ─────────────────────────────────────────────────────────
+
+    def _evict(self) -> None:
+        """Drop least-recently-used entries until under the size bound (lock held)."""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self._max_bytes:
+            return
+
+        rows = self._db.execute(
+            "SELECT url, sha256, size FROM entries ORDER BY accessed_at"
+        ).fetchall()
+        for url, sha, size in rows:
+            if total <= self._max_bytes:
+                break
+            self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self._db.execute("DELETE FROM processed WHERE url = ?", (url,))
+            total -= size
+            self._drop_body_if_unused(sha)
+            logger.debug("HTTP cache evicted %s", url)
+        self._db.commit()
+
+    def _drop_body_if_unused(self, sha: str) -> None:
+        """Delete a body file no entry references any more (lock held)."""
+        shared = self._db.execute(
+            "SELECT 1 FROM entries WHERE sha256 = ? LIMIT 1", (sha,)
+        ).fetchone()
+        if not shared:
+            self._body_path(sha).unlink(missing_ok=True)
+
+    def _body_path(self, sha: str) -> Path:
+        return self._bodies / sha
+
+
+# ── Fetching ─────────────────────────────────────────────────────────────────
+
+
+async def cached_get(
+    ctx: RunContext,
+    client: httpx.AsyncClient,
+    url: str,
+    *,
+    headers: dict[str, str] | None = None,
+    timeout: float | None = None,
+) -> httpx.Response:
+    """
+    GET `url` through the run's HTTP cache (or directly if there is none).
+
+    Returns a response whose body is the current document, whether it
+    came from the network or the cache. Raises SourceUnchanged when the
+    document matches the copy the source last processed (with its current
+    plan), and httpx errors as usual.
+    Transient failures are retried (see app/scraping/retry.py).
+    """
+    request_kwargs = {} if timeout is None else {"timeout": timeout}
+
+    cache = ctx.http_cache
+    if cache is None:
+        response = await send_with_retries(
+            ctx, url, lambda: client.get(url, headers=headers, **request_kwargs)
+        )
+        response.raise_for_status()
+        return response
+
+    entry = await asyncio.to_thread(cache.lookup, url)
+
+    if entry is not None and entry.fresh_until > time.time():
+        ctx.cache_hits += 1
+        await _skip_if_processed(ctx, cache, entry)
+        return await _cached_response(cache, entry, url)
+
+    request_headers = dict(headers or {})
+    if entry is not None:
+        if entry.etag:
+            request_headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            request_headers["If-Modified-Since"] = entry.last_modified
+
+    response = await send_with_retries(
+        ctx, url, lambda: client.get(url, headers=request_headers, **request_kwargs)
+    )
+
+    if response.status_code == 304 and entry is not None:
+        ctx.cache_hits += 1
+        entry = await asyncio.to_thread(cache.refresh, entry, response)
+        await _skip_if_processed(ctx, cache, entry)
+        return await _cached_response(cache, entry, url)
+
+    response.raise_for_status()
+    ctx.cache_misses += 1
+
+    stored = await asyncio.to_thread(cache.store, url, response, response.content)
+    if stored is not None:
+        await _skip_if_processed(ctx, cache, stored)
+    return response
+
+
+async def cached_download(
+    ctx: RunContext,
+    client: httpx.AsyncClient,
+    url: str,
+    dest: Path,
+    *,
+    max_bytes: int,
+    timeout: float | None = None,
+) -> None:
+    """
+    Download `url` to `dest` through the run's HTTP cache, streaming.
+
+    Same caching rules as cached_get(), but the body goes to disk in
+    chunks. Raises DownloadTooLarge as soon as the download is known to
+    exceed `max_bytes`, SourceUnchanged as cached_get() does, and httpx
+    errors as usual.
+    """
+    cache = ctx.http_cache
+    entry = await asyncio.to_thread(cache.lookup, url) if cache is not None else None
+
+    if entry is not None and entry.fresh_until > time.time():
+        ctx.cache_hits += 1
+        await _skip_if_processed(ctx, cache, entry)
+        await asyncio.to_thread(cache.copy_body, entry, dest)
+        return
+
+    request_headers: dict[str, str] = {}
+    if entry is not None:
+        if entry.etag:
+            request_headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            request_headers["If-Modified-Since"] = entry.last_modified
+
+    def send() -> Awaitable[httpx.Response]:
+        kwargs = {} if timeout is None else {"timeout": timeout}
+        request = client.build_request("GET", url, headers=request_headers, **kwargs)
+        return client.send(request, stream=True)
+
+    response = await send_with_retries(ctx, url, send)
+    try:
+        if response.status_code == 304 and entry is not None:
+            ctx.cache_hits += 1
+            entry = await asyncio.to_thread(cache.refresh, entry, response)
+            await _skip_if_processed(ctx, cache, entry)
+            await asyncio.to_thread(cache.copy_body, entry, dest)
+            return
+
+        response.raise_for_status()
+        sha = await _stream_to_file(response, dest, url, max_bytes)
+    finally:
+        await response.aclose()
+
+    if cache is None:
+        return
+    ctx.cache_misses += 1
+    stored = await asyncio.to_thread(cache.store_file, url, response, dest, sha)
+    if stored is not None:
+        await _skip_if_processed(ctx, cache, stored)
+
+
+async def _stream_to_file(
+    response: httpx.Response,
+    dest: Path,
+    url: str,
+    max_bytes: int,
+) -> str:
+    """Write a streamed body to `dest` in chunks; return its SHA-256."""
+    declared = response.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > max_bytes:
+        raise DownloadTooLarge(url, max_bytes)
+
+    digest = hashlib.sha256()
+    size = 0
+    with dest.open("wb") as f:
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            if size > max_bytes:
+                raise DownloadTooLarge(url, max_bytes)
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
+
+
+async def _skip_if_processed(ctx: RunContext, cache: HttpCache, entry: CacheEntry) -> None:
+    """
+    Raise SourceUnchanged if the run's source already processed this exact
+    body with its current plan; otherwise remember it for mark_processed().
+    """
+    if await asyncio.to_thread(cache.is_processed, entry, ctx.source_id, ctx.plan_fingerprint):
+        raise SourceUnchanged(entry.url)
+    ctx.cache_pending.append((entry.url, entry.sha256))
+
+
+async def mark_processed(ctx: RunContext) -> None:
+    """Mark every document fetched for this source as processed by it, with its plan."""
+    if ctx.http_cache is None:
+        return
+    for url, sha in ctx.cache_pending:
+        await asyncio.to_thread(
+            ctx.http_cache.mark_processed, url, sha, ctx.source_id, ctx.plan_fingerprint
+        )
+    ctx.cache_pending.clear()
+
+
+async def _cached_response(cache: HttpCache, entry: CacheEntry, url: str) -> httpx.Response:
+    """Rebuild a response from a cache entry (keeps httpx's charset decoding)."""
+    body = await asyncio.to_thread(cache.read_body, entry)
+    headers = {"content-type": entry.content_type} if entry.content_type else {}
+    return httpx.Response(200, content=body, headers=headers, request=httpx.Request("GET", url))
+
+
+def _link_or_copy(source: Path, dest: Path) -> None:
+    """Hard-link `source` to `dest` (replacing it), copying across filesystems."""
+    dest.unlink(missing_ok=True)
+    try:
+        os.link(source, dest)
+    except OSError:
+        shutil.copyfile(source, dest)
+
+
+# ── RFC 9111 Helpers ─────────────────────────────────────────────────────────
+
+
+def _cache_control(headers: httpx.Headers) -> dict[str, str]:
+    """Parse Cache-Control directives into {name: value}."""
+    directives: dict[str, str] = {}
+    for part in headers.get("cache-control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"')
+    return directives
+
+
+def _fresh_until(headers: httpx.Headers, cache_control: dict[str, str]) -> float:
+    """
+    Absolute expiry time from max-age or Expires (0 = must revalidate).
+
+    No heuristic freshness: without an explicit lifetime every use
+    revalidates, which is cheap with validators.
+    """
+    if "no-cache" in cache_control:
+        return 0.0
+
+    now = time.time()
+    max_age = cache_control.get("max-age")
+    if max_age is not None:
+        try:
+            age = int(headers.get("age", "0") or 0)
+            return now + max(0, int(max_age) - age)
+        except ValueError:
+            return 0.0
+
+    expires = headers.get("expires")
+    if expires:
+        try:
+            expires_at = email.utils.parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            return 0.0
+        date = headers.get("date")
+        try:
+            served_at = email.utils.parsedate_to_datetime(date).timestamp() if date else now
+        except (TypeError, ValueError):
+            served_at = now
+        return now + max(0.0, expires_at - served_at)
+
+    return 0.0
+
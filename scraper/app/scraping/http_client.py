@@ -0,0 +1,134 @@
+"""
+Shared HTTP clients.
+
+One httpx.AsyncClient per host, owned by the run and shared by every
+scraper, so repeat requests to a portal reuse pooled keep-alive
+connections instead of paying a TCP + TLS handshake per source. Each
+host's pool is capped at config.http_connections_per_host. HTTP/2 is
+negotiated when enabled and the optional `h2` package is installed.
+
+Every client paces its requests through the host's adaptive rate
+limiter (app/scraping/rate_limit.py) via httpx event hooks. The
+registry also holds each host's circuit breaker (app/scraping/retry.py).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+from typing import TYPE_CHECKING
+
+import httpx
+
+from app.scraping.rate_limit import HostRateLimiter, RateLimiters
+from app.scraping.retry import CircuitBreakers
+from app.utils.url_utils import extract_base_url
+
+if TYPE_CHECKING:
+    from app.core.context import RunContext
+    from config import AppConfig
+
+logger = logging.getLogger("mandi-agent")
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/131.0.0.0 Safari/537.36"
+)
+
+# Sent by every client; scrapers add their own Accept headers per request
+DEFAULT_HEADERS: dict[str, str] = {"User-Agent": USER_AGENT}
+
+# Extra headers for JSON API requests
+API_HEADERS: dict[str, str] = {
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+class HttpClients:
+    """Registry of pooled per-host clients; close() once at shutdown."""
+
+    def __init__(
+        self,
+        *,
+        timeout_seconds: float = 30.0,
+        connections_per_host: int = 4,
+        http2: bool = False,
+        limiters: RateLimiters | None = None,
+    ) -> None:
+        self._timeout = httpx.Timeout(timeout_seconds)
+        self._limits = httpx.Limits(
+            max_connections=connections_per_host,
+            max_keepalive_connections=connections_per_host,
+            keepalive_expiry=60.0,
+        )
+        self._http2 = http2 and _h2_available()
+        if http2 and not self._http2:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed — using HTTP/1.1")
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        # Per-host pacing; None = unthrottled
+        self.limiters = limiters
+        self.breakers = CircuitBreakers()
+
+    @classmethod
+    def from_config(cls, config: AppConfig) -> HttpClients:
+        """Build a registry from the run config."""
+        return cls(
+            timeout_seconds=config.http_timeout_seconds,
+            connections_per_host=config.http_connections_per_host,
+            http2=config.http2,
+            limiters=RateLimiters.from_config(config),
+        )
+
+    def get(self, url: str) -> httpx.AsyncClient:
+        """Return the shared client for `url`'s host, creating it on first use."""
+        host = extract_base_url(url)
+        client = self._clients.get(host)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                headers=DEFAULT_HEADERS,
+                timeout=self._timeout,
+                limits=self._limits,
+                http2=self._http2,
+                follow_redirects=True,
+                event_hooks=(
+                    _rate_limit_hooks(self.limiters.get(url)) if self.limiters else None
+                ),
+            )
+            self._clients[host] = client
+        return client
+
+    async def close(self) -> None:
+        """Close every pooled client."""
+        clients, self._clients = list(self._clients.values()), {}
+        await asyncio.gather(*(c.aclose() for c in clients), return_exceptions=True)
+
+
+def client_for(ctx: RunContext, url: str) -> httpx.AsyncClient:
+    """
+    Shared client for `url` from the run's registry.
+
+    Contexts built without one (e.g. in scripts) get a registry created
+    from their config on first use.
+    """
+    if ctx.http is None:
+        ctx.http = HttpClients.from_config(ctx.config)
+    return ctx.http.get(url)
+
+
+def _rate_limit_hooks(limiter: HostRateLimiter) -> dict[str, list]:
+    """httpx event hooks that pace requests and feed responses back to `limiter`."""
+
+    async def before_request(request: httpx.Request) -> None:
+        await limiter.acquire()
+
+    async def after_response(response: httpx.Response) -> None:
+        limiter.observe(response.status_code, response.headers.get("retry-after"))
+
+    return {"request": [before_request], "response": [after_response]}
+
+
+def _h2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
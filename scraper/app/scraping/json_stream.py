@@ -0,0 +1,202 @@
+"""
+Incremental JSON record streaming.
+
+Large unpaginated API responses are parsed as their bytes arrive
+instead of via response.json(): RecordStream finds the record array —
+the document itself if it's an array, otherwise the first top-level key
+named like a record list (`data`, `records`, `rows`, ...) — and returns
+each element as soon as it is complete. Only the element being decoded
+is held as text, so memory stays bounded by the batch size and
+normalization can start before the download finishes.
+
+Elements are decoded with json's C raw_decode; the scanner itself only
+walks the document's top level.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+from typing import Any, AsyncIterator
+
+import httpx
+
+# Top-level keys that hold the record list, as in api_scraper._extract_records
+RECORD_KEYS = ("data", "records", "items", "results", "rows", "list")
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",:]}"
+
+# Scanner states
+_START = "start"          # before the document's first character
+_KEY = "key"              # expecting a key (or "}") in the top-level object
+_COLON = "colon"          # expecting ":" after a key
+_VALUE = "value"          # expecting a top-level value to skip or stream
+_AFTER_VALUE = "after"    # expecting "," or "}" in the top-level object
+_ELEMENT = "element"      # expecting an array element (or "]")
+_AFTER_ELEMENT = "after_element"  # expecting "," or "]" in the array
+_DONE = "done"            # record array finished (or the document has none)
+
+
+class RecordStream:
+    """
+    Push parser yielding the elements of a JSON document's record array.
+
+    feed() raw bytes as they arrive and collect the completed records it
+    returns; close() at end of input. Raises json.JSONDecodeError on
+    malformed input.
+    """
+
+    def __init__(self, keys: tuple[str, ...] = RECORD_KEYS) -> None:
+        self._keys = frozenset(keys)
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._json = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._state = _START
+        self._key = ""
+
+    @property
+    def done(self) -> bool:
+        """Whether the record array has been read to its end."""
+        return self._state == _DONE
+
+    def feed(self, data: bytes) -> list[Any]:
+        """Consume more bytes; return the records completed by them."""
+        if self._state == _DONE:
+            return []
+        self._buf = self._buf[self._pos:] + self._decoder.decode(data)
+        self._pos = 0
+        return self._scan(final=False)
+
+    def close(self) -> list[Any]:
+        """Signal end of input; return any last records."""
+        if self._state == _DONE:
+            return []
+        self._buf = self._buf[self._pos:] + self._decoder.decode(b"", final=True)
+        self._pos = 0
+        records = self._scan(final=True)
+        if self._state != _DONE:
+            raise json.JSONDecodeError("Unexpected end of JSON input", self._buf, self._pos)
+        self._state = _DONE
+        return records
+
+    def _scan(self, *, final: bool) -> list[Any]:
+        records: list[Any] = []
+        buf = self._buf
+        while self._state != _DONE:
+            pos = self._skip_ws(buf, self._pos)
+            self._pos = pos
+            if pos >= len(buf):
+                break
+            char = buf[pos]
+            state = self._state
+
+            if state == _START:
+                if char == "[":
+                    self._state = _ELEMENT
+                elif char == "{":
+                    self._state = _KEY
+                else:
+                    # A scalar document has no records
+                    self._state = _DONE
+                    break
+                self._pos = pos + 1
+
+            elif state == _KEY:
+                if char == "}":
+                    self._state = _DONE
+                    break
+                if char != '"':
+                    raise json.JSONDecodeError("Expecting property name", buf, pos)
+                decoded = self._decode(buf, pos, final)
+                if decoded is None:
+                    break
+                self._key, self._pos = decoded
+                self._state = _COLON
+
+            elif state == _COLON:
+                if char != ":":
+                    raise json.JSONDecodeError("Expecting ':' delimiter", buf, pos)
+                self._pos = pos + 1
+                self._state = _VALUE
+
+            elif state == _VALUE:
+                if char == "[" and self._key in self._keys:
+                    self._pos = pos + 1
+                    self._state = _ELEMENT
+                    continue
+                decoded = self._decode(buf, pos, final)
+                if decoded is None:
+                    break
+                self._pos = decoded[1]
+                self._state = _AFTER_VALUE
+
+            elif state == _AFTER_VALUE:
+                if char not in ",}":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+                self._pos = pos + 1
+                self._state = _KEY if char == "," else _DONE
+
+            elif state == _ELEMENT:
+                if char == "]":
+                    self._state = _DONE
+                    break
+                decoded = self._decode(buf, pos, final)
+                if decoded is None:
+                    break
+                record, self._pos = decoded
+                records.append(record)
+                self._state = _AFTER_ELEMENT
+
+            elif state == _AFTER_ELEMENT:
+                if char not in ",]":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+                self._pos = pos + 1
+                self._state = _ELEMENT if char == "," else _DONE
+
+        return records
+
+    def _decode(self, buf: str, pos: int, final: bool) -> tuple[Any, int] | None:
+        """
+        Decode the value at `pos`, or return None if it may be incomplete.
+
+        A value is only accepted once the character after it has arrived
+        and ends it: `12` or `1.` at the end of the buffer may be the start
+        of `125` or `1.5`.
+        """
+        try:
+            value, end = self._json.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return None
+        if not final and (end >= len(buf) or buf[end] not in _DELIMITERS):
+            return None
+        return value, end
+
+    @staticmethod
+    def _skip_ws(buf: str, pos: int) -> int:
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        return pos
+
+
+async def iter_json_records(
+    response: httpx.Response,
+    *,
+    batch_size: int,
+) -> AsyncIterator[list[Any]]:
+    """Yield a streamed response's records in batches of up to `batch_size`."""
+    stream = RecordStream()
+    batch: list[Any] = []
+    async for data in response.aiter_bytes():
+        batch.extend(stream.feed(data))
+        while len(batch) >= batch_size:
+            yield batch[:batch_size]
+            batch = batch[batch_size:]
+        if stream.done:
+            break
+    batch.extend(stream.close())
+    if batch:
+        yield batch
@@ -3,18 +3,61 @@ Data normalizer.
 
 Applies schemaMapping and conversions from the source config
 to transform raw extracted records into the unified Price schema.
+
+A source's schemaMapping + conversions are compiled once into a
+NormalizationPlan: the field mapping plus an ordered list of column
+operations with their converters already bound (conversion factors
+parsed, date formats resolved). Plans are cached by a fingerprint of
+everything they're compiled from, so pages, chunks and daemon runs of
+the same source reuse one plan. New conversion types are added to
+_CONVERSIONS.
+
+Records are normalized column by column: a batch is split into runs of
+records with the same fields, each mapped field becomes one list, and
+every operation is a single pass over its column. Fields with few
+distinct values (dates, crop / mandi / state names) are converted once
+per distinct value. The columns become a PriceBatch as they are, with
+no per-record dicts. The records are identical to converting each
+record on its own, except that date strings only month-first can parse
+("04/13/2026") may make a source month-first: its day / month order is
+decided once, from its first dated chunk, and kept on its plan (see
+date_utils.DateOrder).
 """
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
-from typing import Any
+from dataclasses import dataclass
+from functools import partial
+from itertools import compress
+from typing import Any, Callable
 
-from app.core.constants import DEFAULT_PRICE_UNIT, UNIFIED_PRICE_FIELDS
-from app.utils.date_utils import parse_date, to_iso_string
+from app.core.constants import (
+    DEFAULT_PRICE_UNIT,
+    NORMALIZATION_PLAN_CACHE_SIZE,
+    UNIFIED_PRICE_FIELDS,
+)
+from app.core.price_batch import PriceBatch
+from app.utils.date_utils import DateOrder, to_iso_string
 
 logger = logging.getLogger("mandi-agent")
 
+_PRICE_FIELDS = ("minPrice", "maxPrice", "modalPrice")
+
+# Generated IDs: (ID field, name field it's derived from)
+_ID_FIELDS = (("cropId", "cropName"), ("mandiId", "mandiName"), ("stateId", "stateName"))
+
+# Currency markers in front of Indian price cells ("Rs. 1,200", "₹1200")
+_CURRENCY_PREFIXES = ("rs.", "rs", "inr", "₹")
+
+# A column: one value per record of a run
+Column = list[Any]
+
+# A plan step: updates a run's columns in place, given the run's size
+ColumnOp = Callable[[dict[str, Column], int], None]
+
 
 def normalize_records(
     raw_records: list[dict[str, Any]],
@@ -23,7 +66,7 @@ def normalize_records(
     *,
     source_id: str = "",
     source_name: str = "",
-) -> list[dict[str, Any]]:
+) -> PriceBatch:
     """
     Apply schema mapping and conversions to raw records.
 
@@ -35,105 +78,380 @@ def normalize_records(
         source_name: Source name for the 'source' field.
 
     Returns:
-        List of normalized price record dicts.
+        The normalized price records, as a columnar batch.
     """
     if not schema_mapping:
         logger.warning("No schema mapping provided — returning raw records")
-        return raw_records
+        return PriceBatch.from_records(raw_records)
+
+    plan = compile_plan(
+        schema_mapping,
+        conversions,
+        source_id=source_id,
+        source_name=source_name,
+    )
+    return plan.normalize(raw_records)
 
-    conversions = conversions or {}
-    normalized: list[dict[str, Any]] = []
 
+def _runs(raw_records: list[dict[str, Any]]) -> list[list[dict[str, Any]]]:
+    """Split records into consecutive runs that share the same fields."""
+    runs: list[list[dict[str, Any]]] = []
+    keys: Any = None
+    run: list[dict[str, Any]] = []
     for raw in raw_records:
-        record: dict[str, Any] = {}
-
-        # Apply field mapping
-        for raw_field, unified_field in schema_mapping.items():
-            if raw_field in raw:
-                record[unified_field] = raw[raw_field]
-
-        # Apply conversions
-        for field_name, conv in conversions.items():
-            if field_name not in record:
-                continue
-
-            value = record[field_name]
-
-            # Multiply conversion (e.g., kg → quintal)
-            multiply = conv.get("multiply")
-            if multiply is not None and value is not None:
-                try:
-                    record[field_name] = float(value) * float(multiply)
-                except (ValueError, TypeError):
-                    pass
-
-            # Date format conversion
-            date_format = conv.get("date_format")
-            if date_format and field_name == "date":
-                parsed = parse_date(str(value))
-                if parsed:
-                    record[field_name] = to_iso_string(parsed)
-
-        # Normalize date field
-        if "date" in record and not isinstance(record["date"], str):
-            parsed = parse_date(record["date"])
-            if parsed:
-                record["date"] = to_iso_string(parsed)
-
-        # Ensure date is parsed if still a string
-        if "date" in record and isinstance(record["date"], str):
-            parsed = parse_date(record["date"])
-            if parsed:
-                record["date"] = to_iso_string(parsed)
-
-        # Normalize price fields to float
-        for price_field in ("minPrice", "maxPrice", "modalPrice"):
-            if price_field in record:
-                try:
-                    val = record[price_field]
-                    if isinstance(val, str):
-                        val = val.replace(",", "").strip()
-                    record[price_field] = float(val) if val else 0.0
-                except (ValueError, TypeError):
-                    record[price_field] = 0.0
-
-        # Normalize arrival to float
-        if "arrival" in record:
-            try:
-                val = record["arrival"]
-                if isinstance(val, str):
-                    val = val.replace(",", "").strip()
-                record["arrival"] = float(val) if val else None
-            except (ValueError, TypeError):
-                record["arrival"] = None
+        raw_keys = raw.keys()
+        if raw_keys != keys:
+            run = []
+            runs.append(run)
+            keys = raw_keys
+        run.append(raw)
+    return runs
+
 
-        # Set defaults
-        record.setdefault("unit", DEFAULT_PRICE_UNIT)
-        record.setdefault("source", source_name or "other")
+# ── Plans ────────────────────────────────────────────────────────────────────
 
-        # Stamp source ID
-        if source_id:
-            record["sourceId"] = source_id
 
-        # Generate IDs from names if not present
-        if "cropId" not in record and "cropName" in record:
-            record["cropId"] = _name_to_id(record["cropName"])
-        if "mandiId" not in record and "mandiName" in record:
-            record["mandiId"] = _name_to_id(record["mandiName"])
-        if "stateId" not in record and "stateName" in record:
-            record["stateId"] = _name_to_id(record["stateName"])
+@dataclass(frozen=True, slots=True)
+class NormalizationPlan:
+    """
+    A source's schemaMapping + conversions compiled into column operations.
+
+    `mapping` (raw field → unified field) builds a run's columns, `ops`
+    transform them in order, and records without a crop name or modal
+    price are dropped. `dates` is the source's day / month order, decided
+    by the first chunk with date strings and kept for every later one.
+    """
+
+    fingerprint: str
+    mapping: tuple[tuple[str, str], ...]
+    ops: tuple[ColumnOp, ...]
+    dates: DateOrder
+
+    def normalize(self, raw_records: list[dict[str, Any]]) -> PriceBatch:
+        """Normalize raw records (see normalize_records)."""
+        normalized = PriceBatch.concat(self.apply(run) for run in _runs(raw_records))
+
+        logger.info(
+            "Normalized %d records from %d raw records",
+            len(normalized),
+            len(raw_records),
+        )
+
+        return normalized
+
+    def apply(self, run: list[dict[str, Any]]) -> PriceBatch:
+        """Normalize records that all have the same fields, column by column."""
+        present = run[0].keys()
+
+        # Apply field mapping (a later raw field mapped to the same unified
+        # field wins, but the field keeps its first position)
+        columns: dict[str, Column] = {}
+        for raw_field, unified_field in self.mapping:
+            if raw_field in present:
+                columns[unified_field] = [raw[raw_field] for raw in run]
+
+        for op in self.ops:
+            op(columns, len(run))
 
         # Only include records that have the minimum required fields
-        if record.get("cropName") and record.get("modalPrice"):
-            normalized.append(record)
+        crops = columns.get("cropName")
+        prices = columns.get("modalPrice")
+        if crops is None or prices is None:
+            return PriceBatch()
+        keep = [bool(crop) and bool(price) for crop, price in zip(crops, prices)]
+        if not all(keep):
+            columns = {name: list(compress(column, keep)) for name, column in columns.items()}
+
+        return PriceBatch.from_columns(columns)
+
+
+# Compiled plans by fingerprint, least recently used first
+_PLANS: dict[str, NormalizationPlan] = {}
 
-    logger.info(
-        "Normalized %d records from %d raw records",
-        len(normalized),
-        len(raw_records),
+
+def compile_plan(
+    schema_mapping: dict[str, str],
+    conversions: dict[str, dict[str, Any]] | None = None,
+    *,
+    source_id: str = "",
+    source_name: str = "",
+) -> NormalizationPlan:
+    """
+    The normalization plan for a source's config.
+
+    Plans are kept in a per-process LRU cache (NORMALIZATION_PLAN_CACHE_SIZE)
+    keyed by plan_fingerprint(), so an unchanged config is compiled once.
+    """
+    conversions = conversions or {}
+    fingerprint = plan_fingerprint(
+        schema_mapping,
+        conversions,
+        source_id=source_id,
+        source_name=source_name,
     )
 
-    return normalized
+    plan = _PLANS.pop(fingerprint, None)
+    if plan is None:
+        plan = _compile(fingerprint, schema_mapping, conversions, source_id, source_name)
+        if len(_PLANS) >= NORMALIZATION_PLAN_CACHE_SIZE:
+            del _PLANS[next(iter(_PLANS))]
+    _PLANS[fingerprint] = plan
+    return plan
+
+
+def plan_fingerprint(
+    schema_mapping: dict[str, str],
+    conversions: dict[str, dict[str, Any]],
+    *,
+    source_id: str = "",
+    source_name: str = "",
+) -> str:
+    """
+    SHA-256 of everything a plan is compiled from.
+
+    Order matters (it decides column positions and conversion order),
+    and so do key types: a header-less table's column 0 isn't "0".
+    """
+    payload = json.dumps(
+        [
+            list(schema_mapping.items()),
+            [[field_name, list(conv.items())] for field_name, conv in conversions.items()],
+            source_id,
+            source_name,
+        ],
+        default=repr,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _compile(
+    fingerprint: str,
+    schema_mapping: dict[str, str],
+    conversions: dict[str, dict[str, Any]],
+    source_id: str,
+    source_name: str,
+) -> NormalizationPlan:
+    ops: list[ColumnOp] = []
+
+    # An explicit date format decides the day / month order up front
+    dates = DateOrder.for_format((conversions.get("date") or {}).get("date_format"))
+
+    # Apply conversions (a field's conversions run in _CONVERSIONS order)
+    for field_name, conv in conversions.items():
+        for kind, build in _CONVERSIONS.items():
+            if kind in conv:
+                convert = build(field_name, conv[kind], dates)
+                if convert is not None:
+                    ops.append(_convert_op(field_name, convert))
+
+    # Normalize date field (dates, datetimes and date strings)
+    ops.append(_convert_op("date", partial(_map_column, partial(_normalize_dates, dates=dates))))
+
+    # Normalize price fields to float, arrival to float
+    for price_field in _PRICE_FIELDS:
+        ops.append(_convert_op(price_field, _to_prices))
+    ops.append(_convert_op("arrival", _to_arrivals))
+
+    # Set defaults
+    ops.append(_fill_op("unit", DEFAULT_PRICE_UNIT))
+    ops.append(_fill_op("source", source_name or "other"))
+
+    # Stamp source ID
+    if source_id:
+        ops.append(_fill_op("sourceId", source_id, overwrite=True))
+
+    # Generate IDs from names if not present
+    for id_field, name_field in _ID_FIELDS:
+        ops.append(_derive_op(id_field, name_field, partial(_map_distinct, _name_to_id)))
+
+    return NormalizationPlan(
+        fingerprint=fingerprint,
+        mapping=tuple(schema_mapping.items()),
+        ops=tuple(ops),
+        dates=dates,
+    )
+
+
+def _convert_op(field_name: str, convert: Callable[[Column], Column]) -> ColumnOp:
+    """Replace the field's column (if mapped) with convert(column)."""
+    def op(columns: dict[str, Column], size: int) -> None:
+        column = columns.get(field_name)
+        if column is not None:
+            columns[field_name] = convert(column)
+    return op
+
+
+def _fill_op(field_name: str, value: Any, *, overwrite: bool = False) -> ColumnOp:
+    """Set the field to `value` in every record (if not mapped, unless `overwrite`)."""
+    def op(columns: dict[str, Column], size: int) -> None:
+        if overwrite or field_name not in columns:
+            columns[field_name] = [value] * size
+    return op
+
+
+def _derive_op(field_name: str, source_field: str, convert: Callable[[Column], Column]) -> ColumnOp:
+    """Fill an absent field with convert(source column), if that is present."""
+    def op(columns: dict[str, Column], size: int) -> None:
+        if field_name not in columns and source_field in columns:
+            columns[field_name] = convert(columns[source_field])
+    return op
+
+
+# ── Conversion Types ─────────────────────────────────────────────────────────
+
+
+def _multiply_conversion(
+    field_name: str, multiply: Any, dates: DateOrder
+) -> Callable[[Column], Column] | None:
+    """Multiply conversion (e.g., kg → quintal); None if the factor isn't a number."""
+    if multiply is None:
+        return None
+    try:
+        factor = float(multiply)
+    except (ValueError, TypeError):
+        return None
+    return partial(_multiply, factor=factor)
+
+
+def _date_format_conversion(
+    field_name: str, date_format: Any, dates: DateOrder
+) -> Callable[[Column], Column] | None:
+    """Date format conversion, for the date field only."""
+    if not date_format or field_name != "date":
+        return None
+    return partial(_map_column, partial(_reformat_dates, date_format=date_format, dates=dates))
+
+
+# Conversion types: key in a field's `conversions` entry → builder of the
+# column converter for its value and the source's date order (None when
+# it doesn't apply)
+_CONVERSIONS: dict[str, Callable[[str, Any, DateOrder], Callable[[Column], Column] | None]] = {
+    "multiply": _multiply_conversion,
+    "date_format": _date_format_conversion,
+}
+
+
+# ── Column Conversions ───────────────────────────────────────────────────────
+
+
+def _map_distinct(convert: Callable[[Any], Any], column: Column) -> Column:
+    """Apply `convert` to a column, calling it once per distinct value."""
+    # value → (converted value, whether convert returned its input)
+    converted: dict[tuple[type, Any], tuple[Any, bool]] = {}
+    result: Column = []
+    for value in column:
+        try:
+            out, unchanged = converted[(type(value), value)]
+        except KeyError:
+            out = convert(value)
+            unchanged = out is value
+            converted[(type(value), value)] = (out, unchanged)
+        except TypeError:
+            # Unhashable value
+            out, unchanged = convert(value), False
+        # Equal values can differ in identity (0.0 and -0.0): keep the input's own
+        result.append(value if unchanged else out)
+    return result
+
+
+def _map_column(convert: Callable[[Column], Column], column: Column) -> Column:
+    """
+    Apply a whole-column `convert` to a column, passing it each distinct
+    value once (in order of first appearance).
+    """
+    index: dict[tuple[type, Any], int] = {}
+    distinct: Column = []
+    positions: list[int] = []
+    for value in column:
+        key = (type(value), value)
+        try:
+            position = index[key]
+        except KeyError:
+            position = index[key] = len(distinct)
+            distinct.append(value)
+        except TypeError:
+            # Unhashable value
+            position = len(distinct)
+            distinct.append(value)
+        positions.append(position)
+
+    converted = convert(distinct)
+    if not any(out is value for out, value in zip(converted, distinct)):
+        return [converted[position] for position in positions]
+    # Equal values can differ in identity (0.0 and -0.0): keep the input's own
+    return [
+        value if converted[position] is distinct[position] else converted[position]
+        for value, position in zip(column, positions)
+    ]
+
+
+def _multiply(column: Column, factor: float) -> Column:
+    """Multiply numeric values by `factor`; others are left unchanged."""
+    result: Column = []
+    for value in column:
+        if value is not None:
+            try:
+                value = float(value) * factor
+            except (ValueError, TypeError):
+                pass
+        result.append(value)
+    return result
+
+
+def _reformat_dates(values: Column, date_format: Any, dates: DateOrder) -> Column:
+    """A date conversion's values: each value's text as an ISO date, if it parses."""
+    preferred = date_format if isinstance(date_format, str) else None
+    parsed = dates.parse([str(value) for value in values], preferred=preferred)
+    return _iso_or_unchanged(values, parsed)
+
+
+def _normalize_dates(values: Column, dates: DateOrder) -> Column:
+    """ISO date strings for dates, datetimes and date strings; others unchanged."""
+    return _iso_or_unchanged(values, dates.parse(values))
+
+
+def _iso_or_unchanged(values: Column, parsed: list[Any]) -> Column:
+    return [value if moment is None else to_iso_string(moment) for value, moment in zip(values, parsed)]
+
+
+def _to_prices(column: Column) -> Column:
+    """Prices as floats; numbers skip the text clean-up."""
+    return [float(v) if (type(v) is float or type(v) is int) and v else _to_price(v) for v in column]
+
+
+def _to_arrivals(column: Column) -> Column:
+    return [_to_arrival(v) for v in column]
+
+
+def _to_price(value: Any) -> float:
+    """Price as a float (0.0 if missing or not a number)."""
+    try:
+        if isinstance(value, str):
+            value = _number_text(value)
+        return float(value) if value else 0.0
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def _to_arrival(value: Any) -> float | None:
+    """Arrival quantity as a float (None if missing or not a number)."""
+    try:
+        if isinstance(value, str):
+            value = _number_text(value)
+        return float(value) if value else None
+    except (ValueError, TypeError):
+        return None
+
+
+def _number_text(text: str) -> str:
+    """Strip Indian digit grouping ("1,00,000") and a currency prefix ("Rs. ")."""
+    text = text.replace(",", "").strip()
+    lowered = text.lower()
+    for prefix in _CURRENCY_PREFIXES:
+        if lowered.startswith(prefix):
+            return text[len(prefix):].strip()
+    return text
 
 
 def _name_to_id(name: str) -> str:
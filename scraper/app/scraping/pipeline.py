@@ -0,0 +1,72 @@
+"""
+Streaming pipeline helpers.
+
+A scrape is a chain of async iterators over record chunks
+(fetch → normalize → write). buffered() runs the upstream part of the
+chain in its own task behind a bounded queue, so stages overlap while a
+slow consumer still throttles the producers (backpressure).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import suppress
+from typing import Any, AsyncIterator, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _Failure:
+    """Carries a producer exception across the queue."""
+
+    __slots__ = ("exc",)
+
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+
+async def buffered(items: AsyncIterator[T], maxsize: int) -> AsyncIterator[T]:
+    """
+    Pull `items` in a background task, holding at most `maxsize` ahead.
+
+    Producer exceptions are re-raised to the consumer; if the consumer
+    stops early, the producer task is cancelled.
+    """
+    queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=max(1, maxsize))
+
+    async def pump() -> None:
+        try:
+            async for item in items:
+                await queue.put(item)
+        except Exception as exc:
+            await queue.put(_Failure(exc))
+        else:
+            await queue.put(_DONE)
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _Failure):
+                raise item.exc
+            yield item
+    finally:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+
+def chunked(records: Iterable[T], size: int) -> Iterator[list[T]]:
+    """Split records into lists of at most `size` items."""
+    chunk: list[T] = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,214 @@
+"""
+Adaptive per-host rate limiting.
+
+Every request to a host — API pages, HTML pages, file downloads and
+Playwright navigations — first takes a token from that host's bucket.
+The bucket's refill rate adapts AIMD-style:
+
+  - each healthy response raises it by a small additive step (up to
+    config.rate_limit_max_rps);
+  - a 429 / 503 halves it and blocks the host for Retry-After (seconds
+    or an HTTP date) when the server sends one.
+
+The starting rate comes from config.request_delay_ms, or from the rate
+a previous run learned for the host (stored on the source document).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from app.core.constants import (
+    RATE_LIMIT_DECREASE_FACTOR,
+    RATE_LIMIT_INCREASE_RPS,
+    RATE_LIMIT_MAX_RETRY_AFTER_SECONDS,
+    RATE_LIMIT_MIN_RPS,
+)
+from app.utils.url_utils import extract_base_url
+
+if TYPE_CHECKING:
+    from app.core.context import RunContext
+    from config import AppConfig
+
+logger = logging.getLogger("mandi-agent")
+
+# Responses that mean "slow down"
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+class HostRateLimiter:
+    """Token bucket for one host whose rate adapts to the server's responses."""
+
+    def __init__(self, host: str, rate: float, *, burst: int, max_rate: float) -> None:
+        self.host = host
+        self._max_rate = max_rate
+        self._rate = _clamp(rate, max_rate)
+        self._burst = max(1, burst)
+        self._tokens = float(self._burst)
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        # One cut per burst of throttled responses, not one per request in flight
+        self._cut_until = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def rate(self) -> float:
+        """Current refill rate in requests per second."""
+        return self._rate
+
+    async def acquire(self) -> None:
+        """Wait until a request to this host may be sent."""
+        # The lock queues waiters FIFO, so requests go out in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if self._blocked_until > now:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self._rate)
+
+    def observe(self, status: int, retry_after: str | None = None) -> None:
+        """Adapt the rate to a response's status (and Retry-After header)."""
+        if status in THROTTLE_STATUSES:
+            self.on_throttle(parse_retry_after(retry_after))
+        elif status < 400:
+            self.on_success()
+
+    def on_success(self) -> None:
+        """Additive increase after a healthy response."""
+        self._rate = min(self._max_rate, self._rate + RATE_LIMIT_INCREASE_RPS)
+
+    def on_throttle(self, retry_after: float | None = None) -> None:
+        """Multiplicative decrease, and a pause of `retry_after` seconds if given."""
+        now = time.monotonic()
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+        self._tokens = 0.0
+        self._refilled_at = now
+
+        if now < self._cut_until:
+            return
+        self._rate = _clamp(self._rate * RATE_LIMIT_DECREASE_FACTOR, self._max_rate)
+        self._cut_until = now + self._burst / self._rate
+        logger.info(
+            "Throttled by %s — rate now %.2f req/s%s",
+            self.host,
+            self._rate,
+            f", pausing {retry_after:.0f}s" if retry_after else "",
+        )
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            float(self._burst),
+            self._tokens + (now - self._refilled_at) * self._rate,
+        )
+        self._refilled_at = now
+
+
+class RateLimiters:
+    """Registry of per-host limiters, shared by everything in the run."""
+
+    def __init__(self, *, initial_rate: float, burst: int, max_rate: float) -> None:
+        self._initial_rate = initial_rate
+        self._burst = burst
+        self._max_rate = max_rate
+        self._limiters: dict[str, HostRateLimiter] = {}
+
+    @classmethod
+    def from_config(cls, config: AppConfig) -> RateLimiters:
+        """Build a registry from the run config."""
+        max_rate = config.rate_limit_max_rps
+        initial = 1000 / config.request_delay_ms if config.request_delay_ms > 0 else max_rate
+        return cls(
+            initial_rate=initial,
+            burst=config.http_connections_per_host,
+            max_rate=max_rate,
+        )
+
+    def get(self, url: str) -> HostRateLimiter:
+        """Return the limiter for `url`'s host, creating it on first use."""
+        host = extract_base_url(url)
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = HostRateLimiter(
+                host, self._initial_rate, burst=self._burst, max_rate=self._max_rate
+            )
+            self._limiters[host] = limiter
+        return limiter
+
+    def seed(self, url: str, rate: float) -> None:
+        """
+        Start `url`'s host at a rate learned by an earlier run.
+
+        Ignored once the host has a limiter: what this run has learned
+        is more recent.
+        """
+        host = extract_base_url(url)
+        if host not in self._limiters and rate > 0:
+            self._limiters[host] = HostRateLimiter(
+                host, rate, burst=self._burst, max_rate=self._max_rate
+            )
+
+    def learned_rate(self, url: str) -> float | None:
+        """Current rate for `url`'s host, or None if it hasn't been contacted."""
+        limiter = self._limiters.get(extract_base_url(url))
+        return limiter.rate if limiter is not None else None
+
+
+def limiter_for(ctx: RunContext, url: str) -> HostRateLimiter | None:
+    """Rate limiter for `url`'s host from the run's shared HTTP clients (None = unthrottled)."""
+    limiters = _registry(ctx)
+    return limiters.get(url) if limiters is not None else None
+
+
+def seed_from_source(ctx: RunContext, source: dict[str, Any], url: str) -> None:
+    """Start `url`'s host at the rate stored on `source` by an earlier run."""
+    learned = source.get("rateLimit") or {}
+    limiters = _registry(ctx)
+    if not url or limiters is None or learned.get("host") != extract_base_url(url):
+        return
+    try:
+        limiters.seed(url, float(learned.get("rps") or 0))
+    except (TypeError, ValueError):
+        return
+
+
+def learned_rate(ctx: RunContext, url: str) -> float | None:
+    """Rate this run has settled on for `url`'s host, or None."""
+    limiters = ctx.http.limiters if ctx.http is not None else None
+    return limiters.learned_rate(url) if limiters is not None and url else None
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            seconds = email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(0.0, seconds), RATE_LIMIT_MAX_RETRY_AFTER_SECONDS) or None
+
+
+def _registry(ctx: RunContext) -> RateLimiters | None:
+    from app.scraping.http_client import HttpClients
+
+    if ctx.http is None:
+        ctx.http = HttpClients.from_config(ctx.config)
+    return ctx.http.limiters
+
+
+def _clamp(rate: float, max_rate: float) -> float:
+    return min(max(rate, RATE_LIMIT_MIN_RPS), max_rate)
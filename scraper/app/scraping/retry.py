@@ -0,0 +1,211 @@
+"""
+Retries and per-host circuit breakers.
+
+send_with_retries() wraps one HTTP request:
+
+  - transient failures (connection errors, timeouts, 429 / 5xx) are
+    retried with jittered exponential backoff, up to config.http_retries
+    times. Requests that may not be idempotent (POST) are only retried
+    when the server can't have acted on them: a failed connect, 4xx, 503;
+  - each host has a circuit breaker. After CIRCUIT_FAILURE_THRESHOLD
+    consecutive failures the host is treated as down: further requests
+    fail fast with CircuitOpen instead of each burning its timeout,
+    until a single trial request after CIRCUIT_COOLDOWN_SECONDS succeeds.
+
+Callers retry at the smallest unit they can resume from — one API page,
+one document — so a transient error never restarts a whole source.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Awaitable, Callable
+
+import httpx
+
+from app.core.constants import (
+    CIRCUIT_COOLDOWN_SECONDS,
+    CIRCUIT_FAILURE_THRESHOLD,
+    RETRY_BASE_DELAY_SECONDS,
+    RETRY_MAX_DELAY_SECONDS,
+)
+from app.utils.url_utils import extract_base_url
+
+if TYPE_CHECKING:
+    from app.core.context import RunContext
+
+logger = logging.getLogger("mandi-agent")
+
+# Statuses worth another attempt
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Statuses that count against the host's breaker (it's up but failing)
+_FAILURE_STATUSES = frozenset({500, 502, 503, 504})
+
+
+class CircuitOpen(httpx.TransportError):
+    """Requests to `host` are failing fast after repeated failures."""
+
+    def __init__(self, host: str, retry_in: float) -> None:
+        super().__init__(f"Circuit open for {host} — host unavailable, retry in {retry_in:.0f}s")
+        self.host = host
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """How many times, and how long apart, to retry a request."""
+
+    retries: int = 3
+    base_delay: float = RETRY_BASE_DELAY_SECONDS
+    max_delay: float = RETRY_MAX_DELAY_SECONDS
+
+    def delay(self, attempt: int) -> float:
+        """Full-jitter backoff before retry number `attempt` (0-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker for one host (closed → open → half-open)."""
+
+    def __init__(
+        self,
+        host: str,
+        *,
+        threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        cooldown: float = CIRCUIT_COOLDOWN_SECONDS,
+    ) -> None:
+        self.host = host
+        self._threshold = threshold
+        self._cooldown = cooldown
+        self._failures = 0
+        self._opened_at: float | None = None
+        # When the half-open probe went out; a probe abandoned (cancelled)
+        # for a whole cooldown no longer blocks the next one
+        self._trial_at: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        """Whether requests to the host are currently being refused."""
+        return self._opened_at is not None
+
+    def check(self) -> None:
+        """Raise CircuitOpen unless a request may go out now."""
+        if self._opened_at is None:
+            return
+        now = time.monotonic()
+        remaining = self._opened_at + self._cooldown - now
+        probing = self._trial_at is not None and now - self._trial_at < self._cooldown
+        if remaining > 0 or probing:
+            raise CircuitOpen(self.host, max(0.0, remaining))
+        # Half-open: let one request through to probe the host
+        self._trial_at = now
+
+    def record_success(self) -> None:
+        """Close the breaker after any response that shows the host is up."""
+        if self._opened_at is not None:
+            logger.info("Circuit closed for %s — host is responding again", self.host)
+        self._failures = 0
+        self._opened_at = None
+        self._trial_at = None
+
+    def record_failure(self) -> None:
+        """Count a failure; open (or re-open, after a failed probe) the breaker."""
+        self._failures += 1
+        if self._trial_at is not None or (
+            self._opened_at is None and self._failures >= self._threshold
+        ):
+            logger.warning(
+                "Circuit open for %s after %d consecutive failures — failing fast for %.0fs",
+                self.host,
+                self._failures,
+                self._cooldown,
+            )
+            self._opened_at = time.monotonic()
+        self._trial_at = None
+
+
+class CircuitBreakers:
+    """Registry of per-host breakers, shared by everything in the run."""
+
+    def __init__(self) -> None:
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, url: str) -> CircuitBreaker:
+        """Return the breaker for `url`'s host, creating it on first use."""
+        host = extract_base_url(url)
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(host)
+        return breaker
+
+
+async def send_with_retries(
+    ctx: RunContext,
+    url: str,
+    send: Callable[[], Awaitable[httpx.Response]],
+    *,
+    idempotent: bool = True,
+    retry_statuses: frozenset[int] = RETRY_STATUSES,
+) -> httpx.Response:
+    """
+    Call `send` until it returns a non-retryable response or retries run out.
+
+    Returns the last response (the caller decides whether its status is
+    an error). Raises CircuitOpen if the host's breaker is open, and the
+    last httpx.TransportError if every attempt failed to get a response.
+    """
+    from app.scraping.http_client import HttpClients
+
+    if ctx.http is None:
+        ctx.http = HttpClients.from_config(ctx.config)
+    breaker = ctx.http.breakers.get(url)
+    policy = RetryPolicy(retries=ctx.config.http_retries)
+
+    attempt = 0
+    while True:
+        try:
+            breaker.check()
+        except CircuitOpen:
+            ctx.circuit_open = True
+            raise
+
+        last = attempt == policy.retries
+        try:
+            response = await send()
+        except httpx.TransportError as exc:
+            breaker.record_failure()
+            # A failed connect never reached the server, so any method is safe
+            if last or not (idempotent or isinstance(exc, httpx.ConnectError)):
+                raise
+            reason = type(exc).__name__
+        else:
+            status = response.status_code
+            if status in _FAILURE_STATUSES:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            if (
+                last
+                or status not in retry_statuses
+                # 4xx and 503 mean the request was refused, not acted on
+                or not (idempotent or status < 500 or status == 503)
+            ):
+                return response
+            reason = f"HTTP {status}"
+            await response.aclose()
+
+        delay = policy.delay(attempt)
+        ctx.logger.warning(
+            "%s from %s — retry %d/%d in %.1fs",
+            reason,
+            url,
+            attempt + 1,
+            policy.retries,
+            delay,
+        )
+        await asyncio.sleep(delay)
+        attempt += 1
@@ -4,18 +4,40 @@ Scrape engine orchestrator.
 Reads the source config, dispatches to the correct scraper
 (API, HTML table, or file), passes raw data through the normalizer,
 and returns clean records ready for storage.
+
+The scrape is a streaming pipeline: scrapers yield chunks (API pages,
+PDF pages, table / spreadsheet row batches), the normalizer turns each
+chunk into a columnar PriceBatch, and scrape_into() writes chunks as
+they arrive. Stages are connected by bounded queues, so fetching,
+normalizing and writing overlap while memory stays proportional to a
+few chunks.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any
+from contextlib import aclosing, asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator
 
+from app.core.constants import PIPELINE_CHUNK_SIZE, PIPELINE_QUEUE_SIZE
 from app.core.context import RunContext
-from app.scraping.normalizer import normalize_records
+from app.core.price_batch import PriceBatch
+from app.scraping.http_cache import SourceUnchanged, mark_processed
+from app.scraping.incremental import WatermarkFilter, load_cutoff, with_date_params
+from app.scraping.normalizer import NormalizationPlan, compile_plan
+from app.scraping.pipeline import buffered, chunked
+from app.scraping.rate_limit import seed_from_source
+
+if TYPE_CHECKING:
+    from app.core.workers import ParseJob
 
 logger = logging.getLogger("mandi-agent")
 
+_API_TYPES = frozenset({"api"})
+_HTML_TYPES = frozenset({"html_table", "table", "html", "htmltable"})
+_FILE_TYPES = frozenset({"pdf_excel", "file", "pdf", "excel"})
+
 
 async def run_scrape(
     ctx: RunContext,
@@ -24,88 +46,347 @@ async def run_scrape(
     """
     Execute a scrape for a single source based on its config.
 
-    Dispatches to the appropriate scraper based on extractionType,
-    then normalizes the output.
+    Collects iter_scrape() into one list — for callers that need every
+    record at once (e.g. mapping samples). Use scrape_into() to save.
 
     Returns a list of normalized price record dicts.
     """
+    records: list[dict[str, Any]] = []
+    async with aclosing(iter_scrape(ctx, source)) as chunks:
+        async for chunk in chunks:
+            records.extend(chunk.to_documents())
+    return records
+
+
+async def scrape_into(
+    ctx: RunContext,
+    source: dict[str, Any],
+    output: Any,
+) -> int:
+    """
+    Scrape a source and write each normalized chunk to `output` as it arrives.
+
+    Adds the output's saved counts to ctx.records_saved. Returns the
+    number of normalized records produced.
+    """
+    from app.monitoring.loop_lag import LoopLagMonitor
+
+    produced = 0
+    chunks = buffered(iter_scrape(ctx, source), PIPELINE_QUEUE_SIZE)
+    async with LoopLagMonitor() as lag, aclosing(chunks):
+        async for chunk in chunks:
+            produced += len(chunk)
+            ctx.records_saved += await output.save_prices(chunk)
+    ctx.loop_blocked_seconds = lag.blocked_seconds
+    ctx.loop_lag_max_seconds = lag.max_lag_seconds
+
+    # Records were saved, or all were already ingested: unchanged copies can
+    # be skipped next time. A run that normalized nothing is retried.
+    if ctx.fatal_count == 0 and (produced or ctx.records_skipped > 0):
+        await mark_processed(ctx)
+    ctx.cache_pending.clear()
+    return produced
+
+
+async def iter_scrape(
+    ctx: RunContext,
+    source: dict[str, Any],
+) -> AsyncIterator[PriceBatch]:
+    """
+    Scrape a single source, yielding normalized record chunks (PriceBatches).
+
+    Dispatches to the appropriate scraper based on extractionType,
+    then normalizes each chunk.
+    """
     extraction_type = source.get("extractionType", "")
     source_url = source.get("entryUrl", "")
-    source_id = str(source.get("_id", ""))
-    source_name = source.get("name", source.get("source", "other"))
 
-    ctx.source_id = source_id
+    ctx.source_id = str(source.get("_id", ""))
     ctx.source_url = source_url
+    ctx.records_extracted = 0
+    ctx.records_skipped = 0
+    ctx.unchanged = False
+    ctx.circuit_open = False
+    ctx.plan_fingerprint = ""
 
     if not extraction_type:
         ctx.add_error(source_url, "No extractionType configured — needs discovery", fatal=True)
-        return []
+        return
 
     ctx.logger.info("Scraping %s via %s", source_url, extraction_type)
 
-    # ── Dispatch to the correct scraper ─────────────────────────────────
-
-    raw_records: list[dict[str, Any]] = []
-
-    if extraction_type == "api":
-        raw_records = await _scrape_api(ctx, source)
-    elif extraction_type in ("html_table", "table", "html", "htmltable"):
-        raw_records = await _scrape_html(ctx, source)
-    elif extraction_type in ("pdf_excel", "file", "pdf", "excel"):
-        raw_records = await _scrape_file(ctx, source)
-    else:
+    if extraction_type not in _API_TYPES | _HTML_TYPES | _FILE_TYPES:
         ctx.add_error(
             source_url,
             f"Unknown extractionType: {extraction_type}",
             fatal=True,
         )
-        return []
+        return
 
-    ctx.records_extracted = len(raw_records)
+    if not source.get("schemaMapping"):
+        ctx.logger.warning("No schemaMapping for %s — returning raw records", source_url)
 
-    if not raw_records:
+    seed_from_source(ctx, source, fetch_url(source))
+
+    # Compiled once per source run (and cached across runs); it also keeps
+    # the source's day / month order, which workers are told to follow
+    plan = _compile_source_plan(source)
+    if plan is not None:
+        ctx.plan_fingerprint = plan.fingerprint
+
+    watermark: WatermarkFilter | None = None
+    if ctx.config.incremental:
+        cutoff = await load_cutoff(ctx, source)
+        if cutoff:
+            ctx.logger.info("Incremental scrape from %s", cutoff)
+            source = with_date_params(source, cutoff)
+            watermark = WatermarkFilter(
+                cutoff,
+                source.get("schemaMapping") or {},
+                dates=plan.dates if plan is not None else None,
+            )
+
+    if ctx.workers is not None and _parse_in_worker(source, extraction_type):
+        # HTML / files: fetch here, parse + normalize the payload in a worker
+        chunks = _iter_worker_chunks(ctx, source, extraction_type, watermark, plan)
+    else:
+        raw_chunks = buffered(
+            _iter_raw_chunks(ctx, source, extraction_type, watermark),
+            PIPELINE_QUEUE_SIZE,
+        )
+        chunks = _normalize_chunks(ctx, source, raw_chunks, plan)
+
+    normalized = 0
+    try:
+        async with aclosing(chunks):
+            async for chunk in chunks:
+                if chunk:
+                    normalized += len(chunk)
+                    yield chunk
+    except SourceUnchanged as exc:
+        ctx.unchanged = True
+        ctx.logger.info("%s — skipping parse", exc)
+        return
+
+    if not ctx.records_extracted:
         ctx.add_error(source_url, "Scraper returned 0 records")
-        return []
+        return
+
+    ctx.logger.info(
+        "Scrape complete: %d raw → %d normalized records%s",
+        ctx.records_extracted,
+        normalized,
+        f" ({ctx.records_skipped} already ingested)" if ctx.records_skipped else "",
+    )
+
+
+# ── Pipeline Stages ──────────────────────────────────────────────────────────
+
+
+async def _iter_raw_chunks(
+    ctx: RunContext,
+    source: dict[str, Any],
+    extraction_type: str,
+    watermark: WatermarkFilter | None,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """
+    Fetch stage: yield raw record chunks from the source's scraper.
+
+    In incremental mode, records before the watermark are dropped here,
+    and fetching stops once the listing has moved past it.
+    """
+    chunks = _fetch_chunks(ctx, source, extraction_type)
+    async with aclosing(chunks):
+        async for chunk in chunks:
+            ctx.records_extracted += len(chunk)
+            if watermark is None:
+                yield chunk
+                continue
+
+            kept, past_watermark = watermark.apply(chunk)
+            ctx.records_skipped += len(chunk) - len(kept)
+            if kept:
+                yield kept
+            if past_watermark:
+                ctx.logger.info("Reached watermark %s — stopping early", watermark.cutoff)
+                break
+
+
+async def _fetch_chunks(
+    ctx: RunContext,
+    source: dict[str, Any],
+    extraction_type: str,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Dispatch to the scraper for the source's extraction type."""
+    if extraction_type in _API_TYPES:
+        async for page in _iter_api(ctx, source):
+            yield page
+    elif extraction_type in _HTML_TYPES:
+        for chunk in chunked(await _scrape_html(ctx, source), PIPELINE_CHUNK_SIZE):
+            yield chunk
+    else:
+        async for chunk in _iter_file(ctx, source):
+            yield chunk
 
-    # ── Normalize ───────────────────────────────────────────────────────
 
+async def _normalize_chunks(
+    ctx: RunContext,
+    source: dict[str, Any],
+    raw_chunks: AsyncIterator[list[dict[str, Any]]],
+    plan: NormalizationPlan | None,
+) -> AsyncIterator[PriceBatch]:
+    """
+    Normalize stage: map each raw chunk through the schema mapping.
+
+    With a worker pool, chunks are normalized in worker processes, one
+    at a time, each following the day / month order the plan has decided.
+    """
     schema_mapping = source.get("schemaMapping", {})
     conversions = source.get("conversions", {})
+    source_id = str(source.get("_id", ""))
+    source_name = source.get("name", source.get("source", "other"))
+
+    async with aclosing(raw_chunks):
+        async for raw in raw_chunks:
+            if plan is None:
+                yield PriceBatch.from_records(raw)
+            elif ctx.workers is not None:
+                from app.core.workers import ParseJob, pack_records
+
+                result = await ctx.workers.run(ParseJob(
+                    "records",
+                    source.get("entryUrl", ""),
+                    pack_records(raw),
+                    schema_mapping=schema_mapping,
+                    conversions=conversions,
+                    source_id=source_id,
+                    source_name=source_name,
+                    month_first=plan.dates.month_first,
+                ))
+                result.replay_errors(ctx)
+                _adopt_date_order(plan, result.month_first)
+                yield result.batch
+            else:
+                yield plan.normalize(raw)
+
+
+def _compile_source_plan(source: dict[str, Any]) -> NormalizationPlan | None:
+    """The source's normalization plan (None without a schema mapping)."""
+    schema_mapping = source.get("schemaMapping", {})
+    if not schema_mapping:
+        return None
+    return compile_plan(
+        schema_mapping,
+        source.get("conversions", {}),
+        source_id=str(source.get("_id", "")),
+        source_name=source.get("name", source.get("source", "other")),
+    )
+
 
-    if schema_mapping:
-        normalized = normalize_records(
-            raw_records,
-            schema_mapping,
-            conversions,
-            source_id=source_id,
-            source_name=source_name,
+def _adopt_date_order(plan: NormalizationPlan, month_first: bool | None) -> None:
+    """Keep the day / month order a worker decided, if the plan hadn't yet."""
+    if plan.dates.month_first is None:
+        plan.dates.month_first = month_first
+
+
+# ── Worker Pool Path ─────────────────────────────────────────────────────────
+
+
+async def _iter_worker_chunks(
+    ctx: RunContext,
+    source: dict[str, Any],
+    extraction_type: str,
+    watermark: WatermarkFilter | None,
+    plan: NormalizationPlan | None,
+) -> AsyncIterator[PriceBatch]:
+    """
+    Fetch the source's payload here, then parse + normalize it in a worker.
+
+    The watermark applies to the normalized ISO `date` field here, since
+    the raw rows never reach the coordinator.
+    """
+    month_first = plan.dates.month_first if plan is not None else None
+    async with _parse_job(ctx, source, extraction_type, month_first) as job:
+        if job is None:
+            return
+        result = await ctx.workers.run(job)
+    result.replay_errors(ctx)
+    if plan is not None:
+        _adopt_date_order(plan, result.month_first)
+    ctx.records_extracted += result.raw_count
+
+    batch = result.batch
+    if watermark is not None:
+        cutoff = watermark.cutoff
+        kept = batch.where("date", lambda date: not date or date >= cutoff)
+        ctx.records_skipped += len(batch) - len(kept)
+        batch = kept
+
+    for chunk in batch.chunks(PIPELINE_CHUNK_SIZE):
+        yield chunk
+
+
+@asynccontextmanager
+async def _parse_job(
+    ctx: RunContext,
+    source: dict[str, Any],
+    extraction_type: str,
+    month_first: bool | None = None,
+) -> AsyncIterator[ParseJob | None]:
+    """
+    Fetch an HTML page or file and wrap it in a ParseJob.
+
+    The payload crosses the process boundary as page text, or as the
+    path of the downloaded file (removed on exit). Yields None if
+    nothing was fetched.
+    """
+    from app.core.workers import ParseJob
+
+    job_fields: dict[str, Any] = {
+        "schema_mapping": source.get("schemaMapping", {}),
+        "conversions": source.get("conversions", {}),
+        "source_id": str(source.get("_id", "")),
+        "source_name": source.get("name", source.get("source", "other")),
+        "month_first": month_first,
+    }
+
+    if extraction_type in _HTML_TYPES:
+        from app.scraping.html_scraper import fetch_html
+
+        page_url = source.get("htmlPageUrl") or source.get("entryUrl", "")
+        html = await fetch_html(ctx, page_url)
+        yield None if html is None else ParseJob(
+            "html", page_url, html, selector=source.get("htmlSelector", ""), **job_fields
         )
-    else:
-        ctx.logger.warning("No schemaMapping for %s — returning raw records", source_url)
-        normalized = raw_records
+        return
 
-    ctx.logger.info(
-        "Scrape complete: %d raw → %d normalized records",
-        len(raw_records),
-        len(normalized),
-    )
+    from app.scraping.file_scraper import downloaded_file
+
+    file_url, file_type = _file_target(ctx, source)
+    if not file_type:
+        yield None
+        return
 
-    return normalized
+    async with downloaded_file(ctx, file_url) as path:
+        yield None if path is None else ParseJob(file_type, file_url, str(path), **job_fields)
 
 
 # ── Private Dispatchers ──────────────────────────────────────────────────────
 
 
-async def _scrape_api(ctx: RunContext, source: dict[str, Any]) -> list[dict[str, Any]]:
-    """Dispatch to API scraper."""
-    from app.scraping.api_scraper import scrape_api
+async def _iter_api(
+    ctx: RunContext,
+    source: dict[str, Any],
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Dispatch to API scraper (one chunk per page)."""
+    from app.scraping.api_scraper import iter_api_pages
 
     endpoint = source.get("endpoint", "")
     if not endpoint:
         ctx.add_error(source["entryUrl"], "No API endpoint configured")
-        return []
+        return
 
-    return await scrape_api(
+    pages = iter_api_pages(
         ctx,
         endpoint,
         method=source.get("endpointMethod", "GET"),
@@ -115,6 +396,9 @@ async def _scrape_api(ctx: RunContext, source: dict[str, Any]) -> list[dict[str,
         post_content_type=source.get("postContentType", "json"),
         paginate=source.get("paginate", True),
     )
+    async with aclosing(pages):
+        async for page in pages:
+            yield page
 
 
 async def _scrape_html(ctx: RunContext, source: dict[str, Any]) -> list[dict[str, Any]]:
@@ -131,17 +415,82 @@ async def _scrape_html(ctx: RunContext, source: dict[str, Any]) -> list[dict[str
     )
 
 
-async def _scrape_file(ctx: RunContext, source: dict[str, Any]) -> list[dict[str, Any]]:
-    """Dispatch to file scraper."""
-    from app.scraping.file_scraper import scrape_file
+async def _iter_file(
+    ctx: RunContext,
+    source: dict[str, Any],
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """
+    Dispatch to file scraper.
+
+    The file is streamed to a temporary file, then parsed chunk by chunk
+    in a thread so page / row extraction doesn't block the event loop.
+    PDFs are split into page ranges, and workbooks into sheets, extracted
+    in the worker pool.
+    """
+    from app.scraping.file_scraper import (
+        downloaded_file,
+        iter_excel_chunks,
+        iter_file_chunks,
+        iter_pdf_chunks,
+    )
+
+    file_url, file_type = _file_target(ctx, source)
+    if not file_type:
+        return
+
+    async with downloaded_file(ctx, file_url) as path:
+        if path is None:
+            return
+        if file_type in ("pdf", "excel"):
+            split = iter_pdf_chunks if file_type == "pdf" else iter_excel_chunks
+            parts = split(ctx, path, file_url)
+            async with aclosing(parts):
+                async for chunk in parts:
+                    yield chunk
+            return
+        chunks = iter_file_chunks(path, file_type, file_url, ctx)
+        while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+            yield chunk
+
+
+def _parse_in_worker(source: dict[str, Any], extraction_type: str) -> bool:
+    """
+    Whether the whole payload is parsed in one worker job.
+
+    Not for APIs (records arrive already parsed) nor PDFs and Excel
+    files, whose page ranges / sheets fan out across the pool from
+    _iter_file() instead.
+    """
+    if extraction_type in _API_TYPES:
+        return False
+    if extraction_type in _FILE_TYPES:
+        from app.scraping.file_scraper import detect_file_type
+
+        file_type = source.get("fileType", "") or detect_file_type(source.get("fileUrl", ""))
+        return file_type not in ("pdf", "excel")
+    return True
+
+
+def fetch_url(source: dict[str, Any]) -> str:
+    """The URL a source's data is fetched from (API endpoint, page or file)."""
+    extraction_type = source.get("extractionType", "")
+    if extraction_type in _API_TYPES:
+        return source.get("endpoint", "")
+    if extraction_type in _FILE_TYPES:
+        return source.get("fileUrl", "")
+    return source.get("htmlPageUrl") or source.get("entryUrl", "")
+
+
+def _file_target(ctx: RunContext, source: dict[str, Any]) -> tuple[str, str]:
+    """Resolve (file URL, file type) for a file source; type is '' on error."""
+    from app.scraping.file_scraper import detect_file_type
 
     file_url = source.get("fileUrl", "")
     if not file_url:
         ctx.add_error(source["entryUrl"], "No file URL configured")
-        return []
+        return "", ""
 
-    return await scrape_file(
-        ctx,
-        file_url,
-        file_type=source.get("fileType", ""),
-    )
+    file_type = source.get("fileType", "") or detect_file_type(file_url)
+    if not file_type:
+        ctx.add_error(file_url, "Cannot determine file type")
+    return file_url, file_type
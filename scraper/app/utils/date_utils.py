@@ -3,13 +3,41 @@ Date utilities.
 
 Parsing multiple Indian date formats, ISO conversion,
 and date range helpers for price data normalization.
+
+Whole columns are parsed with parse_date_column(), which infers the
+column's format once instead of trying every format on every value.
+Dates are read day-first; a source's day / month order is decided once,
+by a DateOrder, and kept for all of its chunks.
 """
 
 from __future__ import annotations
 
 from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Any, Iterable, Sequence
+
+from app.core.constants import (
+    DATE_INFERENCE_SAMPLE_SIZE,
+    DATE_PARSE_CACHE_SIZE,
+    INDIAN_DATE_FORMATS,
+    MONTH_FIRST_DATE_FORMATS,
+    MONTH_FIRST_MIN_EVIDENCE,
+)
+
+
+def _day_month_twin(fmt: str) -> str | None:
+    """The format with day and month swapped, if it's a known layout."""
+    if "%d" not in fmt or "%m" not in fmt:
+        return None
+    twin = fmt.replace("%d", "\0").replace("%m", "%d").replace("\0", "%m")
+    return twin if twin in INDIAN_DATE_FORMATS or twin in MONTH_FIRST_DATE_FORMATS else None
 
-from app.core.constants import INDIAN_DATE_FORMATS
+
+# Formats tried, in order of preference, for each day / month order: the
+# month-first list swaps the numeric day-first layouts for their twins
+# and keeps the unambiguous ones ("%d-%b-%Y", "%Y-%m-%d")
+_DAY_FIRST = tuple(INDIAN_DATE_FORMATS)
+_MONTH_FIRST = tuple(_day_month_twin(fmt) or fmt for fmt in INDIAN_DATE_FORMATS)
 
 
 def parse_date(value: str | datetime | date) -> datetime | None:
@@ -27,14 +55,16 @@ def parse_date(value: str | datetime | date) -> datetime | None:
     if not isinstance(value, str) or not value.strip():
         return None
 
-    text = value.strip()
+    return _parse_date_text(value.strip())
+
 
+@lru_cache(maxsize=DATE_PARSE_CACHE_SIZE)
+def _parse_date_text(text: str, month_first: bool = False) -> datetime | None:
     # Try ISO 8601 first (most unambiguous)
-    for fmt in INDIAN_DATE_FORMATS:
-        try:
-            return datetime.strptime(text, fmt).replace(tzinfo=timezone.utc)
-        except ValueError:
-            continue
+    for fmt in _MONTH_FIRST if month_first else _DAY_FIRST:
+        parsed = _strptime(text, fmt)
+        if parsed is not None:
+            return parsed
 
     # Try ISO with time component
     try:
@@ -45,6 +75,149 @@ def parse_date(value: str | datetime | date) -> datetime | None:
     return None
 
 
+class DateOrder:
+    """
+    The day / month order of one source's date strings.
+
+    Decided from the first column that holds any date strings, then
+    kept for every later column, so a date string reads the same in
+    every chunk of a source. Day-first unless that column holds at
+    least MONTH_FIRST_MIN_EVIDENCE distinct strings that only a
+    month-first layout fits (and more of them than strings only
+    day-first fits). A source's explicit date format decides it up front.
+    """
+
+    __slots__ = ("month_first",)
+
+    def __init__(self, month_first: bool | None = None) -> None:
+        # None until decided
+        self.month_first = month_first
+
+    @classmethod
+    def for_format(cls, fmt: Any) -> DateOrder:
+        """The order a known strptime format implies (undecided for others)."""
+        if fmt in MONTH_FIRST_DATE_FORMATS:
+            return cls(True)
+        if fmt in INDIAN_DATE_FORMATS:
+            return cls(False)
+        return cls()
+
+    def parse(self, values: Sequence[Any], *, preferred: str | None = None) -> list[datetime | None]:
+        """parse_date_column() in this order, deciding it first if needed."""
+        if self.month_first is None:
+            self.month_first = _month_first_evidence(values)
+        return parse_date_column(values, preferred=preferred, month_first=bool(self.month_first))
+
+
+def _month_first_evidence(values: Iterable[Any]) -> bool | None:
+    """
+    Whether date strings call for month-first (None: no date strings to tell).
+    """
+    texts = {value.strip() for value in values if type(value) is str}
+    texts.discard("")
+
+    day_only = month_only = either = 0
+    for text in texts:
+        day = any(_strptime(text, fmt) is not None for fmt in _DAY_FIRST)
+        month = any(_strptime(text, fmt) is not None for fmt in _MONTH_FIRST)
+        if day and month:
+            either += 1
+        elif day:
+            day_only += 1
+        elif month:
+            month_only += 1
+
+    if not (day_only or month_only or either):
+        return None
+    return month_only >= MONTH_FIRST_MIN_EVIDENCE and month_only > day_only
+
+
+def parse_date_column(
+    values: Sequence[Any],
+    *,
+    preferred: str | None = None,
+    month_first: bool = False,
+) -> list[datetime | None]:
+    """
+    Parse a column of dates, inferring the column's format once.
+
+    Values from one source almost always share a layout, so the format
+    is inferred from a sample of the column's distinct strings (see
+    infer_date_format) and each distinct string is parsed once with it.
+    Strings it doesn't fit fall back to trying each format of the same
+    day / month order (day-first unless `month_first`; never the other
+    order), as do non-string values. `preferred` (a strptime format,
+    e.g. from a source's conversions) wins whenever it fits the sample.
+
+    Equal strings map to one shared datetime object.
+    """
+    # Distinct strings in column order, so the sample is deterministic
+    texts: dict[str, str] = {}
+    for value in values:
+        if type(value) is str and value not in texts:
+            texts[value] = value.strip()
+    distinct = [text for text in dict.fromkeys(texts.values()) if text]
+
+    sample = distinct[:DATE_INFERENCE_SAMPLE_SIZE]
+    fmt = infer_date_format(sample, preferred=preferred, month_first=month_first)
+    parsed = {text: _strptime(text, fmt) for text in distinct} if fmt else {}
+
+    for text in distinct:
+        if parsed.get(text) is None:
+            parsed[text] = _parse_date_text(text, month_first)
+
+    return [
+        parsed.get(texts[value]) if type(value) is str else parse_date(value)
+        for value in values
+    ]
+
+
+def infer_date_format(
+    samples: Iterable[str],
+    *,
+    preferred: str | None = None,
+    month_first: bool = False,
+) -> str | None:
+    """
+    The strptime format that best fits a column's date strings.
+
+    Prefers a format that parses every sample, trying `preferred` and
+    then the layouts of the given day / month order ("03/04/2026" is
+    3 April day-first). Mixed columns get the format fitting the most
+    samples. None if no format fits any.
+    """
+    samples = list(samples)
+    if not samples:
+        return None
+
+    if isinstance(preferred, str) and preferred and _count_fits(samples, preferred) == len(samples):
+        return preferred
+
+    formats = _MONTH_FIRST if month_first else _DAY_FIRST
+    # A wrong format is usually ruled out by the first sample
+    for fmt in formats:
+        if all(_strptime(text, fmt) is not None for text in samples):
+            return fmt
+
+    counts = {fmt: _count_fits(samples, fmt) for fmt in formats}
+    best = max(counts, key=counts.__getitem__)
+    return best if counts[best] else None
+
+
+def _count_fits(texts: list[str], fmt: str) -> int:
+    """How many of `texts` parse with `fmt`."""
+    return sum(_strptime(text, fmt) is not None for text in texts)
+
+
+@lru_cache(maxsize=DATE_PARSE_CACHE_SIZE)
+def _strptime(text: str, fmt: str) -> datetime | None:
+    """`text` parsed with `fmt` as a UTC datetime (None if it doesn't fit)."""
+    try:
+        return datetime.strptime(text, fmt).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
 def to_iso_string(dt: datetime | date | None) -> str:
     """
     Convert a datetime to ISO 8601 date string (YYYY-MM-DD).
@@ -0,0 +1,43 @@
+"""
+Table utilities.
+
+Header naming and missing-value markers shared by the HTML and Excel
+readers, following pandas' conventions so records keep the keys
+existing schema mappings were built from.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Sequence
+
+# Cell values read as missing (pandas' default na_values)
+NA_VALUES = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null",
+})
+
+
+def column_names(header: Sequence[Any]) -> list[Any]:
+    """
+    Column names for a header row, as pandas names them.
+
+    Blank cells become "Unnamed: i"; repeated names get ".1", ".2"
+    suffixes, skipping any suffix another column already uses.
+    """
+    blank = [i for i, value in enumerate(header) if value is None or value == ""]
+    names = [f"Unnamed: {i}" if i in blank else value for i, value in enumerate(header)]
+    # Named columns keep their names before blank ones are deduplicated
+    order = [i for i in range(len(names)) if i not in blank] + blank
+
+    counts: dict[Any, int] = {}
+    for i in order:
+        name = base = names[i]
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[base] = count + 1
+            name = f"{base}.{count}"
+            count = count + 1 if name in names else counts.get(name, 0)
+        names[i] = name
+        counts[name] = count + 1
+    return names
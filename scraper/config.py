@@ -26,11 +26,31 @@ class LogMode(StrEnum):
     TXT = "txt"
 
 
+class OutputMode(StrEnum):
+    AUTO = "auto"  # csv with --input csv, else mongo when connected, else csv
+    MONGO = "mongo"
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
+class FileFormat(StrEnum):
+    CSV = "csv"  # CSV + JSON snapshot files per save
+    JSONL = "jsonl"  # append-only JSON Lines streams
+
+
+class FileCompression(StrEnum):
+    NONE = "none"
+    GZIP = "gzip"
+    ZSTD = "zstd"
+
+
 class AgentMode(StrEnum):
     SCRAPE = "scrape"
     DISCOVER = "discover"
     DISCOVER_AND_SCRAPE = "discover_and_scrape"
     SINGLE_URL = "single_url"
+    DAEMON = "daemon"
+    COMPACT = "compact"
 
 
 class LLMProvider(StrEnum):
@@ -60,6 +80,7 @@ class AppConfig:
     # Modes
     input_mode: InputMode = InputMode.MONGO
     log_mode: LogMode = LogMode.MONGO
+    output_mode: OutputMode = OutputMode.AUTO
     agent_mode: AgentMode = AgentMode.DISCOVER_AND_SCRAPE
 
     # Playwright
@@ -70,6 +91,54 @@ class AppConfig:
     discovery_timeout_seconds: int = 120
     request_delay_ms: int = 500
 
+    # Concurrency (sources scraped at once, globally and per host)
+    concurrency: int = 1
+    per_host_concurrency: int = 2
+
+    # Worker processes for parsing + normalization (0 = parse on the event loop)
+    workers: int = 0
+
+    # Source leasing (multi-node runs sharing one `sources` collection)
+    lease_sources: bool = False
+    lease_batch_size: int = 10
+    lease_seconds: int = 900
+    lease_min_interval_minutes: int = 60
+    worker_id: str = ""
+
+    # Static sharding (--shard i/n): this job handles shard `shard_index` of `shard_count`
+    shard_index: int = 0
+    shard_count: int = 1
+
+    # Shared HTTP clients (pooled per host)
+    http_timeout_seconds: float = 30.0
+    http_connections_per_host: int = 4
+    http2: bool = False
+
+    # Adaptive per-host rate limit: starts at 1000 / request_delay_ms req/s
+    # (or the rate learned last run) and never climbs above this
+    rate_limit_max_rps: float = 10.0
+
+    # Retries per request on transient errors (jittered exponential backoff)
+    http_retries: int = 3
+
+    # On-disk HTTP cache for pages / files ("" = disabled)
+    http_cache_dir: str = "data/cache/http"
+    http_cache_max_mb: int = 512
+
+    # Largest file (PDF / Excel / CSV) a download may reach before it's aborted
+    max_file_mb: int = 200
+
+    # Incremental scraping: only fetch/keep records from each source's latest
+    # ingested date (minus a lookback for late revisions) onward
+    incremental: bool = False
+    incremental_lookback_days: int = 0
+
+    # Daemon mode: default cadence, first retry delay after a failed run
+    # (doubles per failure up to the cadence), and source reload period
+    scrape_interval_minutes: int = 1440
+    daemon_retry_minutes: int = 30
+    daemon_refresh_minutes: int = 10
+
     # Runtime (set by CLI --url for single_url mode)
     target_url: str = ""
 
@@ -77,6 +146,15 @@ class AppConfig:
     csv_input_path: str = "data/samples/sources.csv"
     csv_output_dir: str = "data/outputs"
 
+    # File output format in csv_output_dir; JSON Lines streams are optionally
+    # compressed and rotate each UTC day and at file_rotate_mb
+    file_format: FileFormat = FileFormat.CSV
+    file_compression: FileCompression = FileCompression.NONE
+    file_rotate_mb: int = 256
+
+    # Parquet dataset root (used when output_mode=parquet, and by --mode compact)
+    parquet_output_dir: str = "data/outputs/parquet"
+
     @classmethod
     def from_env(cls) -> AppConfig:
         """Build config from environment variables only."""
@@ -96,13 +174,49 @@ class AppConfig:
             ),
             input_mode=InputMode(os.getenv("INPUT_MODE", "mongo").lower()),
             log_mode=LogMode(os.getenv("LOG_MODE", "mongo").lower()),
+            output_mode=OutputMode(os.getenv("OUTPUT_MODE", "auto").lower()),
             agent_mode=AgentMode(os.getenv("AGENT_MODE", "discover_and_scrape").lower()),
             headless=os.getenv("HEADLESS", "true").lower() in ("true", "1", "yes"),
             max_pages_per_source=int(os.getenv("MAX_PAGES_PER_SOURCE", "50")),
             discovery_timeout_seconds=int(os.getenv("DISCOVERY_TIMEOUT_SECONDS", "120")),
             request_delay_ms=int(os.getenv("REQUEST_DELAY_MS", "500")),
+            concurrency=max(1, int(os.getenv("SCRAPE_CONCURRENCY", "1"))),
+            per_host_concurrency=max(1, int(os.getenv("PER_HOST_CONCURRENCY", "2"))),
+            workers=max(0, int(os.getenv("SCRAPE_WORKERS", "0"))),
+            lease_sources=os.getenv("LEASE_SOURCES", "false").lower() in ("true", "1", "yes"),
+            lease_batch_size=max(1, int(os.getenv("LEASE_BATCH_SIZE", "10"))),
+            lease_seconds=max(30, int(os.getenv("LEASE_SECONDS", "900"))),
+            lease_min_interval_minutes=max(
+                0, int(os.getenv("LEASE_MIN_INTERVAL_MINUTES", "60"))
+            ),
+            worker_id=os.getenv("WORKER_ID", ""),
+            **_shard_fields(os.getenv("SHARD", "")),
+            http_timeout_seconds=max(1.0, float(os.getenv("HTTP_TIMEOUT_SECONDS", "30"))),
+            http_connections_per_host=max(1, int(os.getenv("HTTP_CONNECTIONS_PER_HOST", "4"))),
+            http2=os.getenv("HTTP2", "false").lower() in ("true", "1", "yes"),
+            rate_limit_max_rps=max(0.1, float(os.getenv("RATE_LIMIT_MAX_RPS", "10"))),
+            http_retries=max(0, int(os.getenv("HTTP_RETRIES", "3"))),
+            http_cache_dir=os.getenv("HTTP_CACHE_DIR", "data/cache/http"),
+            http_cache_max_mb=max(1, int(os.getenv("HTTP_CACHE_MAX_MB", "512"))),
+            max_file_mb=max(1, int(os.getenv("MAX_FILE_MB", "200"))),
+            incremental=os.getenv("INCREMENTAL", "false").lower() in ("true", "1", "yes"),
+            incremental_lookback_days=max(0, int(os.getenv("INCREMENTAL_LOOKBACK_DAYS", "0"))),
+            scrape_interval_minutes=max(1, int(os.getenv("SCRAPE_INTERVAL_MINUTES", "1440"))),
+            daemon_retry_minutes=max(1, int(os.getenv("DAEMON_RETRY_MINUTES", "30"))),
+            daemon_refresh_minutes=max(1, int(os.getenv("DAEMON_REFRESH_MINUTES", "10"))),
+            file_format=FileFormat(os.getenv("FILE_FORMAT", "csv").lower()),
+            file_compression=FileCompression(os.getenv("FILE_COMPRESSION", "none").lower()),
+            file_rotate_mb=max(1, int(os.getenv("FILE_ROTATE_MB", "256"))),
+            parquet_output_dir=os.getenv("PARQUET_OUTPUT_DIR", "data/outputs/parquet"),
         )
 
+    @property
+    def shard(self) -> tuple[int, int] | None:
+        """(index, count) when sharding is enabled, else None."""
+        if self.shard_count <= 1:
+            return None
+        return (self.shard_index, self.shard_count)
+
     def with_cli_overrides(self, args: argparse.Namespace) -> AppConfig:
         """Return a new config with CLI argument overrides applied."""
         overrides: dict = {}
@@ -118,8 +232,34 @@ class AppConfig:
             overrides["input_mode"] = InputMode(args.input)
         if args.log is not None:
             overrides["log_mode"] = LogMode(args.log)
+        if args.output is not None:
+            overrides["output_mode"] = OutputMode(args.output)
+        if args.file_format is not None:
+            overrides["file_format"] = FileFormat(args.file_format)
+        if args.file_compression is not None:
+            overrides["file_compression"] = FileCompression(args.file_compression)
         if args.headless is not None:
             overrides["headless"] = args.headless
+        if args.concurrency is not None:
+            overrides["concurrency"] = max(1, args.concurrency)
+        if args.per_host_concurrency is not None:
+            overrides["per_host_concurrency"] = max(1, args.per_host_concurrency)
+        if args.workers is not None:
+            overrides["workers"] = max(0, args.workers)
+        if args.lease is not None:
+            overrides["lease_sources"] = args.lease
+        if args.worker_id is not None:
+            overrides["worker_id"] = args.worker_id
+        if args.shard is not None:
+            overrides.update(_shard_fields(args.shard))
+        if args.http2 is not None:
+            overrides["http2"] = args.http2
+        if args.http_cache is False:
+            overrides["http_cache_dir"] = ""
+        if args.incremental is not None:
+            overrides["incremental"] = args.incremental
+        if args.interval is not None:
+            overrides["scrape_interval_minutes"] = max(1, args.interval)
 
         if not overrides:
             return self
@@ -130,6 +270,40 @@ class AppConfig:
         return AppConfig(**current)
 
 
+def parse_shard_spec(spec: str) -> tuple[int, int]:
+    """
+    Parse a shard spec "i/n" into (index, count).
+
+    Raises ValueError unless 0 <= i < n.
+    """
+    try:
+        index_str, count_str = spec.split("/")
+        index, count = int(index_str), int(count_str)
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}': expected 'i/n', e.g. '0/4'") from None
+
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard '{spec}': need 0 <= i < n")
+    return index, count
+
+
+def _shard_fields(spec: str) -> dict[str, int]:
+    """Config fields for a shard spec ('' = no sharding)."""
+    if not spec:
+        return {}
+    index, count = parse_shard_spec(spec)
+    return {"shard_index": index, "shard_count": count}
+
+
+def _shard_arg(value: str) -> str:
+    """argparse type for --shard: validate, keep the raw spec."""
+    try:
+        parse_shard_spec(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from None
+    return value
+
+
 # ── CLI Parser ───────────────────────────────────────────────────────────────
 
 
@@ -163,10 +337,97 @@ def build_arg_parser() -> argparse.ArgumentParser:
         default=None,
         help="Logging mode (overrides LOG_MODE env var)",
     )
+    parser.add_argument(
+        "--output",
+        choices=[m.value for m in OutputMode],
+        default=None,
+        help="Where scraped prices are written (overrides OUTPUT_MODE env var)",
+    )
+    parser.add_argument(
+        "--file-format",
+        choices=[m.value for m in FileFormat],
+        default=None,
+        help="File output format: CSV/JSON snapshots or append-only JSON Lines "
+        "(overrides FILE_FORMAT env var)",
+    )
+    parser.add_argument(
+        "--file-compression",
+        choices=[m.value for m in FileCompression],
+        default=None,
+        help="Compression of JSON Lines files; zstd needs the 'zstandard' package "
+        "(overrides FILE_COMPRESSION env var)",
+    )
     parser.add_argument(
         "--headless",
         type=lambda v: v.lower() in ("true", "1", "yes"),
         default=None,
         help="Run browser headless (true/false)",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Max sources processed at once (overrides SCRAPE_CONCURRENCY env var)",
+    )
+    parser.add_argument(
+        "--per-host-concurrency",
+        type=int,
+        default=None,
+        help="Max sources processed at once per host (overrides PER_HOST_CONCURRENCY env var)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for parsing/normalization, 0 = in-process "
+        "(overrides SCRAPE_WORKERS env var)",
+    )
+    parser.add_argument(
+        "--lease",
+        action="store_true",
+        default=None,
+        help="Claim sources via MongoDB leases so several agents can share the work",
+    )
+    parser.add_argument(
+        "--worker-id",
+        type=str,
+        default=None,
+        help="Lease owner id for this agent (default: hostname:pid)",
+    )
+    parser.add_argument(
+        "--shard",
+        type=_shard_arg,
+        default=None,
+        metavar="I/N",
+        help="Only process shard I of N, split by a stable hash of entryUrl "
+        "(overrides SHARD env var)",
+    )
+    parser.add_argument(
+        "--http2",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Negotiate HTTP/2 where servers support it; needs the 'h2' package "
+        "(overrides HTTP2 env var)",
+    )
+    parser.add_argument(
+        "--http-cache",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Use the on-disk HTTP cache for pages/files (default: on, see HTTP_CACHE_DIR)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=None,
+        help="Only scrape records newer than each source's latest stored date "
+        "(overrides INCREMENTAL env var)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=None,
+        metavar="MINUTES",
+        help="Default per-source scrape cadence in daemon mode "
+        "(overrides SCRAPE_INTERVAL_MINUTES env var)",
+    )
     return parser
@@ -35,13 +35,42 @@ async def main(config: AppConfig) -> None:
     # Create logger
     logger = create_logger(config, db)
     logger.info("Mandi AI Agent starting")
-    logger.info("Mode: %s | Input: %s | Log: %s", config.agent_mode, config.input_mode, config.log_mode)
+    logger.info(
+        "Mode: %s | Input: %s | Output: %s | Log: %s",
+        config.agent_mode, config.input_mode, config.output_mode, config.log_mode,
+    )
+
+    # Start worker processes for parsing (if configured)
+    workers = None
+    if config.workers > 0:
+        from app.core.workers import WorkerPool
+
+        workers = WorkerPool(config.workers)
+        logger.info("Started %d parse worker processes", config.workers)
+
+    # Shared, pooled HTTP clients for all scrapers
+    from app.scraping.http_client import HttpClients
+
+    http = HttpClients.from_config(config)
+
+    # Open the on-disk HTTP cache (if configured)
+    http_cache = None
+    if config.http_cache_dir:
+        from app.scraping.http_cache import HttpCache
+
+        http_cache = HttpCache(
+            config.http_cache_dir,
+            max_bytes=config.http_cache_max_mb * 1024 * 1024,
+        )
 
     # Build run context
     ctx = RunContext(
         config=config,
         logger=logger,
         db=db,
+        workers=workers,
+        http_cache=http_cache,
+        http=http,
     )
 
     try:
@@ -56,11 +85,22 @@ async def main(config: AppConfig) -> None:
         sys.exit(1)
     finally:
         logger.info(
-            "Agent finished in %.1fs | Records: %d | Errors: %d",
+            "Agent finished in %.1fs | Sources: %d | Records: %d | Errors: %d | "
+            "HTTP cache: %d hits / %d misses",
             ctx.elapsed_seconds,
+            ctx.sources_run,
             ctx.records_saved,
-            len(ctx.errors),
+            ctx.error_count,
+            ctx.cache_hits,
+            ctx.cache_misses,
         )
+        for output in ctx.outputs:
+            output.close()
+        if workers is not None:
+            workers.shutdown()
+        await http.close()
+        if http_cache is not None:
+            http_cache.close()
         await mongo.close()
 
 
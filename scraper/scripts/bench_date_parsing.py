@@ -0,0 +1,147 @@
+"""
+Benchmark column-wise date parsing against per-value parsing.
+
+Times parse_date_column() (format inferred once per column, cold
+caches) against the per-value parser it replaced, which tries every
+Indian format on every value, and normalize_records() over 20k rows in
+1k-row chunks with each parser behind the date column.
+
+Usage (from the scraper directory):
+    python scripts/bench_date_parsing.py
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.scraping.normalizer import normalize_records  # noqa: E402
+from app.utils import date_utils  # noqa: E402
+from app.utils.date_utils import DateOrder, parse_date_column  # noqa: E402
+
+# The Indian day-first layouts the per-value parser tried, in order
+_REFERENCE_FORMATS = [
+    "%d-%m-%Y",
+    "%d/%m/%Y",
+    "%d-%b-%Y",
+    "%d %b %Y",
+    "%Y-%m-%d",
+    "%d.%m.%Y",
+    "%d-%m-%y",
+    "%d/%m/%y",
+]
+
+MAPPING = {"crop": "cropName", "modal": "modalPrice", "day": "date"}
+
+
+def reference_parse_date(value: Any) -> datetime | None:
+    """The per-value parser: every format on every value, no caching."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+    if not isinstance(value, str) or not value.strip():
+        return None
+    text = value.strip()
+    for fmt in _REFERENCE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(text).replace(tzinfo=timezone.utc)
+    except (ValueError, TypeError):
+        return None
+
+
+def _clear_caches() -> None:
+    date_utils._parse_date_text.cache_clear()
+    date_utils._strptime.cache_clear()
+
+
+@contextmanager
+def _per_value_dates() -> Iterator[None]:
+    """Normalize date columns with reference_parse_date, one value at a time."""
+
+    def parse(self: DateOrder, values: Sequence[Any], *, preferred: str | None = None) -> list[datetime | None]:
+        return [reference_parse_date(value) for value in values]
+
+    original = DateOrder.parse
+    DateOrder.parse = parse  # type: ignore[method-assign]
+    try:
+        yield
+    finally:
+        DateOrder.parse = original  # type: ignore[method-assign]
+
+
+def _column(rng: random.Random, fmt: str, rows: int = 1000, days: int = 60) -> list[str]:
+    base = date(2026, 1, 1)
+    return [(base + timedelta(days=rng.randrange(days))).strftime(fmt) for _ in range(rows)]
+
+
+def _mean_seconds(fn: Callable[[], Any], reps: int) -> float:
+    start = time.perf_counter()
+    for _ in range(reps):
+        fn()
+    return (time.perf_counter() - start) / reps
+
+
+# ── Column Parsing ───────────────────────────────────────────────────────────
+
+
+def bench_columns(rng: random.Random) -> None:
+    print("parse_date per value vs parse_date_column (cold caches):")
+    cases = [
+        ("1k rows %d/%m/%Y", _column(rng, "%d/%m/%Y"), 20),
+        ("1k rows %d.%m.%Y", _column(rng, "%d.%m.%Y"), 20),
+        ("1k rows %d %B %Y", _column(rng, "%d %B %Y"), 20),
+        ("10k rows %d-%b-%Y", _column(rng, "%d-%b-%Y", 10000, 365), 3),
+        ("1k rows mixed 2 fmts", _column(rng, "%d/%m/%Y", 500) + _column(rng, "%d-%b-%Y", 500), 20),
+    ]
+    for name, values, reps in cases:
+        before = _mean_seconds(lambda: [reference_parse_date(value) for value in values], reps)
+
+        def column() -> None:
+            _clear_caches()
+            parse_date_column(values)
+
+        after = _mean_seconds(column, reps)
+        same = [reference_parse_date(value) for value in values] == parse_date_column(values)
+        print(f"  {name:22} {before * 1000:7.2f}ms -> {after * 1000:6.2f}ms  x{before / after:5.1f}  same={same}")
+
+
+# ── Normalization ────────────────────────────────────────────────────────────
+
+
+def bench_normalize(rng: random.Random) -> None:
+    print("normalize_records over 20k rows in 1k chunks, 2000 distinct dates:")
+    for fmt in ("%d.%m.%Y", "%d-%b-%Y", "%Y-%m-%d"):
+        records = [
+            {"crop": "Onion", "modal": 1000 + i, "day": day}
+            for i, day in enumerate(_column(rng, fmt, 20000, 2000))
+        ]
+        source_id = f"bench-{fmt}"
+
+        def run() -> None:
+            _clear_caches()
+            for start in range(0, len(records), 1000):
+                normalize_records(records[start:start + 1000], MAPPING, source_id=source_id)
+
+        with _per_value_dates():
+            before = _mean_seconds(run, 3)
+        after = _mean_seconds(run, 3)
+        print(f"  {fmt:10} {before:.2f}s -> {after:.2f}s  x{before / after:.1f}")
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    bench_columns(random.Random(1))
+    bench_normalize(random.Random(2))
@@ -0,0 +1,90 @@
+"""
+Benchmark the direct HTML table reader against pandas.read_html.
+
+Generates agmarknet-style result pages (a navigation block, a small
+layout table and the price grid) and times extract_table_from_html(),
+which reads the grid with app.scraping.html_table.read_table(), against
+the BeautifulSoup + pandas.read_html path it replaced.
+
+Usage (from the scraper directory):
+    python scripts/bench_html_table.py [rows ...]
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.scraping.html_scraper import _read_html_table, extract_table_from_html  # noqa: E402
+
+SELECTOR = "table.tableagmark_new"
+HEADER = (
+    "<tr><th>Sl no.</th><th>District Name</th><th>Market Name</th><th>Commodity</th>"
+    "<th>Variety</th><th>Grade</th><th>Min Price (Rs./Quintal)</th><th>Max Price (Rs./Quintal)</th>"
+    "<th>Modal Price (Rs./Quintal)</th><th>Price Date</th></tr>"
+)
+
+
+def agmarknet_page(rows: int, rng: random.Random) -> str:
+    """An agmarknet-style price report page with `rows` grid rows."""
+    body = []
+    for i in range(rows):
+        district = rng.choice(["Pune", "Nashik", "Satara"])
+        low = rng.randint(500, 9000)
+        modal = rng.choice([str(low + 200), "1,00,000", ""])
+        body.append(
+            f"<tr><td>{i + 1}</td><td>{district}</td><td>{district} APMC</td><td>Onion</td>"
+            f"<td>{rng.choice(['Red', 'Local', ''])}</td><td>FAQ</td><td>{low:,}</td><td>{low + 500:,}</td>"
+            f"<td>{modal}</td><td>{rng.randint(1, 28):02d}/03/2026</td></tr>"
+        )
+    nav = "<div class='nav'>" + "<a href='#'>x</a>" * 200 + "</div>"
+    return (
+        f"<html><body>{nav}<table class='small'><tr><td>a</td><td>b</td></tr></table>"
+        f"<table id='cphBody_GridPriceData' class='tableagmark_new'>{HEADER}{''.join(body)}</table>"
+        "</body></html>"
+    )
+
+
+def _same(fast: list[dict[str, Any]], slow: list[dict[str, Any]]) -> bool:
+    """Records equal key for key, type for type (NaN equal to NaN)."""
+    if len(fast) != len(slow):
+        return False
+    for a, b in zip(fast, slow):
+        if list(a) != list(b):
+            return False
+        for key, u in a.items():
+            v = b[key]
+            if isinstance(u, float) and isinstance(v, float) and math.isnan(u) and math.isnan(v):
+                continue
+            if type(u) is not type(v) or u != v:
+                return False
+    return True
+
+
+def _timed(fn: Any, *args: Any, **kwargs: Any) -> tuple[float, Any]:
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main(sizes: list[int]) -> None:
+    rng = random.Random(1)
+    for rows in sizes:
+        html = agmarknet_page(rows, rng)
+        pandas_s, slow = _timed(_read_html_table, html, "", SELECTOR, 0, None)
+        direct_s, fast = _timed(extract_table_from_html, html, selector=SELECTOR)
+        print(
+            f"{rows:6} rows ({len(html) / 1e6:.1f} MB): "
+            f"read_html {pandas_s:.3f}s  read_table {direct_s:.3f}s  "
+            f"x{pandas_s / direct_s:.1f}  identical={_same(fast, slow)}"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 5000, 20000])
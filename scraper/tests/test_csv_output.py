@@ -0,0 +1,40 @@
+"""CsvOutput's JSON Lines mode: writes land on disk and close() stops the writer."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import threading
+from pathlib import Path
+
+from app.core.price_batch import PriceBatch
+from app.outputs.csv_output import CsvOutput
+
+
+def _writer_threads() -> int:
+    return sum(thread.name == "jsonl-writer" for thread in threading.enumerate())
+
+
+def test_close_stops_jsonl_writer(tmp_path: Path) -> None:
+    output = CsvOutput(tmp_path, file_format="jsonl", compression="gzip")
+    batch = PriceBatch.from_records([{"cropName": "Onion", "modalPrice": 1200.0}])
+    before = _writer_threads()
+
+    async def save() -> None:
+        await output.save_prices(batch)
+        await output.save_run({"sourceId": "s1"})
+
+    asyncio.run(save())
+    assert _writer_threads() == before + 1
+
+    output.close()
+    assert _writer_threads() == before
+
+    (prices,) = tmp_path.glob("prices-*.jsonl.gz")
+    with gzip.open(prices, "rt", encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == [{"cropName": "Onion", "modalPrice": 1200.0}]
+
+
+def test_close_without_jsonl(tmp_path: Path) -> None:
+    CsvOutput(tmp_path).close()
@@ -0,0 +1,147 @@
+"""
+Day / month order of date strings: decided once per source, never per chunk.
+"""
+
+from __future__ import annotations
+
+from app.core.workers import ParseJob, pack_records, run_parse_job
+from app.scraping.incremental import WatermarkFilter
+from app.scraping.normalizer import compile_plan
+from app.utils.date_utils import DateOrder, parse_date_column, to_iso_string
+
+MAPPING = {"crop": "cropName", "modal": "modalPrice", "day": "date"}
+
+
+def _iso(values: list[object]) -> list[str | None]:
+    return [to_iso_string(moment) if moment else None for moment in parse_date_column(values)]
+
+
+def _records(*dates: str) -> list[dict[str, object]]:
+    return [{"crop": "Onion", "modal": 1000, "day": day} for day in dates]
+
+
+def _dates(batch: object) -> list[object]:
+    return [record["date"] for record in batch]
+
+
+# ── parse_date_column ────────────────────────────────────────────────────────
+
+
+def test_column_is_day_first() -> None:
+    assert _iso(["03/04/2026", "05/06/2026"]) == ["2026-04-03", "2026-06-05"]
+
+
+def test_month_first_value_does_not_flip_column() -> None:
+    assert _iso(["03/04/2026", "04/13/2026"]) == ["2026-04-03", None]
+
+
+def test_month_first_column() -> None:
+    parsed = parse_date_column(["03/04/2026", "04/13/2026"], month_first=True)
+    assert [to_iso_string(moment) for moment in parsed] == ["2026-03-04", "2026-04-13"]
+
+
+# ── DateOrder ────────────────────────────────────────────────────────────────
+
+
+def test_undecided_without_date_strings() -> None:
+    dates = DateOrder()
+    dates.parse([None, "", 5])
+    assert dates.month_first is None
+
+
+def test_one_month_first_value_keeps_day_first() -> None:
+    dates = DateOrder()
+    dates.parse(["03/04/2026", "04/13/2026", "05/06/2026"])
+    assert dates.month_first is False
+
+
+def test_month_first_needs_evidence() -> None:
+    dates = DateOrder()
+    dates.parse(["03/04/2026", "04/13/2026", "05/20/2026"])
+    assert dates.month_first is True
+
+
+def test_day_first_values_outweigh_month_first() -> None:
+    dates = DateOrder()
+    dates.parse(["04/13/2026", "05/20/2026", "13/04/2026", "20/05/2026", "21/05/2026"])
+    assert dates.month_first is False
+
+
+def test_order_is_kept_for_later_columns() -> None:
+    dates = DateOrder()
+    dates.parse(["03/04/2026"])
+    later = dates.parse(["04/13/2026", "05/20/2026", "03/04/2026"])
+    assert dates.month_first is False
+    assert [to_iso_string(moment) if moment else None for moment in later] == [None, None, "2026-04-03"]
+
+
+def test_explicit_format_decides_order() -> None:
+    assert DateOrder.for_format("%m/%d/%Y").month_first is True
+    assert DateOrder.for_format("%d/%m/%Y").month_first is False
+    assert DateOrder.for_format("%Y%m%d").month_first is None
+
+
+# ── Normalization Plans ──────────────────────────────────────────────────────
+
+
+def test_plan_keeps_order_across_chunks() -> None:
+    plan = compile_plan(MAPPING, source_id="typo-source")
+    first = plan.normalize(_records("03/04/2026", "05/06/2026"))
+    second = plan.normalize(_records("04/13/2026", "03/04/2026"))
+    third = plan.normalize(_records("04/13/2026", "05/20/2026", "03/04/2026"))
+
+    assert _dates(first) == ["2026-04-03", "2026-06-05"]
+    # A typo stays as it is; it never re-reads the source's other dates
+    assert _dates(second) == ["04/13/2026", "2026-04-03"]
+    assert _dates(third) == ["04/13/2026", "05/20/2026", "2026-04-03"]
+
+
+def test_plan_turns_month_first_on_evidence() -> None:
+    plan = compile_plan(MAPPING, source_id="us-source")
+    first = plan.normalize(_records("04/13/2026", "05/20/2026", "03/04/2026"))
+    second = plan.normalize(_records("03/04/2026"))
+
+    assert plan.dates.month_first is True
+    assert _dates(first) == ["2026-04-13", "2026-05-20", "2026-03-04"]
+    assert _dates(second) == ["2026-03-04"]
+
+
+def test_plan_with_month_first_format() -> None:
+    conversions = {"date": {"date_format": "%m/%d/%Y"}}
+    plan = compile_plan(MAPPING, conversions, source_id="explicit-source")
+    assert _dates(plan.normalize(_records("03/04/2026"))) == ["2026-03-04"]
+
+
+def test_worker_follows_coordinator_order() -> None:
+    job = ParseJob(
+        kind="records",
+        url="https://example.com",
+        payload=pack_records(_records("03/04/2026")),
+        schema_mapping=MAPPING,
+        conversions={},
+        source_id="worker-source",
+        month_first=True,
+    )
+    result = run_parse_job(job)
+    assert result.month_first is True
+    assert _dates(result.batch) == ["2026-03-04"]
+
+
+# ── Watermark ────────────────────────────────────────────────────────────────
+
+
+def test_watermark_shares_plan_order() -> None:
+    plan = compile_plan(MAPPING, {"date": {"date_format": "%m/%d/%Y"}}, source_id="watermark-source")
+    watermark = WatermarkFilter("2026-03-10", MAPPING, dates=plan.dates)
+
+    kept, _ = watermark.apply(_records("03/04/2026", "03/20/2026"))
+    assert [record["day"] for record in kept] == ["03/20/2026"]
+
+
+def test_watermark_keeps_day_first_after_typo() -> None:
+    watermark = WatermarkFilter("2026-04-01", MAPPING)
+    watermark.apply(_records("03/04/2026", "04/13/2026"))
+
+    # 02/04 stays 2 April, not 4 February
+    kept, _ = watermark.apply(_records("02/04/2026"))
+    assert [record["day"] for record in kept] == ["02/04/2026"]
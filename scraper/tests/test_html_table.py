@@ -0,0 +1,128 @@
+"""
+Equivalence of the direct HTML table reader with the pandas.read_html path.
+
+extract_table_from_html() reads simple tables itself and falls back to
+_read_html_table() for the rest; both must return the same records —
+same keys in the same order, same values of the same types.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from typing import Any
+
+import pytest
+
+from app.scraping.html_scraper import _read_html_table, extract_table_from_html
+
+
+def _same(fast: list[dict[str, Any]], slow: list[dict[str, Any]]) -> bool:
+    """Records equal key for key, type for type (NaN equal to NaN)."""
+    if len(fast) != len(slow):
+        return False
+    for a, b in zip(fast, slow):
+        if list(a) != list(b):
+            return False
+        for key, u in a.items():
+            v = b[key]
+            if isinstance(u, float) and isinstance(v, float) and math.isnan(u) and math.isnan(v):
+                continue
+            if type(u) is not type(v) or u != v:
+                return False
+    return True
+
+
+# ── Handcrafted Tables ───────────────────────────────────────────────────────
+
+CASES = {
+    "basic": "<table><tr><th>A</th><th>B</th></tr><tr><td>1</td><td>x</td></tr><tr><td>2</td><td>y</td></tr></table>",
+    "no_header": "<table><tr><td>a</td><td>1.5</td></tr><tr><td>b</td><td>-</td></tr></table>",
+    "mixed": (
+        "<table><tr><th>A</th><th></th><th>A</th><th>2024</th><th>B</th><th>A.1</th></tr>"
+        "<tr><td>1,00,000</td><td>x</td><td> 1,5 </td><td>NA</td><td>inf</td><td>q</td></tr>"
+        "<tr><td>2</td><td>y  z<br>w</td><td>abc</td><td>True</td><td>2</td><td>r</td></tr>"
+        "<tr><td></td><td></td><td></td><td></td><td></td><td></td></tr>"
+        "<tr><td>3</td><td>n/a</td><td>1e3</td><td>False</td><td>-Infinity</td><td></td></tr></table>"
+    ),
+    "thead_tfoot": (
+        "<table><thead><tr><th>x</th><th>y</th></tr></thead>"
+        "<tbody><tr><td>1</td><td>2</td></tr><tr><td>3</td></tr></tbody>"
+        "<tfoot><tr><td>T</td><td>9</td></tr></tfoot></table>"
+    ),
+    "spans": (
+        "<table><tr><th colspan=2>Place</th><th>Price</th></tr>"
+        "<tr><td rowspan=3>Pune</td><td>A</td><td>10</td></tr><tr><td>B</td><td>11</td></tr>"
+        "<tr><td>C</td><td rowspan=2>12</td></tr><tr><td>Nashik</td><td>D</td></tr></table>"
+    ),
+    "bools": "<table><tr><th>a</th><th>b</th></tr><tr><td>true</td><td>x</td></tr><tr><td>FALSE</td><td>y</td></tr></table>",
+    "multi_header": (
+        "<table><thead><tr><th>a</th><th>b</th></tr><tr><th>c</th><th>d</th></tr></thead>"
+        "<tr><td>1</td><td>2</td></tr></table>"
+    ),
+    "nested": "<table><tr><th>a</th><th>b</th></tr><tr><td><table><tr><td>z</td></tr></table></td><td>2</td></tr></table>",
+    "hidden_row": (
+        "<table><tr><th>a</th><th>b</th></tr><tr style='display: none'><td>1</td><td>2</td></tr>"
+        "<tr><td>3</td><td>4</td></tr></table>"
+    ),
+    "ints_with_gap": "<table><tr><th>a</th><th>b</th></tr><tr><td>1</td><td>2</td></tr><tr><td></td><td>x</td></tr></table>",
+}
+
+TWO_TABLES = (
+    "<div><table id='t1'><tr><th>a</th><th>b</th></tr><tr><td>1</td><td>2</td></tr></table>"
+    "<table class='res big'><tr><th>c</th><th>d</th></tr><tr><td>5</td><td>6</td></tr></table></div>"
+)
+SELECTORS = ["", "table#t1", "table.res", "table:nth-of-type(2)", "div table.big", "div > table", "#t1"]
+
+
+@pytest.mark.parametrize("table_index", [0, 1])
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_handcrafted_tables(name: str, table_index: int) -> None:
+    html = CASES[name]
+    fast = extract_table_from_html(html, table_index=table_index)
+    slow = _read_html_table(html, "", "", table_index, None)
+    assert _same(fast, slow), (fast, slow)
+
+
+@pytest.mark.parametrize("table_index", [0, 1])
+@pytest.mark.parametrize("selector", SELECTORS)
+def test_selectors(selector: str, table_index: int) -> None:
+    fast = extract_table_from_html(TWO_TABLES, selector=selector, table_index=table_index)
+    slow = _read_html_table(TWO_TABLES, "", selector, table_index, None)
+    assert _same(fast, slow), (fast, slow)
+
+
+# ── Random Tables ────────────────────────────────────────────────────────────
+
+_CELLS = ["", "NA", "1", "-2", "3.5", "1,234", "1,00,000", "abc", "x y", "True", "false", "1e3", " 7 ", "nan", "-"]
+_HEADERS = ["a", "b", "", "a.1", "1"]
+
+
+def _random_table(rng: random.Random) -> str:
+    """A small table of awkward cells, ragged rows and random row/col spans."""
+    width, height = rng.randint(2, 5), rng.randint(1, 6)
+    rows = []
+    for _ in range(height):
+        cells = []
+        for _ in range(rng.randint(1, width)):
+            attrs = ""
+            if rng.random() < 0.1:
+                attrs += f" rowspan={rng.randint(2, 3)}"
+            if rng.random() < 0.1:
+                attrs += f" colspan={rng.randint(2, 3)}"
+            cells.append(f"<td{attrs}>{rng.choice(_CELLS)}</td>")
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+    head = ""
+    if rng.random() < 0.7:
+        head = "<tr>" + "".join(f"<th>{rng.choice(_HEADERS)}</th>" for _ in range(width)) + "</tr>"
+    return f"<table>{head}{''.join(rows)}</table>"
+
+
+def test_random_tables() -> None:
+    rng = random.Random(1)
+    differing = []
+    for _ in range(300):
+        html = _random_table(rng)
+        if not _same(extract_table_from_html(html), _read_html_table(html, "", "", 0, None)):
+            differing.append(html)
+    assert not differing, differing[:3]
@@ -0,0 +1,66 @@
+"""HTTP cache processed markers: kept per (source, normalization plan, URL)."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Iterator
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.core.context import RunContext
+from app.scraping.http_cache import HttpCache, SourceUnchanged, cached_get, mark_processed
+from config import AppConfig
+
+URL = "https://mandi.example/prices"
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, text="<table></table>", headers={"etag": '"v1"'})
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> Iterator[HttpCache]:
+    cache = HttpCache(tmp_path, max_bytes=1024 * 1024)
+    yield cache
+    cache.close()
+
+
+def _fetch(cache: HttpCache, source_id: str, plan_fingerprint: str, *, mark: bool = True) -> None:
+    """Fetch URL as one source run, marking it processed afterwards."""
+
+    async def run() -> None:
+        ctx = RunContext(config=AppConfig.from_env(), logger=logging.getLogger("test"), http_cache=cache)
+        ctx.source_id = source_id
+        ctx.plan_fingerprint = plan_fingerprint
+        async with httpx.AsyncClient(transport=httpx.MockTransport(_handler)) as client:
+            await cached_get(ctx, client, URL)
+        if mark:
+            await mark_processed(ctx)
+
+    asyncio.run(run())
+
+
+def test_unchanged_body_skipped_for_same_source_and_plan(cache: HttpCache) -> None:
+    _fetch(cache, "s1", "plan-a")
+    with pytest.raises(SourceUnchanged):
+        _fetch(cache, "s1", "plan-a")
+
+
+def test_other_source_still_parses(cache: HttpCache) -> None:
+    _fetch(cache, "s1", "plan-a")
+    _fetch(cache, "s2", "plan-b")
+
+
+def test_changed_plan_still_parses(cache: HttpCache) -> None:
+    _fetch(cache, "s1", "plan-a")
+    _fetch(cache, "s1", "plan-a2")
+    with pytest.raises(SourceUnchanged):
+        _fetch(cache, "s1", "plan-a")
+
+
+def test_unmarked_run_is_retried(cache: HttpCache) -> None:
+    _fetch(cache, "s1", "plan-a", mark=False)
+    _fetch(cache, "s1", "plan-a")
@@ -0,0 +1,29 @@
+"""Leased input: a run never re-claims the sources it already claimed."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from app.inputs.lease_input import LeaseInput
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+def test_released_sources_are_not_reclaimed_without_min_interval() -> None:
+    async def run() -> list[Any]:
+        db = mongomock_motor.AsyncMongoMockClient()["mandi"]
+        await db["sources"].insert_many([{"_id": i, "healthStatus": "OK"} for i in range(5)])
+        leases = LeaseInput(db, owner="a", batch_size=2, lease_seconds=60, min_interval_minutes=0)
+
+        seen: list[Any] = []
+        while batch := await leases.load_sources():
+            for source in batch:
+                seen.append(source["_id"])
+                await leases.release(source)
+            assert len(seen) <= 5, "re-claimed a released source"
+        return seen
+
+    assert sorted(asyncio.run(run())) == [0, 1, 2, 3, 4]
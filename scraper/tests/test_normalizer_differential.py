@@ -0,0 +1,295 @@
+"""
+Differential test of the columnar normalizer against the record-by-record one.
+
+A frozen copy of the original normalize_records (and the parse_date it
+called) runs side by side with app.scraping.normalizer on seeded random
+batches. Results must be identical — same fields in the same order, same
+values of the same types — except where a price carries a currency
+prefix ("Rs. 1,200", "₹900"): the columnar normalizer reads those as
+numbers, the original stored 0.0.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import math
+import random
+from typing import Any
+
+import pytest
+
+from app.scraping.normalizer import normalize_records
+
+# ── Frozen Reference (record by record) ──────────────────────────────────────
+
+_OLD_DATE_FORMATS = [
+    "%d-%m-%Y",
+    "%d/%m/%Y",
+    "%d-%b-%Y",
+    "%d %b %Y",
+    "%Y-%m-%d",
+    "%d.%m.%Y",
+    "%d-%m-%y",
+    "%d/%m/%y",
+]
+
+
+def _old_parse_date(value: Any) -> dt.datetime | None:
+    if isinstance(value, dt.datetime):
+        return value
+    if isinstance(value, dt.date):
+        return dt.datetime(value.year, value.month, value.day, tzinfo=dt.timezone.utc)
+    if not isinstance(value, str) or not value.strip():
+        return None
+    text = value.strip()
+    for fmt in _OLD_DATE_FORMATS:
+        try:
+            return dt.datetime.strptime(text, fmt).replace(tzinfo=dt.timezone.utc)
+        except ValueError:
+            continue
+    try:
+        return dt.datetime.fromisoformat(text).replace(tzinfo=dt.timezone.utc)
+    except (ValueError, TypeError):
+        pass
+    return None
+
+
+def _old_iso(moment: dt.datetime | dt.date | None) -> str:
+    if moment is None:
+        return ""
+    if isinstance(moment, dt.datetime):
+        return moment.strftime("%Y-%m-%d")
+    return moment.isoformat()
+
+
+def _old_name_to_id(name: str) -> str:
+    return name.lower().strip().replace(" ", "-").replace(",", "")
+
+
+def _old_normalize_records(
+    raw_records: list[dict[str, Any]],
+    schema_mapping: dict[str, str],
+    conversions: dict[str, dict[str, Any]] | None = None,
+    *,
+    source_id: str = "",
+    source_name: str = "",
+) -> list[dict[str, Any]]:
+    if not schema_mapping:
+        return raw_records
+
+    conversions = conversions or {}
+    normalized: list[dict[str, Any]] = []
+
+    for raw in raw_records:
+        record: dict[str, Any] = {}
+
+        for raw_field, unified_field in schema_mapping.items():
+            if raw_field in raw:
+                record[unified_field] = raw[raw_field]
+
+        for field_name, conv in conversions.items():
+            if field_name not in record:
+                continue
+
+            value = record[field_name]
+
+            multiply = conv.get("multiply")
+            if multiply is not None and value is not None:
+                try:
+                    record[field_name] = float(value) * float(multiply)
+                except (ValueError, TypeError):
+                    pass
+
+            date_format = conv.get("date_format")
+            if date_format and field_name == "date":
+                parsed = _old_parse_date(str(value))
+                if parsed:
+                    record[field_name] = _old_iso(parsed)
+
+        if "date" in record and not isinstance(record["date"], str):
+            parsed = _old_parse_date(record["date"])
+            if parsed:
+                record["date"] = _old_iso(parsed)
+
+        if "date" in record and isinstance(record["date"], str):
+            parsed = _old_parse_date(record["date"])
+            if parsed:
+                record["date"] = _old_iso(parsed)
+
+        for price_field in ("minPrice", "maxPrice", "modalPrice"):
+            if price_field in record:
+                try:
+                    val = record[price_field]
+                    if isinstance(val, str):
+                        val = val.replace(",", "").strip()
+                    record[price_field] = float(val) if val else 0.0
+                except (ValueError, TypeError):
+                    record[price_field] = 0.0
+
+        if "arrival" in record:
+            try:
+                val = record["arrival"]
+                if isinstance(val, str):
+                    val = val.replace(",", "").strip()
+                record["arrival"] = float(val) if val else None
+            except (ValueError, TypeError):
+                record["arrival"] = None
+
+        record.setdefault("unit", "quintal")
+        record.setdefault("source", source_name or "other")
+
+        if source_id:
+            record["sourceId"] = source_id
+
+        if "cropId" not in record and "cropName" in record:
+            record["cropId"] = _old_name_to_id(record["cropName"])
+        if "mandiId" not in record and "mandiName" in record:
+            record["mandiId"] = _old_name_to_id(record["mandiName"])
+        if "stateId" not in record and "stateName" in record:
+            record["stateId"] = _old_name_to_id(record["stateName"])
+
+        if record.get("cropName") and record.get("modalPrice"):
+            normalized.append(record)
+
+    return normalized
+
+
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+
+def _canon(records: Any) -> list[list[tuple[str, tuple[str, ...]]]]:
+    """Records as comparable (field, (type, repr)) lists; NaN equals NaN."""
+
+    def key(value: Any) -> tuple[str, ...]:
+        if isinstance(value, float) and math.isnan(value):
+            return ("nan",)
+        return (type(value).__name__, repr(value))
+
+    return [[(name, key(value)) for name, value in dict(record).items()] for record in records]
+
+
+def _run(normalize: Any, *args: Any, **kwargs: Any) -> tuple[Any, type[BaseException] | None]:
+    try:
+        return normalize(*args, **kwargs), None
+    except Exception as exc:
+        return None, type(exc)
+
+
+def _has_currency(records: list[dict[str, Any]]) -> bool:
+    return any(
+        isinstance(value, str) and value.replace(",", "").strip().lower().startswith(("rs", "inr", "₹"))
+        for record in records
+        for value in record.values()
+    )
+
+
+# ── Random Batches ───────────────────────────────────────────────────────────
+
+_VALUES = [
+    "", " ", None, 0, 0.0, -0.0, 1, True, False, 12.5, "12.5", " 1,200 ", "1,00,000", "abc",
+    float("nan"), "nan", "inf", "Rs. 1,200", "₹900", "03/04/2026", "2026-04-03", "3-Apr-2026",
+    "03.04.2026", "3/4/26", dt.date(2026, 4, 3), dt.datetime(2026, 4, 3, 5), "Onion",
+    " Red Onion, Big ", "1_000", [1], {"a": 1},
+]
+_NAMES = ["", "Onion", " Red Onion, Big ", "Pune APMC", "Tamil Nadu"]
+_FIELDS = [
+    "cropName", "mandiName", "stateName", "modalPrice", "minPrice", "maxPrice",
+    "arrival", "date", "unit", "source", "cropId", "variety",
+]
+
+
+def _random_batch(rng: random.Random) -> tuple[list[dict[str, Any]], dict[str, str], dict[str, dict[str, Any]]]:
+    raw_fields = [f"f{i}" for i in range(rng.randint(1, 8))]
+    mapping = {name: rng.choice(_FIELDS) for name in raw_fields}
+
+    conversions: dict[str, dict[str, Any]] = {}
+    for name in rng.sample(_FIELDS, 3):
+        conv: dict[str, Any] = {}
+        if rng.random() < 0.5:
+            conv["multiply"] = rng.choice([10, "0.1", None, "x", 100.0])
+        if rng.random() < 0.5:
+            conv["date_format"] = "%d/%m/%Y"
+        conversions[name] = conv
+
+    records = []
+    for _ in range(rng.randint(0, 20)):
+        record = {}
+        for name in raw_fields:
+            if rng.random() >= 0.9:
+                continue
+            is_name = mapping[name] in ("cropName", "mandiName", "stateName")
+            record[name] = rng.choice(_NAMES) if is_name and rng.random() < 0.97 else rng.choice(_VALUES)
+        records.append(record)
+    return records, mapping, conversions
+
+
+def test_random_batches_match_reference() -> None:
+    rng = random.Random(5)
+    currency_diffs = 0
+    for _ in range(3000):
+        records, mapping, conversions = _random_batch(rng)
+        source = {"source_id": rng.choice(["", "s1"]), "source_name": rng.choice(["", "agmarknet"])}
+
+        old, old_error = _run(_old_normalize_records, records, mapping, conversions, **source)
+        new, new_error = _run(normalize_records, records, mapping, conversions, **source)
+        assert old_error is new_error, (records, mapping, conversions)
+        if old_error is not None:
+            continue
+
+        if _canon(old) != _canon(new):
+            assert _has_currency(records), (records, mapping, conversions, old, list(new))
+            currency_diffs += 1
+
+    # The currency cases are drawn often enough to show up
+    assert currency_diffs > 0
+
+
+# ── Currency Prefixes ────────────────────────────────────────────────────────
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [("Rs. 1,200", 1200.0), ("rs 450", 450.0), ("INR 3,000", 3000.0), ("₹900", 900.0)],
+)
+def test_currency_prefixed_prices_differ(text: str, expected: float) -> None:
+    records = [{"crop": "Onion", "min": text, "modal": text, "arrivals": text}]
+    mapping = {"crop": "cropName", "min": "minPrice", "modal": "modalPrice", "arrivals": "arrival"}
+
+    assert _old_normalize_records(records, mapping) == []
+
+    (record,) = normalize_records(records, mapping)
+    assert record["minPrice"] == expected
+    assert record["modalPrice"] == expected
+    assert record["arrival"] == expected
+
+
+def test_mandi_batch_matches_reference() -> None:
+    rng = random.Random(3)
+    mapping = {
+        "State": "stateName", "District Name": "districtName", "Market Name": "mandiName",
+        "Commodity": "cropName", "Variety": "variety", "Min Price (Rs./Quintal)": "minPrice",
+        "Max Price (Rs./Quintal)": "maxPrice", "Modal Price (Rs./Quintal)": "modalPrice",
+        "Arrivals (Tonnes)": "arrival", "Price Date": "date",
+    }
+    conversions = {"arrival": {"multiply": 10}, "date": {"date_format": "%d/%m/%Y"}}
+
+    records = []
+    for _ in range(5000):
+        low = rng.randint(500, 9000)
+        day = rng.randint(1, 28)
+        records.append({
+            "State": rng.choice(["Maharashtra", "Karnataka", "Tamil Nadu"]),
+            "District Name": f"District {rng.randint(1, 40)}",
+            "Market Name": f"Market {rng.randint(0, 399)}",
+            "Commodity": rng.choice(["Onion", "Tomato", "Paddy(Dhan)", "Bhindi(Ladies Finger)"]),
+            "Variety": rng.choice(["Local", "Other", "Red"]),
+            "Min Price (Rs./Quintal)": rng.choice([low, str(low), f"{low:,}"]),
+            "Max Price (Rs./Quintal)": rng.choice([low + 400, f"{low + 400:,}"]),
+            "Modal Price (Rs./Quintal)": rng.choice([low + 200, f"{low + 200:,}", "", "1,00,000", None, "abc"]),
+            "Arrivals (Tonnes)": rng.choice(["12.5", "", None, 3, "1,234", "NR"]),
+            "Price Date": rng.choice([f"{day:02d}/03/2026", f"2026-03-{day:02d}", f"{day:02d}-Mar-2026"]),
+        })
+
+    old = _old_normalize_records(records, mapping, conversions, source_id="s", source_name="agmarknet")
+    new = normalize_records(records, mapping, conversions, source_id="s", source_name="agmarknet")
+    assert _canon(old) == _canon(new)
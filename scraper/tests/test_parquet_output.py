@@ -0,0 +1,45 @@
+"""Parquet output: one schema across files, and compaction per partition."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from app.core.price_batch import PriceBatch
+from app.outputs.parquet_output import compact_dataset, write_partitioned
+
+
+def _batch(**extra: object) -> PriceBatch:
+    return PriceBatch.from_records([
+        {"cropName": "Onion", "modalPrice": 1200.0, "date": "2026-04-03", "stateId": "mh", **extra},
+    ])
+
+
+def test_extra_fields_share_a_type_across_saves(tmp_path: Path) -> None:
+    write_partitioned(tmp_path, _batch(grade=1))
+    write_partitioned(tmp_path, _batch(grade="A"))
+
+    table = ds.dataset(tmp_path, format="parquet", partitioning="hive").to_table()
+    assert table.schema.field("grade").type == pa.string()
+    assert sorted(table.column("grade").to_pylist()) == ["1", "A"]
+
+    stats = compact_dataset(tmp_path)
+    assert (stats.files_merged, stats.files_written) == (2, 1)
+
+
+def test_incompatible_partition_does_not_stop_compaction(tmp_path: Path) -> None:
+    # Files from before extra fields were always strings
+    legacy = tmp_path / "date=2026-04-02" / "stateId=ka"
+    legacy.mkdir(parents=True)
+    pq.write_table(pa.table({"grade": pa.array([1], pa.int64())}), legacy / "part-1.parquet")
+    pq.write_table(pa.table({"grade": pa.array(["A"], pa.string())}), legacy / "part-2.parquet")
+
+    write_partitioned(tmp_path, _batch(grade="B"))
+    write_partitioned(tmp_path, _batch(grade="C"))
+
+    stats = compact_dataset(tmp_path)
+    assert (stats.partitions, stats.files_merged) == (1, 2)
+    assert len(list(legacy.glob("*.parquet"))) == 2
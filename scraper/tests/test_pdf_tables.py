@@ -0,0 +1,30 @@
+"""PdfTableMerger: tables continued across PDF pages vs new tables."""
+
+from __future__ import annotations
+
+from app.scraping.file_scraper import PdfTableMerger
+
+HEADER = ["Market", "Commodity", "Modal Price"]
+
+
+def test_data_row_continues_previous_table() -> None:
+    merger = PdfTableMerger()
+    merger.feed([[HEADER, ["Pune", "Onion", "1,200"]]])
+    assert merger.feed([[["Nashik", "Onion", "1,150"]]]) == [
+        {"Market": "Nashik", "Commodity": "Onion", "Modal Price": "1,150"},
+    ]
+
+
+def test_repeated_header_continues_previous_table() -> None:
+    merger = PdfTableMerger()
+    merger.feed([[HEADER, ["Pune", "Onion", "1,200"]]])
+    assert merger.feed([[HEADER, ["Nashik", "Onion", "1,150"]]]) == [
+        {"Market": "Nashik", "Commodity": "Onion", "Modal Price": "1,150"},
+    ]
+
+
+def test_header_with_year_starts_new_table() -> None:
+    merger = PdfTableMerger()
+    merger.feed([[HEADER, ["Pune", "Onion", "1,200"]]])
+    records = merger.feed([[["District", "Crop", "2024"], ["Satara", "Wheat", "2,400"]]])
+    assert records == [{"District": "Satara", "Crop": "Wheat", "2024": "2,400"}]